@@ -0,0 +1,110 @@
+from random import Random
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from src.graph.bfs import BFSGraph, breadth_first_search
+from src.graph.dfs import DFSGraph, depth_first_search
+from src.graph.mst import kruskals, prim
+from src.graph.mst.prim import MSTGraph, MSTTemplate
+from src.graph.sssp import bellman_ford, dijkstra
+from src.graph.step import Trace
+
+
+# Each vertex samples `degree` others; a pair sampled from both ends (or a
+# vertex sampling itself) gives one edge or none, never a duplicate.
+def random_template(n: int, degree: int, seed: int = 1111) -> MSTTemplate:
+    rng = Random(seed)
+    t: MSTTemplate = {i: [] for i in range(n)}
+    seen = set()
+    for u in range(n):
+        for v in rng.sample(range(n), degree):
+            weight = rng.randint(1, 100)
+            if u != v and (min(u, v), max(u, v)) not in seen:
+                seen.add((min(u, v), max(u, v)))
+                t[u].append((v, weight))
+                t[v].append((u, weight))
+    return t
+
+
+def timed(build: Callable, run: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        G = build()
+        start = perf_counter()
+        run(G)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+# Wall time of each instrumented algorithm at every tracing level, on a random
+# undirected graph. Bellman-Ford is O(VE) so it runs on a fifth of the vertices.
+def trace_overhead(n: int = 1000, degree: int = 4, repeat: int = 3) -> pd.DataFrame:
+    t = random_template(n, degree)
+    small = random_template(max(n // 5, 2), degree)
+    plain = {u: [v for v, _ in edges] for u, edges in t.items()}
+
+    cases: List[Tuple[str, int, Callable, Callable[..., object]]] = [
+        (
+            "bfs",
+            n,
+            lambda: BFSGraph.from_template(plain),
+            lambda G, trace: breadth_first_search(G.node_by_key(0), G, trace),
+        ),
+        (
+            "dfs",
+            n,
+            lambda: DFSGraph.from_template(plain),
+            lambda G, trace: depth_first_search(G.node_by_key(0), G, trace=trace),
+        ),
+        (
+            "prim",
+            n,
+            lambda: MSTGraph.from_template(t),
+            lambda G, trace: prim.minimum_spanning_tree(G.node_by_key(0), G, trace),
+        ),
+        (
+            "kruskal",
+            n,
+            lambda: kruskals.KruskalsGraph.from_template(t),
+            lambda G, trace: kruskals.minimum_spanning_tree(G, trace=trace),
+        ),
+        (
+            "dijkstra",
+            n,
+            lambda: MSTGraph.from_template(t),
+            lambda G, trace: dijkstra.single_source_shortest_path(
+                G.node_by_key(0), G, trace=trace
+            ),
+        ),
+        (
+            "bellman_ford",
+            len(small),
+            lambda: MSTGraph.from_template(small),
+            lambda G, trace: bellman_ford.single_source_shortest_path(
+                G.node_by_key(0), G, trace
+            ),
+        ),
+    ]
+
+    rows: Dict[str, Dict[str, float]] = {}
+    for name, size, build, run in cases:
+        row: Dict[str, float] = {"n": size}
+        for level in Trace:
+            row[level.name.lower()] = timed(
+                build, lambda G: run(G, level), repeat
+            )
+        row["overhead"] = row["snapshots"] / row["off"]
+        rows[name] = row
+
+    df = pd.DataFrame.from_dict(rows, orient="index")
+    df["n"] = df["n"].astype(int)
+    return df
+
+
+if __name__ == "__main__":
+    df = trace_overhead()
+    # One format per column (index first), so the vertex counts print as ints
+    formats = ["", *(".0f" if c == "n" else ".4f" for c in df.columns)]
+    print(df.to_markdown(floatfmt=formats))
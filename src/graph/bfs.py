@@ -1,13 +1,16 @@
-from queue import Queue
-from typing import Any, List, Optional, Type
+from array import array
+from collections import deque
+from queue import Queue  # re-exported for the notebooks
+from typing import Any, Deque, Iterable, List, Optional, Sequence, Type
 
 from src.graph.color import NodeColor
-from src.graph.graph import EdgeBase, Graph, VertexBase
-from src.graph.step import GraphStepTree
-from src.tree.step import Stepper, ctx
+from src.graph.graph import EdgeBase, Graph, VertexBase, predecessor_ids
+from src.graph.step import GraphStepTree, Trace, run_traced
+from src.tree.step import ctx
 
 
 class Vertex(VertexBase):
+    __slots__ = ("children", "parent", "visited", "distance")
     key: Any
     children: Optional[List["Vertex"]]
     parent: Optional["Vertex"]
@@ -16,6 +19,7 @@ class Vertex(VertexBase):
     color: str
 
     def __init__(self, key: Any):
+        super().__init__()
         self.key = key
         self.visited = False
         self.children = None
@@ -29,28 +33,33 @@ class BFSGraph(Graph[Vertex, EdgeBase]):
     edge_cls: Type[EdgeBase] = EdgeBase
 
 
-def _breadth_first_search(start: Vertex, Adj: BFSGraph) -> None:
-    Q = Queue()
+def _breadth_first_search(
+    start: Vertex, Adj: BFSGraph, trace: Trace = Trace.SNAPSHOTS
+) -> None:
+    Q: Deque[Vertex] = deque()
 
     initialize(start, Adj, Q)
 
-    ctx.get().called_with(start.id, None, _breadth_first_search, [start.key])
+    stepper = ctx.get() if trace else None
+    if stepper:
+        stepper.called_with(start.id, None, _breadth_first_search, [start.key])
 
-    while not Q.empty():
-        u = Q.get()
+    while Q:
+        u = Q.popleft()
 
         for v in Adj.neighbors_of(u):
             if not v.visited:
                 v.visited = True
-                v.color = NodeColor.VISITED.value
                 v.distance = u.distance + 1
                 v.parent = u
                 u.children.append(v)
-                ctx.get().called_with(v.id, u.id, _breadth_first_search, [v.key])
-                Q.put(v)
+                if stepper:
+                    v.color = NodeColor.VISITED.value
+                    stepper.called_with(v.id, u.id, _breadth_first_search, [v.key])
+                Q.append(v)
 
 
-def initialize(start: Vertex, Adj: BFSGraph, Q: Queue) -> None:
+def initialize(start: Vertex, Adj: BFSGraph, Q: Deque[Vertex]) -> None:
     for vertex in Adj.vertices:
         vertex.visited = False
         vertex.children = []
@@ -60,13 +69,109 @@ def initialize(start: Vertex, Adj: BFSGraph, Q: Queue) -> None:
     start.color = NodeColor.START_FROM.value
     start.distance = 0
 
-    Q.put(start)
-
-
-def breadth_first_search(start: Vertex, Adj: BFSGraph) -> GraphStepTree:
-    _, token = Stepper.run(_breadth_first_search, start, Adj)
-    tree = GraphStepTree.build(
-        ctx.get().called_with_subcalls, include_output=False, include_fn=False
-    )
-    ctx.reset(token)
-    return tree
+    Q.append(start)
+
+
+def breadth_first_search(
+    start: Vertex, Adj: BFSGraph, trace: Optional[Trace] = None
+) -> Optional[GraphStepTree]:
+    return run_traced(_breadth_first_search, trace, start, Adj)
+
+
+# Untraced BFS over vertex indexes. `distance[i]` and `parent[i]` refer to
+# `vertices[i]`; unreached vertices keep -1 in both.
+class BFSResult:
+    vertices: List[Any]
+    distance: array
+    parent: array
+
+    def __init__(self, vertices: List[Any], distance: array, parent: array):
+        self.vertices = vertices
+        self.distance = distance
+        self.parent = parent
+        self.index = {v: i for i, v in enumerate(vertices)}
+
+    def distance_of(self, v: Any) -> Optional[int]:
+        d = self.distance[self.index[v]]
+        return None if d < 0 else d
+
+    def path_to(self, v: Any) -> List[Any]:
+        i = self.index[v]
+        if self.distance[i] < 0:
+            return []
+        path = [i]
+        while self.parent[path[-1]] >= 0:
+            path.append(self.parent[path[-1]])
+        return [self.vertices[j] for j in reversed(path)]
+
+
+# Level-synchronous BFS from several sources at once. Following Beamer et al.,
+# a level is expanded bottom-up (every unvisited vertex looks for a parent in
+# the frontier) once the frontier's out-edges exceed 1/alpha of the edges left
+# to explore, and goes back top-down when the frontier shrinks below n/beta.
+# Undirected graphs can reuse the successor rows as predecessor rows.
+def fast_breadth_first_search(
+    sources: Iterable[Vertex],
+    Adj: Graph,
+    direction_optimizing: bool = True,
+    undirected: bool = False,
+    alpha: int = 14,
+    beta: int = 24,
+) -> BFSResult:
+    vertices = Adj.vertices
+    successors = Adj.successor_ids()
+    predecessors: Optional[List[Sequence[int]]] = successors if undirected else None
+    n = len(vertices)
+
+    index = {v: i for i, v in enumerate(vertices)}
+    distance = array("q", [-1]) * n
+    parent = array("q", [-1]) * n
+
+    frontier: List[int] = []
+    for s in sources:
+        i = index[s]
+        if distance[i] < 0:
+            distance[i] = 0
+            frontier.append(i)
+
+    unexplored = sum(map(len, successors)) - sum(len(successors[i]) for i in frontier)
+    level = 0
+    bottom_up = False
+
+    while frontier:
+        if direction_optimizing:
+            scout = sum(len(successors[i]) for i in frontier)
+            if not bottom_up and scout > unexplored / alpha:
+                bottom_up = True
+            elif bottom_up and len(frontier) < n / beta:
+                bottom_up = False
+
+        level += 1
+        nxt: List[int] = []
+
+        if bottom_up:
+            if predecessors is None:
+                predecessors = predecessor_ids(successors)
+            in_frontier = bytearray(n)
+            for i in frontier:
+                in_frontier[i] = 1
+            unvisited = [v for v in range(n) if distance[v] < 0]
+            for v in unvisited:
+                for u in predecessors[v]:
+                    if in_frontier[u]:
+                        distance[v] = level
+                        parent[v] = u
+                        nxt.append(v)
+                        break
+        else:
+            for u in frontier:
+                for v in successors[u]:
+                    if distance[v] < 0:
+                        distance[v] = level
+                        parent[v] = u
+                        nxt.append(v)
+
+        unexplored -= sum(len(successors[i]) for i in nxt)
+        frontier = nxt
+
+    return BFSResult(vertices, distance, parent)
@@ -0,0 +1,522 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+VertexIndex = int
+EdgeIndex = int
+CSREdge = Tuple[VertexIndex, VertexIndex, Dict[str, Any]]
+# Per-edge codes into a table of values; a negative code means "not set"
+Column = Tuple[Sequence, Sequence]
+# Builds vertex `i` and lists the (field, vertex index) references to fill in
+VertexFactory = Callable[[VertexIndex], Tuple[Any, List[Tuple[str, VertexIndex]]]]
+
+
+# Vertex list that builds each vertex on first access, for CSR arrays mapped
+# from disk. Vertex references are resolved with a worklist rather than
+# recursion, so long parent chains don't hit the recursion limit.
+class LazyVertices(Sequence):
+    factory: VertexFactory
+    cache: List[Any]
+    id_base: Optional[int]
+
+    def __init__(self, n: int, factory: VertexFactory):
+        self.factory = factory
+        self.cache = [None] * n
+        self.id_base = None
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        v = self.cache[i]
+        if v is not None:
+            return v
+
+        cache, pending, fill = self.cache, [i], []
+        while pending:
+            j = pending.pop()
+            if cache[j] is not None:
+                continue
+            w, refs = self.factory(j)
+            if self.id_base is not None:
+                w._id = self.id_base + j
+            cache[j] = w
+            for field, k in refs:
+                fill.append((w, field, k))
+                if cache[k] is None:
+                    pending.append(k)
+        for w, field, k in fill:
+            setattr(w, field, cache[k])
+        return cache[i]
+
+    def __iter__(self) -> Iterator:
+        for i in range(len(self.cache)):
+            yield self[i]
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+
+# Key -> vertex index for integer keys, by binary search over a sorted copy of
+# the keys instead of a dict. Iterates in vertex order.
+class SortedKeyIndex(Mapping):
+    def __init__(self, keys: Sequence, sorted_keys: Sequence, order: Sequence):
+        self.keys = keys
+        self.sorted_keys = sorted_keys
+        self.order = order
+
+    def __getitem__(self, key) -> VertexIndex:
+        if isinstance(key, int) and not isinstance(key, bool):
+            pos = bisect_left(self.sorted_keys, key)
+            if pos < len(self.sorted_keys) and self.sorted_keys[pos] == key:
+                return self.order[pos]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+# Compressed sparse row adjacency: the out-edges of vertex `i` are
+# `targets[offsets[i]:offsets[i + 1]]`, kept in insertion order. Weights live in
+# a typed array when every edge has one; other edge arguments are kept sparsely,
+# or as interned columns when the arrays come from a graph file. Edge lookup by
+# endpoints binary-searches a copy of each row sorted by target, built on first
+# use; `by_target[p]` is the edge id at sorted position `p`. `ranks[e]` is the
+# input position of edge `e` when the arrays were built from an edge list;
+# without it, positions stand in for input order.
+class CSR:
+    vertices: Sequence
+    index: Mapping
+    offsets: array
+    targets: array
+    weights: Optional[array]
+    edge_arguments: Dict[EdgeIndex, Dict[str, Any]]
+    columns: Dict[str, Column]
+    sorted_targets: Optional[array]
+    by_target: Optional[array]
+    ranks: Optional[array]
+
+    def __init__(
+        self,
+        vertices: Sequence,
+        offsets: array,
+        targets: array,
+        weights: Optional[array] = None,
+        edge_arguments: Optional[Dict[EdgeIndex, Dict[str, Any]]] = None,
+        index: Optional[Mapping] = None,
+        columns: Optional[Dict[str, Column]] = None,
+        ranks: Optional[array] = None,
+    ):
+        self.vertices = vertices
+        if index is None:
+            index = {v.key: i for i, v in enumerate(vertices)}
+        self.index = index
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.edge_arguments = edge_arguments or {}
+        self.columns = columns or {}
+        self.sorted_targets = None
+        self.by_target = None
+        self.ranks = ranks
+
+    @classmethod
+    def from_edges(cls, vertices: List[Any], edges: Iterable[CSREdge]) -> "CSR":
+        sources, targets = array("q"), array("q")
+        arguments: List[Dict[str, Any]] = []
+        for u, v, args in edges:
+            sources.append(u)
+            targets.append(v)
+            arguments.append(args)
+
+        n, m = len(vertices), len(targets)
+
+        offsets = array("q", [0]) * (n + 1)
+        for u in sources:
+            offsets[u + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        # Stable counting sort by source so each row keeps insertion order
+        order = array("q", [0]) * m
+        cursor = offsets[:-1]
+        for e, u in enumerate(sources):
+            order[cursor[u]] = e
+            cursor[u] += 1
+
+        weighted = m > 0 and all("weight" in arguments[e] for e in order)
+        weights = None
+        if weighted:
+            values = [arguments[e]["weight"] for e in order]
+            integral = all(
+                isinstance(w, int) and not isinstance(w, bool) for w in values
+            )
+            weights = array("q" if integral else "d", values)
+
+        edge_arguments: Dict[EdgeIndex, Dict[str, Any]] = {}
+        for position, e in enumerate(order):
+            args = arguments[e]
+            if weighted:
+                args = {k: v for k, v in args.items() if k != "weight"}
+            if args:
+                edge_arguments[position] = args
+
+        targets = array("q", (targets[e] for e in order))
+        share_reverse(offsets, targets, order, weights, edge_arguments)
+        return cls(vertices, offsets, targets, weights, edge_arguments, ranks=order)
+
+    # Bulk construction from parallel index arrays: one stable sort by source
+    # in NumPy instead of a per-edge argument dict.
+    @classmethod
+    def from_arrays(
+        cls,
+        vertices: List[Any],
+        sources: Any,
+        targets: Any,
+        weights: Optional[Any] = None,
+    ) -> "CSR":
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+        offsets = np.zeros(len(vertices) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(vertices)), out=offsets[1:])
+
+        def typed(values: Any, code: str) -> array:
+            a = array(code)
+            a.frombytes(np.ascontiguousarray(values).tobytes())
+            return a
+
+        sorted_weights = None
+        if weights is not None:
+            weights = np.asarray(weights)[order]
+            integral = np.issubdtype(weights.dtype, np.integer)
+            dtype, code = (np.int64, "q") if integral else (np.float64, "d")
+            sorted_weights = typed(weights.astype(dtype), code)
+
+        sorted_offsets = typed(offsets, "q")
+        sorted_targets = typed(np.asarray(targets, dtype=np.int64)[order], "q")
+        ranks = typed(order, "q")
+        share_reverse(sorted_offsets, sorted_targets, ranks, sorted_weights, {})
+        return cls(
+            vertices, sorted_offsets, sorted_targets, sorted_weights, ranks=ranks
+        )
+
+    def __len__(self) -> int:
+        return len(self.vertices)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def degree(self, i: VertexIndex) -> int:
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def neighbor_ids(self, i: VertexIndex) -> memoryview:
+        return memoryview(self.targets)[self.offsets[i] : self.offsets[i + 1]]
+
+    def edge_ids(self, i: VertexIndex) -> range:
+        return range(self.offsets[i], self.offsets[i + 1])
+
+    def source_of(self, e: EdgeIndex) -> VertexIndex:
+        return bisect_right(self.offsets, e) - 1
+
+    def before(self, e: EdgeIndex, f: EdgeIndex) -> bool:
+        ranks = self.ranks
+        return e < f if ranks is None else ranks[e] < ranks[f]
+
+    def sort_rows(self):
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        targets = np.frombuffer(self.targets, dtype=np.int64)
+        rows = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(offsets))
+        # Stable, so parallel edges keep insertion order and the first is found
+        order = np.lexsort((targets, rows))
+        self.sorted_targets = array("q", targets[order].tobytes())
+        self.by_target = array("q", order.tobytes())
+
+    def edge_id(self, i: VertexIndex, j: VertexIndex) -> Optional[EdgeIndex]:
+        if self.by_target is None:
+            self.sort_rows()
+        assert self.sorted_targets is not None and self.by_target is not None
+        hi = self.offsets[i + 1]
+        p = bisect_left(self.sorted_targets, j, self.offsets[i], hi)
+        if p < hi and self.sorted_targets[p] == j:
+            return self.by_target[p]
+        return None
+
+    def arguments_of(self, e: EdgeIndex) -> Dict[str, Any]:
+        args = dict(self.edge_arguments.get(e, {}))
+        for field, (codes, values) in self.columns.items():
+            code = codes[e]
+            if code >= 0:
+                args[field] = values[code]
+        if self.weights is not None:
+            args["weight"] = self.weights[e]
+        return args
+
+    def assign_ids(self, base: int):
+        if isinstance(self.vertices, LazyVertices):
+            self.vertices.id_base = base
+            return
+        for i, v in enumerate(self.vertices):
+            v._id = base + i
+
+    def transpose(self) -> "CSR":
+        return CSR.from_edges(
+            self.vertices,
+            (
+                (self.targets[e], i, self.arguments_of(e))
+                for i in range(len(self))
+                for e in self.edge_ids(i)
+            ),
+        )
+
+
+# Antiparallel edges share one edge object built from whichever direction came
+# first in the input, as in the dict-backed graph. The later direction's weight
+# and arguments are overwritten with the earlier one's, so the arrays agree with
+# that object. Rows must not repeat a target.
+def share_reverse(
+    offsets: array,
+    targets: array,
+    ranks: array,
+    weights: Optional[array],
+    edge_arguments: Dict[EdgeIndex, Dict[str, Any]],
+):
+    t = np.frombuffer(targets, dtype=np.int64)
+    n, m = len(offsets) - 1, len(t)
+    if m == 0:
+        return
+    rows = np.repeat(
+        np.arange(n, dtype=np.int64), np.diff(np.frombuffer(offsets, dtype=np.int64))
+    )
+    codes = rows * n + t
+    order = np.argsort(codes)
+    sorted_codes = codes[order]
+    wanted = t * n + rows
+    p = np.minimum(np.searchsorted(sorted_codes, wanted), m - 1)
+    reverse = order[p]
+    r = np.frombuffer(ranks, dtype=np.int64)
+    later = np.flatnonzero((sorted_codes[p] == wanted) & (r[reverse] < r))
+    if not len(later):
+        return
+
+    if weights is not None:
+        w = np.frombuffer(weights, dtype=np.dtype(weights.typecode))
+        w[later] = w[reverse[later]]
+    for e, f in zip(later.tolist(), reverse[later].tolist()):
+        if f in edge_arguments:
+            edge_arguments[e] = edge_arguments[f]
+        else:
+            edge_arguments.pop(e, None)
+
+
+class CSRNodes(Mapping):
+    def __init__(self, csr: CSR):
+        self.csr = csr
+
+    def __getitem__(self, key):
+        return self.csr.vertices[self.csr.index[key]]
+
+    def __contains__(self, key) -> bool:
+        return key in self.csr.index
+
+    def __iter__(self) -> Iterator:
+        return iter(self.csr.index)
+
+    def __len__(self) -> int:
+        return len(self.csr)
+
+    def values(self):
+        return self.csr.vertices
+
+
+# Read-only view of one row's neighbours, so lookups don't build a list
+class CSRRow(Sequence):
+    def __init__(self, csr: CSR, i: VertexIndex):
+        self.vertices = csr.vertices
+        self.ids = csr.neighbor_ids(i)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self.vertices[j] for j in self.ids[k]]
+        return self.vertices[self.ids[k]]
+
+    def __iter__(self) -> Iterator:
+        vertices = self.vertices
+        for j in self.ids:
+            yield vertices[j]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class CSRNeighbors(Mapping):
+    def __init__(self, csr: CSR):
+        self.csr = csr
+
+    def __getitem__(self, node) -> CSRRow:
+        return CSRRow(self.csr, self.csr.index[node.key])
+
+    def __iter__(self) -> Iterator:
+        return iter(self.csr.vertices)
+
+    def __len__(self) -> int:
+        return len(self.csr)
+
+
+# Edge objects are materialised on first access. Both directions of an
+# undirected edge share one object, as they do in the dict-backed graph; it is
+# built from whichever direction came first in the input (see `share_reverse`).
+class CSREdges:
+    csr: CSR
+    edge_cls: Callable[..., Any]
+    cache: Dict[EdgeIndex, Any]
+
+    def __init__(self, csr: CSR, edge_cls: Callable[..., Any]):
+        self.csr = csr
+        self.edge_cls = edge_cls
+        self.cache = {}
+
+    def edge(self, i: VertexIndex, e: EdgeIndex):
+        edge = self.cache.get(e)
+        if edge is not None:
+            return edge
+
+        csr = self.csr
+        j = csr.targets[e]
+        r = csr.edge_id(j, i)
+        if r is not None and r in self.cache:
+            edge = self.cache[r]
+        elif r is not None and csr.before(r, e):
+            edge = self.edge_cls(
+                csr.vertices[j], csr.vertices[i], **csr.arguments_of(r)
+            )
+            self.cache[r] = edge
+        else:
+            edge = self.edge_cls(
+                csr.vertices[i], csr.vertices[j], **csr.arguments_of(e)
+            )
+            if r is not None:
+                self.cache[r] = edge
+
+        self.cache[e] = edge
+        return edge
+
+    # (neighbour, edge) pairs of row `i`, without looking edges up by endpoint
+    def row(self, i: VertexIndex) -> Iterator[Tuple[Any, Any]]:
+        csr = self.csr
+        vertices, targets = csr.vertices, csr.targets
+        for e in csr.edge_ids(i):
+            yield vertices[targets[e]], self.edge(i, e)
+
+    def find(self, i: VertexIndex, j: VertexIndex):
+        e = self.csr.edge_id(i, j)
+        if e is None:
+            raise KeyError((i, j))
+        return self.edge(i, e)
+
+    def items(self) -> Iterator[Tuple[VertexIndex, VertexIndex, Any]]:
+        csr = self.csr
+        for i in range(len(csr)):
+            for e in csr.edge_ids(i):
+                yield i, csr.targets[e], self.edge(i, e)
+
+    def __len__(self) -> int:
+        return self.csr.edge_count
+
+
+class CSREdgeRow(Mapping):
+    def __init__(self, edges: CSREdges, i: VertexIndex):
+        self.edges = edges
+        self.i = i
+
+    def __getitem__(self, node):
+        csr = self.edges.csr
+        return self.edges.find(self.i, csr.index[node.key])
+
+    def __contains__(self, node) -> bool:
+        csr = self.edges.csr
+        j = csr.index.get(getattr(node, "key", None))
+        return j is not None and csr.edge_id(self.i, j) is not None
+
+    def __iter__(self) -> Iterator:
+        vertices = self.edges.csr.vertices
+        return (vertices[j] for j in dict.fromkeys(self.edges.csr.neighbor_ids(self.i)))
+
+    def __len__(self) -> int:
+        return len(set(self.edges.csr.neighbor_ids(self.i)))
+
+
+class CSREdgesByNodes(Mapping):
+    def __init__(self, edges: CSREdges):
+        self.edges = edges
+
+    def __getitem__(self, node) -> CSREdgeRow:
+        return CSREdgeRow(self.edges, self.edges.csr.index[node.key])
+
+    def __contains__(self, node) -> bool:
+        return getattr(node, "key", None) in self.edges.csr.index
+
+    def __iter__(self) -> Iterator:
+        return iter(self.edges.csr.vertices)
+
+    def __len__(self) -> int:
+        return len(self.edges.csr)
+
+
+class CSREdgesByCoords(Mapping):
+    def __init__(self, edges: CSREdges):
+        self.edges = edges
+
+    def __getitem__(self, coords):
+        index = self.edges.csr.index
+        u, v = coords
+        return self.edges.find(index[u], index[v])
+
+    def __iter__(self) -> Iterator:
+        vertices = self.edges.csr.vertices
+        for i, j, _ in self.edges.items():
+            yield (vertices[i].key, vertices[j].key)
+
+    def items(self):
+        vertices = self.edges.csr.vertices
+        for i, j, edge in self.edges.items():
+            yield (vertices[i].key, vertices[j].key), edge
+
+    def values(self):
+        for _, __, edge in self.edges.items():
+            yield edge
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+
+class CSREdgesByNodeCoords(Mapping):
+    def __init__(self, edges: CSREdges):
+        self.edges = edges
+
+    def __getitem__(self, coords):
+        index = self.edges.csr.index
+        u, v = coords
+        return self.edges.find(index[u.key], index[v.key])
+
+    def __iter__(self) -> Iterator:
+        vertices = self.edges.csr.vertices
+        for i, j, _ in self.edges.items():
+            yield (vertices[i], vertices[j])
+
+    def items(self):
+        vertices = self.edges.csr.vertices
+        for i, j, edge in self.edges.items():
+            yield (vertices[i], vertices[j]), edge
+
+    def values(self):
+        for _, __, edge in self.edges.items():
+            yield edge
+
+    def __len__(self) -> int:
+        return len(self.edges)
@@ -0,0 +1,128 @@
+from itertools import chain
+from typing import Dict, Generic, List, Optional
+
+from src.graph.graph import ED, KC, Graph, NodePlaceholder
+
+
+# Topological order kept up to date under edge insertion (Pearce & Kelly,
+# "A dynamic topological sort algorithm for directed acyclic graphs"). An edge
+# u -> v that already agrees with the order is just added. Otherwise only the
+# vertices between v and u in the order are searched: forward from v and
+# backward from u, and the two sets swap positions, backward set first. If the
+# forward search reaches u, the edge would close a cycle; it is rejected and
+# the cycle returned. Both searches stay inside the affected region, so a
+# check costs time in that region rather than in the whole graph.
+#
+# Vertices must be added and removed through this object so `slots` and
+# `position` stay in step with the graph, and edges must be added through it
+# so the order sees them. Removing an edge never invalidates an order, so
+# edge removals can go through either.
+class TopologicalOrder(Generic[KC, ED]):
+    graph: Graph[KC, ED]
+    position: Dict[KC, int]
+    slots: List[Optional[KC]]
+
+    def __init__(self, graph: Graph[KC, ED]):
+        self.graph = graph
+        vertices = graph.vertices
+        successors = graph.successor_ids()
+
+        # Kahn's algorithm for the initial order
+        indegree = [0] * len(vertices)
+        for row in successors:
+            for j in row:
+                indegree[j] += 1
+        ready = [i for i, d in enumerate(indegree) if d == 0]
+        order = []
+        while ready:
+            i = ready.pop()
+            order.append(i)
+            for j in successors[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    ready.append(j)
+        assert len(order) == len(vertices), "graph already contains a cycle"
+
+        self.slots = [vertices[i] for i in order]
+        self.position = {v: p for p, v in enumerate(self.slots)}
+
+    @property
+    def order(self) -> List[KC]:
+        return [v for v in self.slots if v is not None]
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    def before(self, u: KC, v: KC) -> bool:
+        return self.position[u] < self.position[v]
+
+    def add_node(self, key: NodePlaceholder, **kwargs) -> KC:
+        vertex = self.graph.add_node(key, **kwargs)
+        self.position[vertex] = len(self.slots)
+        self.slots.append(vertex)
+        return vertex
+
+    # Inserts u -> v and returns None, or leaves the graph unchanged and
+    # returns the cycle the edge would close: [u, v, ..., w] where w -> u.
+    # `reorder` alone makes room for the edge without inserting it.
+    def add_edge(self, u: KC, v: KC, **kwargs) -> Optional[List[KC]]:
+        cycle = self.reorder(u, v)
+        if cycle is None:
+            self.graph.add_edge(u, v, **kwargs)
+        return cycle
+
+    def reorder(self, u: KC, v: KC) -> Optional[List[KC]]:
+        if u is v:
+            return [u]
+        position = self.position
+        lower, upper = position[v], position[u]
+        if lower > upper:
+            return None
+
+        # Forward from v through vertices placed before u
+        parent: Dict[KC, Optional[KC]] = {v: None}
+        forward, stack = [v], [v]
+        while stack:
+            w = stack.pop()
+            for x in self.graph.neighbors_of(w):
+                if x is u:
+                    path: List[KC] = []
+                    y: Optional[KC] = w
+                    while y is not None:
+                        path.append(y)
+                        y = parent[y]
+                    return [u, *reversed(path)]
+                if x not in parent and position[x] < upper:
+                    parent[x] = w
+                    forward.append(x)
+                    stack.append(x)
+
+        # Backward from u through vertices placed after v
+        seen = {u}
+        backward, stack = [u], [u]
+        while stack:
+            w = stack.pop()
+            for x in self.graph.in_neighbors_of(w):
+                if x not in seen and position[x] > lower:
+                    seen.add(x)
+                    backward.append(x)
+                    stack.append(x)
+
+        forward.sort(key=position.__getitem__)
+        backward.sort(key=position.__getitem__)
+        affected = list(chain(backward, forward))
+        for w, p in zip(affected, sorted(position[w] for w in affected)):
+            position[w] = p
+            self.slots[p] = w
+        return None
+
+    def remove_edge(self, u: KC, v: KC) -> ED:
+        return self.graph.remove_edge(u, v)
+
+    def remove_node(self, v: KC):
+        self.graph.remove_node(v)
+        self.slots[self.position.pop(v)] = None
+        # Compact once at least half the slots are holes
+        if 2 * len(self.position) <= len(self.slots):
+            self.slots = self.order
+            self.position = {w: p for p, w in enumerate(self.slots)}
@@ -1,16 +1,24 @@
+from array import array
+from collections import defaultdict
 from contextvars import ContextVar, Token
-from typing import List, Optional, Type, TypeVar
+from typing import Dict, Iterator, List, Optional, Tuple, Type, TypeVar
 
 from src.graph.color import Color, NodeColor
 from src.graph.graph import ED, EdgeBase, Graph, NodePlaceholder, Renderer, VertexBase
-from src.graph.step import GraphStepTree
+from src.graph.scc import Condensation, condense
+from src.graph.step import GraphStepTree, Trace, run_traced
 from src.mermaid import Output
-from src.tree.step import Hash, Stepper, ctx
+from src.tree.step import Hash, ctx
 
 time_ctx = ContextVar("timer")
 
+# Cap on the placed-sets one layer of count_topological_sortings may hold.
+# Wide graphs have exponentially many, so past this the count is refused.
+MAX_COUNT_STATES = 1 << 20
+
 
 class DFSVertexBase(VertexBase):
+    __slots__ = ("start_time", "end_time", "distance", "visited", "parent")
     color: str
     start_time: Optional[int]
     end_time: Optional[int]
@@ -38,6 +46,7 @@ class DFSVertexBase(VertexBase):
 
 
 class Vertex(DFSVertexBase):
+    __slots__ = ()
     parent: Optional["Vertex"]
     visited: bool
     _blacklist = ["parent", "visited"]
@@ -71,6 +80,8 @@ class DFSGraphBase(Graph[DFS_KC, ED]):
         G = self.clone()
         dfs_visit_whole_graph_no_start(G)
 
+        # The second pass runs on a separate transposed graph so G keeps the
+        # times and parents of the first pass; only the colours are copied back
         H = self.transpose()
 
         trees = []
@@ -82,9 +93,13 @@ class DFSGraphBase(Graph[DFS_KC, ED]):
             if node.visited:
                 continue
 
-            node.color = colors.pop()
+            node.color = colors[-1 - len(trees) % len(colors)]
             node.visited = True
-            trees.append(dfs_visit(node, H, skip_time=True, color=node.color))
+            trees.append(
+                dfs_visit(
+                    node, H, skip_time=True, color=node.color, trace=Trace.STEPS
+                )
+            )
 
         for colored_node in H.vertices:
             node = G.node_by_key(colored_node.key)
@@ -93,22 +108,90 @@ class DFSGraphBase(Graph[DFS_KC, ED]):
 
         return G, H, trees
 
+    def condensation(self, colorize: bool = False) -> Condensation:
+        components = condense(self)
+        if colorize:
+            components.colorize()
+        return components
+
     @property
-    def topological_sortings(self):
-        if len(self.vertices) == 0:
+    def topological_sortings(self) -> Iterator[List[NodePlaceholder]]:
+        keys = [v.key for v in self.vertices]
+        successors = self.successor_ids()
+        n = len(keys)
+
+        if n == 0:
             yield []
             return
 
-        for v in self.vertices:
-            g = self.remove_node(v)
-            for ts in g.topological_sortings:
-                yield [v.key] + ts
-
-        return
+        in_degree = array("q", [0]) * n
+        for row in successors:
+            for j in row:
+                in_degree[j] += 1
+
+        ready = {i for i in range(n) if in_degree[i] == 0}
+        order: List[int] = []
+
+        def place(i: int):
+            ready.remove(i)
+            order.append(i)
+            for j in successors[i]:
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    ready.add(j)
+
+        def unplace():
+            i = order.pop()
+            for j in successors[i]:
+                if in_degree[j] == 0:
+                    ready.discard(j)
+                in_degree[j] += 1
+            ready.add(i)
+
+        # Backtracking Kahn's algorithm: each frame iterates over the vertices
+        # that were ready when it was opened
+        stack: List[Iterator[int]] = [iter(list(ready))]
+        while stack:
+            for i in stack[-1]:
+                place(i)
+                if len(order) == n:
+                    yield [keys[j] for j in order]
+                    unplace()
+                    continue
+                stack.append(iter(list(ready)))
+                break
+            else:
+                stack.pop()
+                if order:
+                    unplace()
 
     @property
-    def count_topological_sortings(self):
-        return len([sorting for sorting in self.topological_sortings])
+    def count_topological_sortings(self) -> int:
+        successors = self.successor_ids()
+        n = len(successors)
+
+        predecessors = [0] * n
+        for i, row in enumerate(successors):
+            for j in row:
+                predecessors[j] |= 1 << i
+
+        # Number of ways to order each placed-set (a bitmask closed under
+        # predecessors), built one vertex at a time; only one layer is kept
+        layer: Dict[int, int] = {0: 1}
+        for _ in range(n):
+            nxt: Dict[int, int] = defaultdict(int)
+            for placed, ways in layer.items():
+                for j in range(n):
+                    bit = 1 << j
+                    if not placed & bit and predecessors[j] & ~placed == 0:
+                        nxt[placed | bit] += ways
+                if len(nxt) > MAX_COUNT_STATES:
+                    raise ValueError(
+                        f"more than {MAX_COUNT_STATES} placed-sets in one layer"
+                    )
+            layer = nxt
+
+        return sum(layer.values())
 
     @property
     def render(self):
@@ -137,14 +220,14 @@ class DFSRenderer(Renderer):
 
         for idx in range(len(nodes) - 1, -1, -1):
             node = nodes[idx]
-            node_defs.add(f"{node.id}(({node.key}: {idx}))")
+            node_defs.add(f"v{node.id}(({node.key}: {idx}))")
 
         for idx in range(len(nodes) - 1, -1, -1):
             node = nodes[idx]
             neighbors = self.adj.neighbors_of(node)
 
             for neighbor in neighbors:
-                paths.add(f"{node.id} --> {neighbor.id}")
+                paths.add(f"v{node.id} --> v{neighbor.id}")
 
         items = [*paths]
         items.reverse()
@@ -179,34 +262,52 @@ def _dfs_visit(
     parent_id: Optional[Hash] = None,
     color: str = NodeColor.VISITED.value,
     skip_time: bool = False,
+    trace: Trace = Trace.SNAPSHOTS,
 ):
-    ctx.get().called_with(u.id, parent_id, _dfs_visit, [u.key])
-
-    u.visited = True
-
-    if not skip_time:
-        u.start_time = time_ctx.get().increment()
-
-    for v in Adj.neighbors_of(u):
-        if not v.visited:
-            v.color = color
-            assert u.distance is not None
-            v.distance = u.distance + 1
-            v.parent = u
-            Adj.take_snapshot()
-            _dfs_visit(v, Adj, u.id, color, skip_time)
-
-    if not skip_time:
-        u.end_time = time_ctx.get().increment()
-
-
-def dfs_visit(u: DFSVertexBase, Adj: DFSGraphBase, *args, **kwargs):
-    _, token = Stepper.run(_dfs_visit, u, Adj, *args, **kwargs)
-    tree = GraphStepTree.build(
-        ctx.get().called_with_subcalls, include_output=False, include_fn=False
-    )
-    ctx.reset(token)
-    return tree
+    stepper = ctx.get() if trace else None
+    timer = None if skip_time else time_ctx.get()
+
+    # Each frame holds a vertex and the iterator over its remaining neighbors,
+    # standing in for the call stack of the recursive formulation
+    stack: List[Tuple[Vertex, Iterator[Vertex]]] = []
+
+    def enter(u: Vertex, parent_id: Optional[Hash]):
+        if stepper:
+            stepper.called_with(u.id, parent_id, _dfs_visit, [u.key])
+        u.visited = True
+        if timer is not None:
+            u.start_time = timer.increment()
+        stack.append((u, iter(Adj.neighbors_of(u))))
+
+    enter(u, parent_id)
+
+    while stack:
+        u, neighbors = stack[-1]
+        for v in neighbors:
+            if not v.visited:
+                assert u.distance is not None
+                v.distance = u.distance + 1
+                v.parent = u
+                if stepper:
+                    v.color = color
+                if trace >= Trace.SNAPSHOTS:
+                    Adj.take_snapshot()
+                enter(v, u.id)
+                break
+        else:
+            stack.pop()
+            if timer is not None:
+                u.end_time = timer.increment()
+
+
+def dfs_visit(
+    u: DFSVertexBase,
+    Adj: DFSGraphBase,
+    *args,
+    trace: Optional[Trace] = None,
+    **kwargs,
+):
+    return run_traced(_dfs_visit, trace, u, Adj, *args, **kwargs)
 
 
 def dfs_visit_whole_graph(u: Vertex, Adj: DFSGraphBase, *args, **kwargs):
@@ -261,22 +362,21 @@ def initialize(s: Vertex, Adj: DFSGraphBase) -> None:
     s.color = NodeColor.START_FROM.value
 
 
-def _depth_first_search(start: Vertex, Adj: DFSGraphBase) -> None:
+def _depth_first_search(
+    start: Vertex, Adj: DFSGraphBase, trace: Trace = Trace.SNAPSHOTS
+) -> None:
     initialize(start, Adj)
-    _dfs_visit(start, Adj)
+    _dfs_visit(start, Adj, trace=trace)
 
 
 def depth_first_search(
     start: Vertex,
     Adj: Graph,
     timer: Optional[Timer] = None,
-) -> GraphStepTree:
+    trace: Optional[Trace] = None,
+) -> Optional[GraphStepTree]:
     _timer = timer or Timer(0)
-    _, token = Stepper.run(_depth_first_search, start, Adj)
-    tree = GraphStepTree.build(
-        ctx.get().called_with_subcalls, include_output=False, include_fn=False
-    )
-    ctx.reset(token)
+    tree = run_traced(_depth_first_search, trace, start, Adj)
     if timer is None:
         assert _timer is not None
         _timer.done()
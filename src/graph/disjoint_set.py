@@ -0,0 +1,43 @@
+from array import array
+
+
+# Disjoint-set forest over the integers 0..n-1 with union by rank and path
+# compression, giving near-constant amortised `find` and `union`.
+class DisjointSet:
+    parent: array
+    rank: array
+    count: int
+
+    def __init__(self, n: int):
+        self.parent = array("q", range(n))
+        self.rank = array("B", bytes(n))
+        self.count = n
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(self, i: int, j: int) -> bool:
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return False
+
+        rank = self.rank
+        if rank[i] < rank[j]:
+            i, j = j, i
+        self.parent[j] = i
+        if rank[i] == rank[j]:
+            rank[i] += 1
+        self.count -= 1
+        return True
+
+    def connected(self, i: int, j: int) -> bool:
+        return self.find(i) == self.find(j)
+
+    def __len__(self) -> int:
+        return len(self.parent)
@@ -0,0 +1,136 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.graph.graph import Graph, VertexBase
+
+ALGORITHM_FIELDS = (
+    "distance",
+    "parent",
+    "visited",
+    "start_time",
+    "end_time",
+    "color",
+)
+
+
+# Export helper: a struct-of-arrays copy of per-vertex algorithm state, for
+# analysis and DataFrame export. It is gathered on demand after a run. The
+# vertices stay the source of truth, algorithms never read the columns, and
+# changes only reach the vertices via `scatter`. Column `field[i]` belongs to
+# `vertices[i]`, the graph's vertex list at gather time. Each field is stored by
+# the kind of value it holds: ints as int64 and other numbers as float64, with
+# None marked in `missing[field]` when present; vertex references as int64
+# indexes with -1 for None; flags as bool; and strings such as colours as int32
+# codes into `labels[field]`.
+class VertexExport:
+    vertices: List[VertexBase]
+    index: Dict[VertexBase, int]
+    columns: Dict[str, np.ndarray]
+    kinds: Dict[str, str]
+    labels: Dict[str, List[str]]
+    missing: Dict[str, np.ndarray]
+
+    def __init__(self, vertices: List[VertexBase]):
+        self.vertices = vertices
+        self.index = {v: i for i, v in enumerate(vertices)}
+        self.columns = {}
+        self.kinds = {}
+        self.labels = {}
+        self.missing = {}
+
+    @classmethod
+    def gather(cls, G: Graph, *fields: str) -> "VertexExport":
+        store = cls(G.vertices)
+        if not fields and store.vertices:
+            first = store.vertices[0]
+            fields = tuple(f for f in ALGORITHM_FIELDS if hasattr(first, f))
+        for field in fields:
+            store.add(field, [getattr(v, field, None) for v in store.vertices])
+        return store
+
+    @staticmethod
+    def kind_of(values: List[Any]) -> str:
+        present = [x for x in values if x is not None]
+        if not present:
+            return "float"
+        if all(isinstance(x, VertexBase) for x in present):
+            return "vertex"
+        if all(isinstance(x, (bool, np.bool_)) for x in present):
+            return "bool"
+        if all(isinstance(x, (int, np.integer)) for x in present):
+            return "int"
+        if all(isinstance(x, (int, float, np.number)) for x in present):
+            return "float"
+        assert all(isinstance(x, str) for x in present), "unsupported field values"
+        return "label"
+
+    def add(self, field: str, values: List[Any]):
+        kind = self.kind_of(values)
+        self.missing.pop(field, None)
+        if kind == "vertex":
+            column = np.array(
+                [-1 if x is None else self.index[x] for x in values], dtype=np.int64
+            )
+        elif kind == "bool":
+            column = np.array([bool(x) for x in values], dtype=np.bool_)
+        elif kind in ("int", "float"):
+            missing = np.array([x is None for x in values], dtype=np.bool_)
+            if missing.any():
+                self.missing[field] = missing
+            column = np.array(
+                [0 if x is None else x for x in values],
+                dtype=np.int64 if kind == "int" else np.float64,
+            )
+        else:
+            labels = sorted({x for x in values if x is not None})
+            codes = {label: i for i, label in enumerate(labels)}
+            column = np.array(
+                [-1 if x is None else codes[x] for x in values], dtype=np.int32
+            )
+            self.labels[field] = labels
+        self.columns[field] = column
+        self.kinds[field] = kind
+
+    def value(self, field: str, i: int) -> Any:
+        x, kind = self.columns[field][i], self.kinds[field]
+        if kind == "vertex":
+            return None if x < 0 else self.vertices[x]
+        if kind == "bool":
+            return bool(x)
+        if kind == "label":
+            return None if x < 0 else self.labels[field][x]
+        missing = self.missing.get(field)
+        if missing is not None and missing[i]:
+            return None
+        return int(x) if kind == "int" else float(x)
+
+    def scatter(self, fields: Optional[Iterable[str]] = None):
+        for field in self.columns if fields is None else fields:
+            for i, v in enumerate(self.vertices):
+                setattr(v, field, self.value(field, i))
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field]
+
+    def __contains__(self, field: str) -> bool:
+        return field in self.columns
+
+    def __len__(self) -> int:
+        return len(self.vertices)
+
+    def to_frame(self) -> pd.DataFrame:
+        data: Dict[str, Any] = {}
+        for field, column in self.columns.items():
+            if self.kinds[field] == "label":
+                data[field] = pd.Categorical.from_codes(
+                    column, categories=self.labels[field]
+                )
+            elif field in self.missing:
+                dtype = "Int64" if self.kinds[field] == "int" else "Float64"
+                data[field] = pd.array(column, dtype=dtype)
+                data[field][self.missing[field]] = pd.NA
+            else:
+                data[field] = column
+        return pd.DataFrame(data, index=[v.key for v in self.vertices])
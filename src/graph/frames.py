@@ -0,0 +1,119 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+import matplotlib.pyplot as plt
+import networkx as nx
+
+from src.graph.graph import Graph, layouts, structure_key
+
+NX_GRAPHS = {
+    "graph": nx.Graph,
+    "digraph": nx.DiGraph,
+    "multigraph": nx.MultiGraph,
+    "multidigraph": nx.MultiDiGraph,
+}
+
+# Set in each worker by `_start_worker`
+_graph: Optional[Graph] = None
+
+
+def frame_path(directory: str, i: int, fmt: str) -> str:
+    return os.path.join(directory, f"frame_{i:05d}.{fmt}")
+
+
+def draw_frame(G: Graph, path: str, kind: str, dpi: int, kwargs: Dict[str, Any]):
+    fig = plt.figure()
+    getattr(G.render, kind)(show=False, **kwargs)
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+
+
+# Lays out each distinct topology among the snapshot checkpoints up front.
+# Structure only changes at a checkpoint, so workers never run a layout.
+def checkpoint_layouts(G: Graph, kind: str, seed: int) -> Dict[Any, Any]:
+    seeded = {}
+    for c in G.snapshots.checkpoint_ids:
+        S = G.snapshots.restore(c)
+        g = NX_GRAPHS[kind]()
+        g.add_nodes_from(v.key for v in S.vertices)
+        g.add_edges_from((u.key, v.key) for u, v in S._edge_from_node_coords)
+        seeded[(structure_key(g), seed)] = layouts.get(g, seed)
+    return seeded
+
+
+def _start_worker(graph_path: str, cls: Type[Graph], seeded: Dict[Any, Any]):
+    global _graph
+    from src.graph.graphfile import read_graph
+
+    plt.switch_backend("Agg")
+    layouts.layouts.update(seeded)
+    _graph = read_graph(graph_path, cls)
+
+
+def _draw_frames(
+    indices: Sequence[int],
+    directory: str,
+    fmt: str,
+    kind: str,
+    dpi: int,
+    kwargs: Dict[str, Any],
+) -> List[str]:
+    assert _graph is not None
+    paths = []
+    for i in indices:
+        path = frame_path(directory, i, fmt)
+        draw_frame(_graph.snapshots[i], path, kind, dpi, kwargs)
+        paths.append(path)
+    return paths
+
+
+# Draws snapshots to `directory` as frame_00000.png (or .svg, ...) without
+# showing them. Workers map a copy of the graph file rather than unpickling
+# the graph, and seek their own snapshots from it.
+def render_snapshots_to_files(
+    G: Graph,
+    directory: str,
+    fmt: str = "png",
+    kind: str = "graph",
+    indices: Optional[Sequence[int]] = None,
+    workers: Optional[int] = None,
+    dpi: int = 100,
+    chunks_per_worker: int = 4,
+    **kwargs,
+) -> List[str]:
+    os.makedirs(directory, exist_ok=True)
+    if indices is None:
+        indices = range(len(G.snapshots))
+    seeded = checkpoint_layouts(G, kind, kwargs.get("seed", 1111))
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(indices) < 2:
+        paths = []
+        for i in indices:
+            path = frame_path(directory, i, fmt)
+            draw_frame(G.snapshots[i], path, kind, dpi, kwargs)
+            paths.append(path)
+        return paths
+
+    step = max(1, -(-len(indices) // (workers * chunks_per_worker)))
+    with TemporaryDirectory(prefix="frames-") as tmp:
+        graph_path = os.path.join(tmp, "graph.gm")
+        G.save(graph_path)
+        with ProcessPoolExecutor(
+            workers, initializer=_start_worker, initargs=(graph_path, type(G), seeded)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _draw_frames,
+                    indices[s : s + step],
+                    directory,
+                    fmt,
+                    kind,
+                    dpi,
+                    kwargs,
+                )
+                for s in range(0, len(indices), step)
+            ]
+            return [path for future in futures for path in future.result()]
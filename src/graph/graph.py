@@ -1,11 +1,17 @@
-from collections import defaultdict
-from random import getrandbits
+import hashlib
+from collections import OrderedDict, defaultdict
+from enum import Enum
 from typing import (
     Any,
+    Callable,
     Dict,
     Generic,
+    Hashable,
+    Iterable,
+    Iterator,
     List,
     Optional,
+    Sequence,
     Tuple,
     Type,
     TypeAlias,
@@ -14,10 +20,24 @@ from typing import (
 
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
 import pandas as pd
+from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
 
 from src.display import Display
 from src.graph.color import Color, EdgeColor, NodeColor
+from src.graph.csr import (
+    CSR,
+    CSREdges,
+    CSREdgesByCoords,
+    CSREdgesByNodeCoords,
+    CSREdgesByNodes,
+    CSRNeighbors,
+    CSRNodes,
+)
+from src.graph.journal import SnapshotJournal
 
 T = TypeVar("T")
 U = TypeVar("U")
@@ -39,38 +59,148 @@ class NodeTemplate(Tuple[NodePlaceholder, NodeArguments]):
         return instance
 
     def __hash__(self):
-        return hash(f"{self[0]}")
+        return hash(self[0])
 
 
 BaseTemplate: TypeAlias = Dict[NodePlaceholder | NodeTemplate, List[EdgeTemplates]]
 
 
-class VertexBase:
+# Vertex ids are process-wide monotonic ints, so they never collide across
+# graphs. A graph reserves one contiguous block for its vertices, which keeps
+# `v.id - base` a dense index into that graph's vertex list.
+class IdAllocator:
+    next: int
+
+    def __init__(self):
+        self.next = 0
+
+    def reserve(self, count: int = 1) -> int:
+        base = self.next
+        self.next += count
+        return base
+
+
+vertex_ids = IdAllocator()
+
+
+# Shared base for vertices and edges. Fields a class declares live in
+# `__slots__`; anything else a template passes in goes to the instance dict,
+# which is only allocated when such extras exist. Writes are plain slot
+# assignment until a snapshot journal attaches: `track` then moves the record
+# to a subclass whose `__setattr__` reports each write, so untraced runs pay
+# nothing for journaling. The non-blacklisted slot names are resolved once per
+# class, so `values` doesn't re-filter every attribute.
+class Record:
+    __slots__ = ("_journal", "__dict__")
+    _journal: Optional[SnapshotJournal]
+    _default_blacklist: List[str] = []
+    _blacklist: List[str] = []
+
+    def __init__(self, **kwargs) -> None:
+        self._journal = None
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+        self.drop_empty_dict()
+
+    # CPython allocates instance-dict storage up front; release it when a
+    # record has no extras. It's recreated on demand by the next extra write.
+    def drop_empty_dict(self) -> Dict[str, Any]:
+        extra = self.__dict__
+        if not extra:
+            del self.__dict__
+        return extra
+
+    def track(self, journal: SnapshotJournal):
+        object.__setattr__(self, "_journal", journal)
+        object.__setattr__(self, "__class__", tracked_class(type(self)))
+
+    def untrack(self):
+        cls = type(self)
+        object.__setattr__(self, "_journal", None)
+        object.__setattr__(self, "__class__", cls.__dict__.get("_untracked", cls))
+
+    @classmethod
+    def value_fields(cls) -> Tuple[str, ...]:
+        fields = cls.__dict__.get("_value_fields")
+        if fields is None:
+            hidden = {*cls._blacklist, *cls._default_blacklist, "_journal", "__dict__"}
+            names = (
+                name
+                for c in reversed(cls.__mro__)
+                for name in c.__dict__.get("__slots__", ())
+                if name not in hidden
+            )
+            fields = tuple(dict.fromkeys(names))
+            setattr(cls, "_value_fields", fields)
+        return fields
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        values = {}
+        for k in self.value_fields():
+            value = getattr(self, k, _MISSING)
+            if value is not _MISSING:
+                values[k] = value
+        for k, value in self.drop_empty_dict().items():
+            if k not in self._blacklist and k not in self._default_blacklist:
+                values[k] = value
+        return values
+
+
+def journaled_setattr(self: Record, name: str, value: Any) -> None:
+    object.__setattr__(self, name, value)
+    self._journal.touch(self)
+
+
+# The journal-reporting twin of a record class. It adds no slots, so a record
+# can switch between the two by assigning `__class__`.
+def tracked_class(cls: type) -> type:
+    tracked = cls.__dict__.get("_tracked")
+    if tracked is None:
+        tracked = type(
+            cls.__name__,
+            (cls,),
+            {
+                "__slots__": (),
+                "__setattr__": journaled_setattr,
+                "__module__": cls.__module__,
+                "__qualname__": cls.__qualname__,
+                "_untracked": cls,
+            },
+        )
+        tracked._tracked = tracked
+        setattr(cls, "_tracked", tracked)
+    return tracked
+
+
+_MISSING = object()
+
+
+class VertexBase(Record):
+    __slots__ = ("key", "color", "_id")
     key: NodePlaceholder
     color: str
-    _id: Optional[str] = None
-    _default_blacklist: List[str] = ["key", "_id", "_blacklist", "_default_blacklist"]
+    _id: Optional[int]
+    _default_blacklist: List[str] = [
+        "key",
+        "_id",
+        "_journal",
+        "_blacklist",
+        "_default_blacklist",
+    ]
     _blacklist: List[str] = []
 
     def __init__(self, **kwargs) -> None:
-        self.color = NodeColor.DEFAULT.value
-        self.__dict__.update(kwargs)
+        object.__setattr__(self, "_id", None)
+        object.__setattr__(self, "color", NodeColor.DEFAULT.value)
+        super().__init__(**kwargs)
 
     @property
-    def id(self) -> str:
-        if not self._id:
-            self._id = hex(getrandbits(24))[2:]
+    def id(self) -> int:
+        if self._id is None:
+            self._id = vertex_ids.reserve()
         return self._id
 
-    @property
-    def values(self):
-        d = self.__dict__
-        return {
-            k: v
-            for k, v in d.items()
-            if k not in self._blacklist and k not in self._default_blacklist
-        }
-
     @property
     def to_template(self) -> NodeTemplate:
         return NodeTemplate((self.key, self.values))
@@ -79,28 +209,38 @@ class VertexBase:
 KC = TypeVar("KC", bound=VertexBase)
 
 
-class EdgeBase(Generic[KC]):
+class EdgeBase(Record, Generic[KC]):
+    __slots__ = ("u", "v", "color", "_hash", "_index")
+    u: KC
+    v: KC
     color: str
-    _default_blacklist: List[str] = ["u", "v", "_blacklist", "_default_blacklist"]
+    _hash: int
+    _index: Optional[int]
+    _default_blacklist: List[str] = [
+        "u",
+        "v",
+        "_hash",
+        "_index",
+        "_journal",
+        "_blacklist",
+        "_default_blacklist",
+    ]
     _blacklist: List[str] = []
 
     def __init__(self, u: KC, v: KC, **kwargs):
-        self.color = EdgeColor.LINE_DEFAULT.value
-        self.__dict__.update(kwargs)
+        object.__setattr__(self, "_index", None)
+        object.__setattr__(self, "color", EdgeColor.LINE_DEFAULT.value)
+        super().__init__(**kwargs)
         self.u = u
         self.v = v
+        self._hash = hash(frozenset((u.key, v.key)))
 
     def __hash__(self):
-        return hash("-".join(sorted([str(self.u.key), str(self.v.key)])))
+        return self._hash
 
     @property
-    def values(self):
-        d = self.__dict__
-        return {
-            k: v
-            for k, v in d.items()
-            if k not in self._blacklist and k not in self._default_blacklist
-        }
+    def id(self) -> Optional[int]:
+        return self._index
 
     @property
     def to_template(self) -> Tuple[EdgeTemplate, EdgeTemplate]:
@@ -115,6 +255,43 @@ class EdgeBase(Generic[KC]):
 ED = TypeVar("ED", bound=EdgeBase)
 
 
+# Deduplicated edge list. Each registered edge stores its position as `_index`,
+# which doubles as its integer id within the graph, so membership is a single
+# identity check and removal swaps the last edge into the freed slot.
+class EdgeRegistry(Generic[ED]):
+    edges: List[ED]
+
+    def __init__(self, edges: Iterable[ED] = ()):
+        self.edges = []
+        for edge in edges:
+            self.add(edge)
+
+    def __contains__(self, edge: ED) -> bool:
+        i = edge._index
+        return i is not None and i < len(self.edges) and self.edges[i] is edge
+
+    def add(self, edge: ED) -> int:
+        if edge not in self:
+            object.__setattr__(edge, "_index", len(self.edges))
+            self.edges.append(edge)
+        return edge._index
+
+    def remove(self, edge: ED):
+        assert edge in self, f"{edge.u.key}-{edge.v.key} is not registered"
+        i = edge._index
+        object.__setattr__(edge, "_index", None)
+        last = self.edges.pop()
+        if last is not edge:
+            object.__setattr__(last, "_index", i)
+            self.edges[i] = last
+
+    def __iter__(self) -> Iterator[ED]:
+        return iter(self.edges)
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+
 def build_attrs(x: Dict, *args: str) -> Dict[str, Any]:
     return {arg: x[arg] for arg in args if arg in x and x[arg] is not None}
 
@@ -126,17 +303,52 @@ EdgeFromCoordinatesMapping: TypeAlias = Dict[EdgeCoordinate, ED]
 EdgeFromNodeCoordinatesMapping: TypeAlias = Dict[Tuple[KC, KC], ED]
 
 
+def predecessor_ids(successors: List[Sequence[int]]) -> List[Sequence[int]]:
+    predecessors: List[Sequence[int]] = [[] for _ in successors]
+    for i, row in enumerate(successors):
+        for j in row:
+            predecessors[j].append(i)
+    return predecessors
+
+
+# Out-edges as int64 CSR arrays; zero-copy when the graph is stored as CSR
+def adjacency_arrays(G: Any) -> Tuple[np.ndarray, np.ndarray]:
+    csr = getattr(G, "csr", None)
+    if csr is not None:
+        offsets = np.frombuffer(csr.offsets, dtype=np.int64)
+        return offsets, np.frombuffer(csr.targets, dtype=np.int64)
+
+    successors = G.successor_ids()
+    lengths = np.fromiter(map(len, successors), dtype=np.int64, count=len(successors))
+    offsets = np.zeros(len(successors) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    targets = np.fromiter(
+        (j for row in successors for j in row), dtype=np.int64, count=offsets[-1]
+    )
+    return offsets, targets
+
+
 def from_edge_template(template: EdgeTemplates) -> EdgeTemplate:
     if isinstance(template, tuple) and len(template) == 3:
         return template
     return (template, {}, {})
 
 
+class Storage(Enum):
+    DICT = "dict"
+    CSR = "csr"
+
+
 class Graph(Generic[KC, ED]):
-    template: BaseTemplate
     vertex_cls: Type[KC]
     edge_cls: Type[ED]
-    snapshots: List["Graph[KC,ED]"]
+    snapshots: SnapshotJournal
+    csr: Optional[CSR]
+    id_base: int
+    _template: Optional[BaseTemplate]
+    _edges: Optional[EdgeRegistry[ED]]
+    _node_to_predecessors: Optional[Dict[KC, Dict[KC, None]]]
+    _predecessor_ids: Optional[List[Sequence[int]]]
 
     _node_mapping: NodeMapping[KC]
     _node_to_neighbors: NodeToNeighborsMapping[KC]
@@ -146,26 +358,60 @@ class Graph(Generic[KC, ED]):
 
     def __init__(
         self,
-        template: BaseTemplate,
-        node_mapping: NodeMapping = {},
-        node_to_neighbors: NodeToNeighborsMapping = {},
-        edge_from_nodes: EdgeFromNodesMapping = {},
-        edge_from_coords: EdgeFromCoordinatesMapping = {},
-        edge_from_node_coords: EdgeFromNodeCoordinatesMapping = {},
+        template: Optional[BaseTemplate],
+        node_mapping: Optional[NodeMapping] = None,
+        node_to_neighbors: Optional[NodeToNeighborsMapping] = None,
+        edge_from_nodes: Optional[EdgeFromNodesMapping] = None,
+        edge_from_coords: Optional[EdgeFromCoordinatesMapping] = None,
+        edge_from_node_coords: Optional[EdgeFromNodeCoordinatesMapping] = None,
+        csr: Optional[CSR] = None,
     ):
-        self.template = template
-        self._node_mapping = node_mapping
-        self._node_to_neighbors = node_to_neighbors
-        self._edge_from_nodes = edge_from_nodes
-        self._edge_from_coords = edge_from_coords
-        self._edge_from_node_coords = edge_from_node_coords
-        self.snapshots = []
+        # Fresh indexes per graph; shared default dicts would leak mutations
+        self._template = template
+        self._node_mapping = {} if node_mapping is None else node_mapping
+        self._node_to_neighbors = (
+            defaultdict(list) if node_to_neighbors is None else node_to_neighbors
+        )
+        self._edge_from_nodes = (
+            defaultdict(dict) if edge_from_nodes is None else edge_from_nodes
+        )
+        self._edge_from_coords = {} if edge_from_coords is None else edge_from_coords
+        self._edge_from_node_coords = (
+            {} if edge_from_node_coords is None else edge_from_node_coords
+        )
+        self.csr = csr
+        self._edges = None
+        self._node_to_predecessors = None
+        self._predecessor_ids = None
+        self.snapshots = SnapshotJournal(self)
+        self._assign_ids()
+
+    def _assign_ids(self):
+        self.id_base = vertex_ids.reserve(len(self._node_mapping))
+        if self.csr is not None:
+            self.csr.assign_ids(self.id_base)
+            return
+        for i, v in enumerate(self._node_mapping.values()):
+            v._id = self.id_base + i
+
+    @property
+    def template(self) -> BaseTemplate:
+        # Mutations drop the construction template; rebuild it on demand
+        if self._template is None:
+            self._template = self.to_template()
+        return self._template
+
+    @property
+    def storage(self) -> Storage:
+        return Storage.DICT if self.csr is None else Storage.CSR
 
     @classmethod
-    def from_template(cls, template: BaseTemplate):
+    def from_template(cls, template: BaseTemplate, storage: Storage = Storage.DICT):
         node_arguments: Dict[NodePlaceholder, NodeArguments] = {}
         edge_arguments: Dict[EdgeCoordinate, EdgeArguments] = defaultdict(dict)
 
+        # Keyed by endpoints, so a repeated (node, neighbor) pair is one edge
+        # with the arguments of its last occurrence, at the place of its first
         for node, edge_templates in template.items():
             if isinstance(node, tuple):
                 node, node_args = node
@@ -181,6 +427,15 @@ class Graph(Generic[KC, ED]):
         def to_vertex(n: NodePlaceholder):
             return cls.vertex_cls(**{"key": n, **node_arguments[n]})
 
+        if storage == Storage.CSR:
+            return cls.from_csr(
+                template,
+                CSR.from_edges(
+                    list(map(to_vertex, node_arguments.keys())),
+                    cls._csr_edges(node_arguments, edge_arguments),
+                ),
+            )
+
         node_mapping: NodeMapping[KC] = {
             v.key: v
             for v in map(
@@ -190,12 +445,8 @@ class Graph(Generic[KC, ED]):
         }
 
         node_to_neighbors: NodeToNeighborsMapping[KC] = defaultdict(list)
-        for node, edge_templates in template.items():
-            if isinstance(node, tuple):
-                node, _ = node
-            for edge_template in edge_templates:
-                neighbor, _, __ = from_edge_template(edge_template)
-                node_to_neighbors[node_mapping[node]].append(node_mapping[neighbor])
+        for node, neighbor in edge_arguments:
+            node_to_neighbors[node_mapping[node]].append(node_mapping[neighbor])
 
         edge_from_nodes: EdgeFromNodesMapping[KC, ED] = defaultdict(dict)
         edge_from_node_coords: EdgeFromNodeCoordinatesMapping[KC, ED] = {}
@@ -223,6 +474,51 @@ class Graph(Generic[KC, ED]):
             edge_from_node_coords,
         )
 
+    @classmethod
+    def from_edge_list(cls, path: str, **kwargs):
+        from src.graph.loaders import read_edge_list
+
+        return read_edge_list(cls, path, **kwargs)
+
+    @classmethod
+    def from_edge_binary(cls, path: str, **kwargs):
+        from src.graph.loaders import read_edge_binary
+
+        return read_edge_binary(cls, path, **kwargs)
+
+    @classmethod
+    def load(cls, path: str, **kwargs):
+        from src.graph.graphfile import read_graph
+
+        return read_graph(path, cls, **kwargs)
+
+    def save(self, path: str):
+        from src.graph.graphfile import write_graph
+
+        write_graph(self, path)
+
+    @staticmethod
+    def _csr_edges(
+        node_arguments: Dict[NodePlaceholder, NodeArguments],
+        edge_arguments: Dict[EdgeCoordinate, EdgeArguments],
+    ):
+        index = {n: i for i, n in enumerate(node_arguments.keys())}
+        for (node, neighbor), args in edge_arguments.items():
+            yield index[node], index[neighbor], args
+
+    @classmethod
+    def from_csr(cls, template: Optional[BaseTemplate], csr: CSR):
+        edges = CSREdges(csr, cls.edge_cls)
+        return cls(
+            template,
+            CSRNodes(csr),
+            CSRNeighbors(csr),
+            CSREdgesByNodes(edges),
+            CSREdgesByCoords(edges),
+            CSREdgesByNodeCoords(edges),
+            csr,
+        )
+
     def to_template(self):
         t: BaseTemplate = defaultdict(list)
 
@@ -245,7 +541,7 @@ class Graph(Generic[KC, ED]):
         return t
 
     def clone(self):
-        return self.from_template(self.to_template())
+        return self.from_template(self.to_template(), self.storage)
 
     def node_by_key(self, key: NodePlaceholder) -> KC:
         assert key in self._node_mapping, f"Node '{key}' not found"
@@ -261,7 +557,13 @@ class Graph(Generic[KC, ED]):
         ]
 
     def nodes_with_attrs(self, *args: str) -> List[Tuple[Any, Optional[Any]]]:
-        return [(node.key, build_attrs(node.__dict__, *args)) for node in self.vertices]
+        return [
+            (
+                node.key,
+                build_attrs({arg: getattr(node, arg, None) for arg in args}, *args),
+            )
+            for node in self.vertices
+        ]
 
     @property
     def vertices(self) -> List[KC]:
@@ -274,6 +576,35 @@ class Graph(Generic[KC, ED]):
     def neighbors_of(self, node: KC) -> List[KC]:
         return self._node_to_neighbors[node]
 
+    # (neighbour, edge) for each out-edge; CSR rows hand over the edge by
+    # position instead of looking it up by its endpoints
+    def neighbor_edges_of(self, node: KC) -> Iterator[Tuple[KC, ED]]:
+        if self.csr is not None:
+            edges: CSREdgesByNodes = self._edge_from_nodes  # type: ignore
+            return edges.edges.row(self.csr.index[node.key])
+        row = self._edge_from_nodes[node]
+        return ((v, row[v]) for v in self._node_to_neighbors[node])
+
+    def successor_ids(self) -> List[Sequence[int]]:
+        if self.csr is not None:
+            targets, offsets = memoryview(self.csr.targets), self.csr.offsets
+            return [targets[offsets[i] : offsets[i + 1]] for i in range(len(self.csr))]
+
+        vertices = self.vertices
+        index = {v: i for i, v in enumerate(vertices)}
+        return [[index[w] for w in self.neighbors_of(v)] for v in vertices]
+
+    def in_neighbors_of(self, node: KC) -> List[KC]:
+        return list(self._predecessors()[node])
+
+    def predecessor_ids(self) -> List[Sequence[int]]:
+        if self._predecessor_ids is None:
+            self._predecessor_ids = predecessor_ids(self.successor_ids())
+        return self._predecessor_ids
+
+    def transposed_view(self) -> "TransposedView[KC, ED]":
+        return TransposedView(self)
+
     @property
     def edges_by_nodes(self) -> EdgeFromNodesMapping[KC, ED]:
         return self._edge_from_nodes
@@ -281,9 +612,16 @@ class Graph(Generic[KC, ED]):
     def edges_by_node_coords(self, u: KC, v: KC) -> ED:
         return self._edge_from_node_coords[(u, v)]
 
+    @property
+    def edge_registry(self) -> EdgeRegistry[ED]:
+        # Built on first use so CSR graphs only materialise edges when asked
+        if self._edges is None:
+            self._edges = EdgeRegistry(self._edge_from_coords.values())
+        return self._edges
+
     @property
     def edges(self) -> List[ED]:
-        return list(set(self._edge_from_coords.values()))
+        return list(self.edge_registry.edges)
 
     def transpose(self):
         t: BaseTemplate = defaultdict(list)
@@ -327,45 +665,162 @@ class Graph(Generic[KC, ED]):
             if template not in t:
                 t[template] = []
 
-        return self.from_template(t)
+        return self.from_template(t, self.storage)
 
     @property
     def render(self):
         return Renderer(self)
 
-    def remove_node(self, v: KC):
-        t = self.to_template()
-        u: BaseTemplate = defaultdict(list)
+    def render_snapshots_to_files(self, directory: str, **kwargs) -> List[str]:
+        from src.graph.frames import render_snapshots_to_files
 
-        for node, edge_templates in t.items():
-            node_args = {}
-            if isinstance(node, tuple):
-                node, node_args = node
+        return render_snapshots_to_files(self, directory, **kwargs)
 
-            if node == v.key:
-                continue
+    # In-place mutation. Each call updates every index in O(degree of the
+    # touched vertices). CSR storage is immutable, so the first mutation moves a
+    # CSR-backed graph onto dict indexes that keep the same vertex and edge
+    # objects. Removing a vertex needs its in-edges, so the first removal builds
+    # a predecessor index (shared with `in_neighbors_of`) that later mutations
+    # keep up to date.
+    def thaw(self):
+        if self.csr is None:
+            return
 
-            for edge in edge_templates:
-                neighbor, edge_args, neighbor_node_args = from_edge_template(edge)
+        node_mapping = dict(self._node_mapping.items())
+        node_to_neighbors: NodeToNeighborsMapping[KC] = defaultdict(list)
+        edge_from_nodes: EdgeFromNodesMapping[KC, ED] = defaultdict(dict)
+        edge_from_coords: EdgeFromCoordinatesMapping[ED] = {}
+        edge_from_node_coords: EdgeFromNodeCoordinatesMapping[KC, ED] = {}
 
-                if neighbor == v.key:
-                    continue
+        for (u, v), edge in self._edge_from_node_coords.items():
+            node_to_neighbors[u].append(v)
+            edge_from_nodes[u][v] = edge
+            edge_from_coords[(u.key, v.key)] = edge
+            edge_from_node_coords[(u, v)] = edge
 
-                u[NodeTemplate((node, node_args))].append(
-                    (node, edge_args, neighbor_node_args)
-                )
+        self._node_mapping = node_mapping
+        self._node_to_neighbors = node_to_neighbors
+        self._edge_from_nodes = edge_from_nodes
+        self._edge_from_coords = edge_from_coords
+        self._edge_from_node_coords = edge_from_node_coords
+        self.csr = None
+
+    def _predecessors(self) -> Dict[KC, Dict[KC, None]]:
+        if self._node_to_predecessors is None:
+            vertices = self.vertices
+            predecessors: Dict[KC, Dict[KC, None]] = {v: {} for v in vertices}
+            for i, row in enumerate(self.successor_ids()):
+                for j in row:
+                    predecessors[vertices[j]][vertices[i]] = None
+            self._node_to_predecessors = predecessors
+        return self._node_to_predecessors
+
+    def _mutated(self):
+        self._template = None
+        self._predecessor_ids = None
+
+    def add_node(self, key: NodePlaceholder, **kwargs) -> KC:
+        assert key not in self._node_mapping, f"Node '{key}' already exists"
+        self.thaw()
+        vertex = self.vertex_cls(**{"key": key, **kwargs})
+        self._node_mapping[key] = vertex
+        if self._node_to_predecessors is not None:
+            self._node_to_predecessors[vertex] = {}
+        self.snapshots.add(vertex)
+        self._mutated()
+        return vertex
+
+    def add_edge(self, u: KC, v: KC, undirected: bool = False, **kwargs) -> ED:
+        assert u.key in self._node_mapping, f"Node '{u.key}' not found"
+        assert v.key in self._node_mapping, f"Node '{v.key}' not found"
+        assert (u, v) not in self._edge_from_node_coords, (
+            f"Edge '{u.key}' -> '{v.key}' already exists"
+        )
+        self.thaw()
+
+        # The reverse direction of an undirected edge shares its object
+        edge = self._edge_from_node_coords.get((v, u))
+        if edge is None:
+            edge = self.edge_cls(u, v, **kwargs)
+            if self._edges is not None:
+                self._edges.add(edge)
+            self.snapshots.add(edge)
+
+        for a, b in [(u, v), (v, u)] if undirected and u is not v else [(u, v)]:
+            self._node_to_neighbors[a].append(b)
+            self._edge_from_nodes[a][b] = edge
+            self._edge_from_coords[(a.key, b.key)] = edge
+            self._edge_from_node_coords[(a, b)] = edge
+            if self._node_to_predecessors is not None:
+                self._node_to_predecessors[b][a] = None
+
+        self._mutated()
+        return edge
+
+    def remove_edge(self, u: KC, v: KC, undirected: bool = False) -> ED:
+        assert (u, v) in self._edge_from_node_coords, (
+            f"Edge '{u.key}' -> '{v.key}' not found"
+        )
+        self.thaw()
+
+        edge = self._edge_from_node_coords[(u, v)]
+        removed = []
+        for a, b in [(u, v), (v, u)] if undirected else [(u, v)]:
+            if (a, b) not in self._edge_from_node_coords:
+                continue
+            removed.append(self._edge_from_node_coords.pop((a, b)))
+            del self._edge_from_coords[(a.key, b.key)]
+            del self._edge_from_nodes[a][b]
+            self._node_to_neighbors[a] = [
+                w for w in self._node_to_neighbors[a] if w is not b
+            ]
+            if self._node_to_predecessors is not None:
+                self._node_to_predecessors[b].pop(a, None)
+
+        coords = self._edge_from_node_coords
+        for e in dict.fromkeys(removed):
+            if coords.get((e.u, e.v)) is not e and coords.get((e.v, e.u)) is not e:
+                if self._edges is not None:
+                    self._edges.remove(e)
+                self.snapshots.remove(e)
+
+        self._mutated()
+        return edge
+
+    def remove_node(self, v: KC):
+        assert self._node_mapping.get(v.key) is v, f"Node '{v.key}' not found"
+        self.thaw()
+
+        for w in list(self._edge_from_nodes.get(v, {})):
+            self.remove_edge(v, w)
+        for u in list(self._predecessors()[v]):
+            self.remove_edge(u, v)
 
-        return self.from_template(u)
+        del self._node_mapping[v.key]
+        self._node_to_neighbors.pop(v, None)
+        self._edge_from_nodes.pop(v, None)
+        self._predecessors().pop(v)
+        self.snapshots.remove(v)
+        self._mutated()
+        return self
 
-    def take_snapshot(self):
-        snapshot = self.clone()
-        self.snapshots.append(snapshot)
-        return snapshot
+    def take_snapshot(self) -> int:
+        return self.snapshots.record()
 
     @property
     def to_matrix(self):
         return AdjacencyMatrix(self)
 
+    def export_vertices(self, *fields: str):
+        from src.graph.export import VertexExport
+
+        return VertexExport.gather(self, *fields)
+
+    def topological_order(self):
+        from src.graph.dag import TopologicalOrder
+
+        return TopologicalOrder(self)
+
     def is_cyclic(self, directed=True) -> bool:
         visited = set()  # Set to keep track of visited vertices
         rec_stack = set()  # Set to keep track of the recursion stack
@@ -374,30 +829,34 @@ class Graph(Generic[KC, ED]):
         if directed:
             cycle_check = lambda x, _: x in rec_stack
 
-        # Helper function for DFS
-        def is_cyclic_util(v: KC, parent: Optional[KC]):
-            visited.add(v)
-            if directed:
-                rec_stack.add(v)
+        # Check each vertex in the graph, walking depth first with an explicit
+        # stack of (vertex, parent, remaining neighbors) frames
+        for vertex in self.vertices:
+            if vertex in visited:
+                continue
 
-            # Check all the neighbors of vertex v
-            for neighbor in self.neighbors_of(v):
-                if neighbor not in visited:
-                    if is_cyclic_util(neighbor, v):
-                        return True
-                elif cycle_check(neighbor, parent):
-                    # Directed: Found a back edge, graph is cyclic
-                    # Undirected: If the neighbor is visited and is not the parent of the current vertex, a cycle is found
-                    return True
+            visited.add(vertex)
             if directed:
-                rec_stack.remove(v)
-            return False
-
-        # Check each vertex in the graph
-        for vertex in self.vertices:
-            if vertex not in visited:
-                if is_cyclic_util(vertex, None):
-                    return True
+                rec_stack.add(vertex)
+            stack = [(vertex, None, iter(self.neighbors_of(vertex)))]
+
+            while stack:
+                v, parent, neighbors = stack[-1]
+                for neighbor in neighbors:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        if directed:
+                            rec_stack.add(neighbor)
+                        stack.append((neighbor, v, iter(self.neighbors_of(neighbor))))
+                        break
+                    elif cycle_check(neighbor, parent):
+                        # Directed: Found a back edge, graph is cyclic
+                        # Undirected: If the neighbor is visited and is not the parent of the current vertex, a cycle is found
+                        return True
+                else:
+                    stack.pop()
+                    if directed:
+                        rec_stack.remove(v)
 
         return False
 
@@ -420,6 +879,73 @@ class Graph(Generic[KC, ED]):
 G = TypeVar("G", bound=Graph)
 
 
+# Zero-copy reverse of a graph: the same vertex and edge objects, traversed
+# along in-edges through the graph's predecessor index. Mutating the graph
+# keeps the view current.
+class TransposedView(Generic[KC, ED]):
+    graph: Graph[KC, ED]
+
+    def __init__(self, graph: Graph[KC, ED]):
+        self.graph = graph
+
+    @property
+    def vertices(self) -> List[KC]:
+        return self.graph.vertices
+
+    @property
+    def nodes(self) -> List[KC]:
+        return self.graph.vertices
+
+    @property
+    def edges(self) -> List[ED]:
+        return self.graph.edges
+
+    @property
+    def storage(self) -> Storage:
+        return self.graph.storage
+
+    def node_by_key(self, key: NodePlaceholder) -> KC:
+        return self.graph.node_by_key(key)
+
+    def neighbors_of(self, node: KC) -> List[KC]:
+        return self.graph.in_neighbors_of(node)
+
+    def in_neighbors_of(self, node: KC) -> List[KC]:
+        return self.graph.neighbors_of(node)
+
+    def neighbor_edges_of(self, node: KC) -> Iterator[Tuple[KC, ED]]:
+        edges = self.graph.edges_by_node_coords
+        return ((u, edges(u, node)) for u in self.graph.in_neighbors_of(node))
+
+    def successor_ids(self) -> List[Sequence[int]]:
+        return self.graph.predecessor_ids()
+
+    def predecessor_ids(self) -> List[Sequence[int]]:
+        return self.graph.successor_ids()
+
+    def edges_by_node_coords(self, u: KC, v: KC) -> ED:
+        return self.graph.edges_by_node_coords(v, u)
+
+    def transposed_view(self) -> Graph[KC, ED]:
+        return self.graph
+
+    def take_snapshot(self) -> int:
+        return self.graph.take_snapshot()
+
+    def nodes_with_attrs(self, *args: str) -> List[Tuple[Any, Optional[Any]]]:
+        return self.graph.nodes_with_attrs(*args)
+
+    def edges_with_attrs(
+        self,
+        *args: str,
+    ) -> List[Tuple[NodePlaceholder, NodePlaceholder, Optional[Dict]]]:
+        return [(v, u, attrs) for u, v, attrs in self.graph.edges_with_attrs(*args)]
+
+    @property
+    def render(self):
+        return Renderer(self)
+
+
 class GraphBase(Graph[VertexBase, EdgeBase]):
     vertex_cls: Type[VertexBase] = VertexBase
     edge_cls: Type[EdgeBase] = EdgeBase
@@ -427,9 +953,10 @@ class GraphBase(Graph[VertexBase, EdgeBase]):
 
 class AdjacencyMatrix(Generic[KC, ED]):
     adj: Graph[KC, ED]
-    matrix: Dict[NodePlaceholder, List[NodePlaceholder]]
     rows: List[NodePlaceholder]
     columns: List[NodePlaceholder]
+    _coordinates: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    _matrix: Optional[Dict[NodePlaceholder, List[int]]] = None
 
     def __init__(self, adj: Graph[KC, ED]):
         self.adj = adj
@@ -439,27 +966,89 @@ class AdjacencyMatrix(Generic[KC, ED]):
 
         self.rows = self.columns = list(sorted(keys))
 
-        matrix = defaultdict(list)
-
-        for row in self.rows:
-            for column in self.columns:
-                t_row = self.adj.template[row]
-                if len(t_row) == 0:
-                    matrix[row].append(0)
-                    continue
-
-                if isinstance(t_row[0], tuple):
-                    t_row = [t[0] for t in t_row]
-
-                if isinstance(column, tuple):
-                    column = column[0]
-
-                if column in t_row:
-                    matrix[row].append(1)
-                else:
-                    matrix[row].append(0)
+    @property
+    def coordinates(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._coordinates is not None:
+            return self._coordinates
+
+        n = len(self.adj.vertices)
+        csr = self.adj.csr
+        if csr is not None:
+            targets = np.frombuffer(csr.targets, dtype=np.int64)
+            lengths = np.diff(np.frombuffer(csr.offsets, dtype=np.int64))
+        else:
+            successors = self.adj.successor_ids()
+            targets = np.fromiter(
+                (j for row in successors for j in row), dtype=np.int64
+            )
+            lengths = np.fromiter(map(len, successors), dtype=np.int64, count=n)
+        sources = np.repeat(np.arange(n, dtype=np.int64), lengths)
+
+        # Vertex index -> row position; vertices that are not rows map to -1
+        position = np.full(n, -1, dtype=np.int64)
+        index = {v.key: i for i, v in enumerate(self.adj.vertices)}
+        for row, key in enumerate(self.rows):
+            if key in index:
+                position[index[key]] = row
+
+        u, v = position[sources], position[targets]
+        keep = (u >= 0) & (v >= 0)
+        pairs = np.unique(np.stack([u[keep], v[keep]]), axis=1)
+        self._coordinates = (pairs[0], pairs[1])
+        return self._coordinates
+
+    def to_numpy(self, dtype=np.int64) -> np.ndarray:
+        n = len(self.rows)
+        u, v = self.coordinates
+        A = np.zeros((n, n), dtype=dtype)
+        A[u, v] = 1
+        return A
+
+    def to_sparse(self):
+        from scipy.sparse import csr_array
+
+        n = len(self.rows)
+        u, v = self.coordinates
+        return csr_array((np.ones(len(u), dtype=np.int64), (u, v)), shape=(n, n))
 
-        self.matrix = matrix
+    @property
+    def matrix(self) -> Dict[NodePlaceholder, List[int]]:
+        if self._matrix is None:
+            A = self.to_numpy()
+            self._matrix = {row: A[i].tolist() for i, row in enumerate(self.rows)}
+        return self._matrix
+
+    def out_degrees(self) -> np.ndarray:
+        return np.bincount(self.coordinates[0], minlength=len(self.rows))
+
+    def in_degrees(self) -> np.ndarray:
+        return np.bincount(self.coordinates[1], minlength=len(self.rows))
+
+    def walk_counts(self, k: int, sparse: bool = False):
+        assert k >= 0
+        if not sparse:
+            return np.linalg.matrix_power(self.to_numpy(), k)
+
+        A = self.to_sparse()
+        W = A.__class__(np.eye(len(self.rows), dtype=np.int64))
+        # Square-and-multiply keeps it to O(log k) sparse products
+        while k:
+            if k & 1:
+                W = W @ A
+            A = A @ A
+            k >>= 1
+        return W
+
+    def transitive_closure(self) -> np.ndarray:
+        # R[i, j] holds when j is reachable from i by a path of length >= 1;
+        # each squaring doubles the path lengths covered, so O(log V) products
+        R = self.to_numpy(dtype=np.float32) > 0
+        while True:
+            F = R.astype(np.float32)
+            closure = R | ((F @ F) > 0)
+            if (closure == R).all():
+                return R
+            R = closure
 
     def __str__(self) -> str:
         return self.to_grid()
@@ -491,10 +1080,281 @@ class AdjacencyMatrix(Generic[KC, ED]):
         return Display.md(self.to_grid())
 
 
+def structure_key(g: nx.Graph) -> Hashable:
+    edges = g.edges if g.is_directed() else map(frozenset, g.edges)
+    return (g.is_directed(), frozenset(g.nodes), frozenset(edges))
+
+
+# Layouts keyed by node and edge sets rather than object identity, so every
+# snapshot of one topology is laid out once and keeps the same positions.
+# Least recently used layouts are dropped past `size`.
+class LayoutCache:
+    layouts: OrderedDict[Hashable, Dict[Any, Any]]
+    size: int
+
+    def __init__(self, size: int = 32):
+        self.layouts = OrderedDict()
+        self.size = size
+
+    def get(self, g: nx.Graph, seed: int) -> Dict[Any, Any]:
+        return self.lookup(
+            (structure_key(g), seed), lambda: nx.spring_layout(g, seed=seed)
+        )
+
+    def lookup(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        pos = self.layouts.get(key)
+        if pos is not None:
+            self.layouts.move_to_end(key)
+            return pos
+        pos = self.layouts[key] = compute()
+        if len(self.layouts) > self.size:
+            self.layouts.popitem(last=False)
+        return pos
+
+
+layouts = LayoutCache()
+
+# Above this many vertices `nx.spring_layout` (O(V^2) per iteration) gives way
+# to `pivot_layout`
+SPRING_LAYOUT_LIMIT = 2000
+
+
+# Pivot MDS (Brandes & Pich) of one connected component: BFS distances from
+# `pivots` far-apart vertices, double-centred, projected onto their top two
+# singular vectors. O(pivots * (V + E)).
+def pivot_mds(A: Any, pivots: int, rng: np.random.Generator) -> np.ndarray:
+    from scipy.sparse.csgraph import shortest_path
+
+    n = A.shape[0]
+    k = min(pivots, n)
+    D = np.empty((k, n))
+    nearest = np.full(n, np.inf)
+    p = int(rng.integers(n))
+    for i in range(k):
+        D[i] = shortest_path(A, directed=False, unweighted=True, indices=p)
+        nearest = np.minimum(nearest, D[i])
+        p = int(np.argmax(nearest))
+
+    C = D**2
+    C = -0.5 * (C - C.mean(axis=1, keepdims=True) - C.mean(axis=0) + C.mean())
+    _, S, Vt = np.linalg.svd(C, full_matrices=False)
+    return Vt[:2].T * S[:2]
+
+
+# Layout for graphs too large for `nx.spring_layout`. Components are laid out
+# separately (pivot MDS, or a circle when tiny), scaled to the square root of
+# their size and shelf-packed largest first. Normalised to the unit square.
+def pivot_layout(
+    sources: np.ndarray,
+    targets: np.ndarray,
+    n: int,
+    seed: int = 1111,
+    pivots: int = 50,
+    small: int = 8,
+) -> np.ndarray:
+    from scipy.sparse import csr_array
+    from scipy.sparse.csgraph import connected_components
+
+    rng = np.random.default_rng(seed)
+    A = csr_array((np.ones(len(sources)), (sources, targets)), shape=(n, n))
+    count, labels = connected_components(A, directed=False)
+    order = np.argsort(labels, kind="stable")
+    bounds = np.searchsorted(labels[order], np.arange(count + 1))
+    sizes = np.diff(bounds)
+
+    xy = np.zeros((n, 2))
+    width = 1.5 * np.sqrt(n)
+    x = y = row = 0.0
+    for c in np.argsort(-sizes, kind="stable").tolist():
+        members = order[bounds[c] : bounds[c + 1]]
+        size = len(members)
+        if size > small:
+            local = pivot_mds(A[members][:, members], pivots, rng)
+        else:
+            angle = 2 * np.pi * np.arange(size) / size
+            local = np.stack([np.cos(angle), np.sin(angle)], axis=1)
+        local = local - local.min(axis=0)
+        local /= max(local.max(), 1e-12)
+
+        side = np.sqrt(size)
+        if x > 0 and x + side > width:
+            x, y, row = 0.0, y + row, 0.0
+        xy[members] = (x, y) + 0.8 * side * local
+        x += side
+        row = max(row, side)
+
+    xy -= xy.min(axis=0)
+    return xy / max(xy.max(), 1e-12)
+
+
+# Text labels for a fast render, redrawn whenever the view changes. Only
+# vertices inside the view are labelled, at most one per cell of a grid over
+# it with about `limit` cells, picked by the highest `priority` (degree by
+# default). Zooming in shrinks the cells and reveals more labels.
+class LabelLayer:
+    ax: Axes
+    xy: np.ndarray
+    texts: List[str]
+    priority: np.ndarray
+    limit: int
+    font_size: float
+    artists: List[Any]
+
+    def __init__(
+        self,
+        ax: Axes,
+        xy: np.ndarray,
+        texts: List[str],
+        priority: np.ndarray,
+        limit: int,
+        font_size: float,
+    ):
+        self.ax = ax
+        self.xy = xy
+        self.texts = texts
+        self.priority = priority
+        self.limit = limit
+        self.font_size = font_size
+        self.artists = []
+        # The registry only weakly references bound methods; a closure keeps
+        # the layer alive as long as the axes
+        for event in ("xlim_changed", "ylim_changed"):
+            ax.callbacks.connect(event, lambda ax: self.update(ax))
+        self.update(ax)
+
+    def update(self, ax: Axes):
+        for artist in self.artists:
+            artist.remove()
+        (x0, x1), (y0, y1) = sorted(ax.get_xlim()), sorted(ax.get_ylim())
+        x, y = self.xy[:, 0], self.xy[:, 1]
+        visible = np.flatnonzero((x >= x0) & (x <= x1) & (y >= y0) & (y <= y1))
+        if len(visible) > self.limit:
+            visible = visible[np.argsort(-self.priority[visible], kind="stable")]
+            g = max(1, int(np.sqrt(self.limit)))
+            cx = ((x[visible] - x0) / max(x1 - x0, 1e-12) * g).astype(np.int64)
+            cy = ((y[visible] - y0) / max(y1 - y0, 1e-12) * g).astype(np.int64)
+            cell = np.minimum(cx, g - 1) * g + np.minimum(cy, g - 1)
+            _, first = np.unique(cell, return_index=True)
+            visible = visible[np.sort(first)]
+        self.artists = [
+            ax.text(
+                x[i],
+                y[i],
+                self.texts[i],
+                fontsize=self.font_size,
+                ha="center",
+                va="center",
+                clip_on=True,
+            )
+            for i in visible
+        ]
+
+
 class Renderer:
     def __init__(self, adj: Graph) -> None:
         self.adj = adj
 
+    # Positions for `adj.vertices`, cached by the CSR arrays and vertex keys
+    def positions(self, seed: int = 1111) -> np.ndarray:
+        vertices = self.adj.vertices
+        n = len(vertices)
+        offsets, targets = adjacency_arrays(self.adj)
+        digest = hashlib.blake2b(offsets.tobytes())
+        digest.update(targets.tobytes())
+        digest.update(repr([v.key for v in vertices]).encode())
+
+        def compute() -> np.ndarray:
+            sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+            if n > SPRING_LAYOUT_LIMIT:
+                return pivot_layout(sources, targets, n, seed)
+            g = nx.Graph()
+            g.add_nodes_from(range(n))
+            g.add_edges_from(zip(sources.tolist(), targets.tolist()))
+            pos = nx.spring_layout(g, seed=seed)
+            return np.array([pos[i] for i in range(n)]).reshape(n, 2)
+
+        return layouts.lookup(("arrays", digest.hexdigest(), seed), compute)
+
+    # Draws straight from the adjacency arrays: the edges as one LineCollection,
+    # the vertices as one scatter, and level-of-detail labels (see
+    # `LabelLayer`). Each undirected edge is drawn once. `pos` is an (n, 2)
+    # array in vertex order or a dict by key; by default it comes from
+    # `positions`. Returns the axes so the figure stays interactive.
+    def fast(
+        self,
+        ax: Optional[Axes] = None,
+        pos: Optional[Any] = None,
+        seed: int = 1111,
+        use_node_color: bool = True,
+        use_edge_color: bool = False,
+        node_size: float = 20.0,
+        line_width: float = 0.5,
+        label: Optional[str] = "key",
+        max_labels: int = 200,
+        font_size: float = 8.0,
+        show: bool = True,
+    ) -> Axes:
+        vertices = self.adj.vertices
+        n = len(vertices)
+        offsets, targets = adjacency_arrays(self.adj)
+        sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+
+        if pos is None:
+            xy = self.positions(seed)
+        elif isinstance(pos, dict):
+            xy = np.array([pos[v.key] for v in vertices], dtype=float).reshape(n, 2)
+        else:
+            xy = np.asarray(pos, dtype=float)
+
+        codes = sources * n + targets
+        once = (sources <= targets) | ~np.isin(targets * n + sources, codes)
+        u, v = sources[once], targets[once]
+
+        edge_color: Any = Color.BLACK.value
+        if use_edge_color:
+            names, index = np.unique(
+                [
+                    self.adj.edges_by_node_coords(vertices[a], vertices[b]).color
+                    for a, b in zip(u.tolist(), v.tolist())
+                ],
+                return_inverse=True,
+            )
+            edge_color = to_rgba_array(names)[index]
+
+        ax = ax or plt.gca()
+        # The vertices already span every segment, so the data limits are set
+        # from them below rather than by walking the segments
+        ax.add_collection(
+            LineCollection(
+                np.stack([xy[u], xy[v]], axis=1),
+                colors=edge_color,
+                linewidths=line_width,
+                zorder=1,
+            ),
+            autolim=False,
+        )
+
+        node_color: Any = NodeColor.DEFAULT.value
+        if use_node_color:
+            # Colours are converted once per distinct value, not per vertex
+            names, index = np.unique([v.color for v in vertices], return_inverse=True)
+            node_color = to_rgba_array(names)[index]
+        ax.scatter(xy[:, 0], xy[:, 1], s=node_size, c=node_color, zorder=2)
+        ax.update_datalim(xy)
+        ax.autoscale_view()
+        ax.set_axis_off()
+
+        if label is not None:
+            texts = [str(getattr(v, label, "")) for v in vertices]
+            degree = np.bincount(sources, minlength=n) + np.bincount(
+                targets, minlength=n
+            )
+            LabelLayer(ax, xy, texts, degree, max_labels, font_size)
+
+        if show:
+            plt.show()
+        return ax
+
     def graph(self, **kwargs):
         g = nx.Graph()
         self.draw(g, **kwargs)
@@ -529,6 +1389,7 @@ class Renderer:
         line_width: float = 0.1,
         seed: int = 1111,
         arrows: bool = False,
+        show: bool = True,
     ):
         node_attrs = set(*node_attributes)
         for node_label in node_labels:
@@ -547,7 +1408,7 @@ class Renderer:
         g.add_nodes_from(self.adj.nodes_with_attrs(*node_attrs))
         g.add_edges_from(self.adj.edges_with_attrs(*edge_attrs))
 
-        pos = nx.spring_layout(g, seed=seed)
+        pos = layouts.get(g, seed)
 
         if len(node_labels) > 0:
             assert len(node_label_prefixes) == 0 or len(node_labels) == len(
@@ -635,4 +1496,5 @@ class Renderer:
             width=line_width,
         )
         plt.axis("off")
-        plt.show()
+        if show:
+            plt.show()
@@ -0,0 +1,466 @@
+import json
+import os
+import struct
+from array import array
+from collections.abc import Sequence
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from src.graph.csr import CSR, LazyVertices, SortedKeyIndex
+from src.graph.graph import Graph, Storage, VertexBase, adjacency_arrays
+from src.graph.journal import Delta, SnapshotJournal, VertexRef
+
+# A graph file is a fixed header, a payload of 64-byte aligned little-endian
+# arrays, and a JSON directory at the end describing where each array lives.
+# The directory also holds the small tables that attribute codes point into.
+# Nothing in a file is executed on load: the directory is plain data and the
+# graph class must be one of the known ones below.
+MAGIC = b"GRAPHMM2"
+HEADER = struct.Struct("<8sQQ")
+ALIGN = 64
+KINDS = ("node", "edge")
+
+# Byte offset, dtype string and length of one array in the payload
+ArraySpec = Tuple[int, str, int]
+Section = Dict[str, Any]
+Columns = Dict[str, Tuple[np.ndarray, "Interner"]]
+
+# Python indexing into a typed memoryview is much faster than NumPy scalars
+TYPECODES = {"<i8": "q", "<f8": "d", "<i4": "i", "|u1": "B"}
+
+
+# Graph classes a file may name, by "module:qualname"
+def graph_classes() -> Dict[str, Type[Graph]]:
+    from src.graph.bfs import BFSGraph
+    from src.graph.dfs import DFSGraph
+    from src.graph.graph import GraphBase
+    from src.graph.mst.kruskals import KruskalsGraph
+    from src.graph.mst.prim import MSTGraph
+
+    classes = [GraphBase, BFSGraph, DFSGraph, MSTGraph, KruskalsGraph]
+    return {f"{c.__module__}:{c.__qualname__}": c for c in classes}
+
+
+# JSON has no tuples, vertex references or non-string keys, so those are
+# tagged as single-entry objects whose key starts with "$". Dicts with plain
+# string keys stay JSON objects.
+def encode(x: Any) -> Any:
+    if x is None or isinstance(x, (bool, int, float, str)):
+        return x
+    if isinstance(x, np.generic):
+        return encode(x.item())
+    if isinstance(x, VertexRef):
+        return {"$vertex": encode(x.key)}
+    if isinstance(x, tuple):
+        return {"$tuple": [encode(y) for y in x]}
+    if isinstance(x, list):
+        return [encode(y) for y in x]
+    if isinstance(x, dict):
+        if all(isinstance(k, str) and not k.startswith("$") for k in x):
+            return {k: encode(y) for k, y in x.items()}
+        return {"$dict": [[encode(k), encode(y)] for k, y in x.items()]}
+    raise TypeError(f"can't store a {type(x).__name__} in a graph file")
+
+
+def decode(x: Any) -> Any:
+    if isinstance(x, list):
+        return [decode(y) for y in x]
+    if not isinstance(x, dict):
+        return x
+    if len(x) == 1:
+        ((tag, y),) = x.items()
+        if tag == "$vertex":
+            return VertexRef(decode(y))
+        if tag == "$tuple":
+            return tuple(decode(z) for z in y)
+        if tag == "$dict":
+            return {decode(k): decode(z) for k, z in y}
+    return {k: decode(y) for k, y in x.items()}
+
+
+# Assigns dense codes to attribute values, so a column is an int32 array plus a
+# table of its distinct values. Vertex-valued attributes are stored by key.
+class Interner:
+    values: List[Any]
+    codes: Dict[Tuple[type, Any], int]
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, x: Any) -> int:
+        if isinstance(x, VertexBase):
+            x = VertexRef(x.key)
+        try:
+            code = self.codes.get((type(x), x))
+        except TypeError:
+            # Unhashable values are stored without deduplication
+            self.values.append(x)
+            return len(self.values) - 1
+        if code is None:
+            code = self.codes[(type(x), x)] = len(self.values)
+            self.values.append(x)
+        return code
+
+
+class Writer:
+    f: BinaryIO
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        f.write(HEADER.pack(MAGIC, 0, 0))
+
+    def array(self, a: Any, dtype: Any) -> ArraySpec:
+        a = np.ascontiguousarray(a, dtype=np.dtype(dtype).newbyteorder("<"))
+        self.f.write(bytes(-self.f.tell() % ALIGN))
+        offset = self.f.tell()
+        self.f.write(a.view(np.uint8).data)
+        return offset, a.dtype.str, len(a)
+
+    def finish(self, directory: Dict[str, Any]):
+        blob = json.dumps(encode(directory)).encode()
+        offset = self.f.tell()
+        self.f.write(blob)
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, offset, len(blob)))
+
+
+class MappedFile:
+    path: str
+    buffer: np.memmap
+    directory: Dict[str, Any]
+
+    def __init__(self, path: str):
+        self.path = path
+        self.buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, offset, length = HEADER.unpack(self.buffer[: HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a graph file")
+        blob = self.buffer[offset : offset + length].tobytes()
+        self.directory = decode(json.loads(blob))
+
+    def array(self, spec: ArraySpec) -> np.ndarray:
+        offset, dtype, length = spec
+        if dtype not in TYPECODES:
+            raise ValueError(f"{self.path}: unexpected array type {dtype!r}")
+        size = length * np.dtype(dtype).itemsize
+        return self.buffer[offset : offset + size].view(dtype)
+
+    def typed(self, spec: ArraySpec) -> memoryview:
+        return memoryview(self.array(spec)).cast("B").cast(TYPECODES[spec[1]])
+
+
+def column(columns: Columns, field: str, size: int) -> Tuple[np.ndarray, Interner]:
+    if field not in columns:
+        columns[field] = (np.full(size, -1, dtype=np.int32), Interner())
+    return columns[field]
+
+
+def write_columns(w: Writer, columns: Columns) -> Dict[str, Tuple[ArraySpec, List]]:
+    return {
+        field: (w.array(codes, np.int32), interner.values)
+        for field, (codes, interner) in columns.items()
+    }
+
+
+def write_keys(w: Writer, keys: List[Any]) -> Section:
+    if all(type(k) is int for k in keys):
+        try:
+            a = np.array(keys, dtype=np.int64)
+        except OverflowError:
+            return {"keys": keys}
+        order = np.argsort(a, kind="stable")
+        return {
+            "keys": w.array(a, np.int64),
+            "sorted_keys": w.array(a[order], np.int64),
+            "order": w.array(order, np.int64),
+        }
+    return {"keys": keys}
+
+
+def vertex_columns(vertices: List[VertexBase]) -> Columns:
+    columns: Columns = {}
+    for i, v in enumerate(vertices):
+        for field, value in v.values.items():
+            codes, interner = column(columns, field, len(vertices))
+            codes[i] = interner.code(value)
+    return columns
+
+
+def numeric(x: Any) -> bool:
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+
+# Edge values in CSR position order, plus the weights as their own array when
+# every edge has a numeric one. For CSR storage only the edges that were
+# materialised are read as objects; the rest take the class defaults and the
+# stored arguments, filled in with NumPy.
+def edge_columns(G: Graph, m: int) -> Tuple[Optional[np.ndarray], Columns]:
+    columns: Columns = {}
+    csr = G.csr
+    if csr is None:
+        vertices = G.vertices
+        edges = [
+            G.edges_by_node_coords(u, vertices[j])
+            for u, row in zip(vertices, G.successor_ids())
+            for j in row
+        ]
+        values = [getattr(edge, "weight", None) for edge in edges]
+        weights = None
+        if edges and all(map(numeric, values)):
+            integral = all(isinstance(x, int) for x in values)
+            weights = np.array(values, dtype=np.int64 if integral else np.float64)
+        cached = dict(enumerate(edges))
+    else:
+        weights = None if csr.weights is None else np.array(csr.weights)
+        cached = G._edge_from_node_coords.edges.cache
+        uncached = np.ones(m, dtype=bool)
+        uncached[np.fromiter(cached, dtype=np.int64, count=len(cached))] = False
+
+        if uncached.any():
+            first = int(np.argmax(uncached))
+            args = csr.arguments_of(first)
+            prototype = G.edge_cls(csr.vertices[0], csr.vertices[0], **args)
+            for field, value in prototype.values.items():
+                if field not in args:
+                    codes, interner = column(columns, field, m)
+                    codes[uncached] = interner.code(value)
+            for field, (stored, table) in csr.columns.items():
+                codes, interner = column(columns, field, m)
+                # A trailing -1 keeps unset codes unset after remapping
+                remap = np.array([*map(interner.code, table), -1], dtype=np.int32)
+                stored = np.frombuffer(stored, dtype=np.int32)
+                codes[uncached] = remap[stored[uncached]]
+            for e, args in csr.edge_arguments.items():
+                if uncached[e]:
+                    for field, value in args.items():
+                        codes, interner = column(columns, field, m)
+                        codes[e] = interner.code(value)
+
+    for e, edge in cached.items():
+        for field, value in edge.values.items():
+            if field == "weight" and weights is not None:
+                if not isinstance(value, int) and weights.dtype != np.float64:
+                    weights = weights.astype(np.float64)
+                weights[e] = value
+                continue
+            codes, interner = column(columns, field, m)
+            codes[e] = interner.code(value)
+
+    for field, (_, interner) in columns.items():
+        assert not any(
+            isinstance(x, VertexRef) for x in interner.values
+        ), f"edge attribute {field!r} can't reference vertices"
+    return weights, columns
+
+
+def write_state(w: Writer, G: Graph) -> Section:
+    vertices = G.vertices
+    offsets, targets = adjacency_arrays(G)
+    weights, edges = edge_columns(G, len(targets))
+    return {
+        "vertices": len(vertices),
+        **write_keys(w, [v.key for v in vertices]),
+        "offsets": w.array(offsets, np.int64),
+        "targets": w.array(targets, np.int64),
+        "weights": None if weights is None else w.array(weights, weights.dtype),
+        "vertex_columns": write_columns(w, vertex_columns(vertices)),
+        "edge_columns": write_columns(w, edges),
+    }
+
+
+# Opening a section maps its arrays and builds nothing per vertex or edge:
+# vertices come from a `LazyVertices`, integer keys are looked up by binary
+# search, and edges read their attributes from the mapped columns.
+def read_state(cls: Type[Graph], f: MappedFile, section: Section) -> Graph:
+    keys = section["keys"]
+    index: Any
+    if isinstance(keys, list):
+        key_of: Sequence = keys
+        index = {k: i for i, k in enumerate(keys)}
+    else:
+        key_of = f.typed(keys)
+        index = SortedKeyIndex(
+            key_of, f.typed(section["sorted_keys"]), f.typed(section["order"])
+        )
+
+    columns = [
+        (field, f.typed(spec), table)
+        for field, (spec, table) in section["vertex_columns"].items()
+    ]
+
+    def create(i: int):
+        arguments, refs = {}, []
+        for field, codes, table in columns:
+            code = codes[i]
+            if code < 0:
+                continue
+            value = table[code]
+            if isinstance(value, VertexRef):
+                refs.append((field, index[value.key]))
+            else:
+                arguments[field] = value
+        return cls.vertex_cls(key=key_of[i], **arguments), refs
+
+    weights = section["weights"]
+    csr = CSR(
+        LazyVertices(section["vertices"], create),
+        f.typed(section["offsets"]),
+        f.typed(section["targets"]),
+        None if weights is None else f.typed(weights),
+        index=index,
+        columns={
+            field: (f.typed(spec), table)
+            for field, (spec, table) in section["edge_columns"].items()
+        },
+    )
+    return cls.from_csr(None, csr)
+
+
+# Deltas are flattened into one entry per changed attribute: its kind (node or
+# edge), the interned key (or both endpoint keys) of the object, the interned
+# field name and the interned value. `offsets` splits entries by snapshot.
+def write_journal(w: Writer, journal: SnapshotJournal) -> Optional[Section]:
+    if not len(journal):
+        return None
+
+    checkpoints = {
+        c: write_state(w, journal.restore(c)) for c in journal.checkpoint_ids
+    }
+    keys, fields, values = Interner(), Interner(), Interner()
+    offsets, kinds = array("q", [0]), array("B")
+    first, second, names, codes = array("q"), array("q"), array("i"), array("i")
+    for delta in journal.deltas:
+        for (kind, key), changed in delta.items():
+            u, v = (key, None) if kind == "node" else key
+            for field, value in changed.items():
+                kinds.append(KINDS.index(kind))
+                first.append(keys.code(u))
+                second.append(-1 if kind == "node" else keys.code(v))
+                names.append(fields.code(field))
+                codes.append(values.code(value))
+        offsets.append(len(kinds))
+
+    return {
+        "interval": journal.interval,
+        "checkpoints": checkpoints,
+        "offsets": w.array(offsets, np.int64),
+        "kinds": w.array(kinds, np.uint8),
+        "first": w.array(first, np.int64),
+        "second": w.array(second, np.int64),
+        "fields": w.array(names, np.int32),
+        "values": w.array(codes, np.int32),
+        "key_table": keys.values,
+        "field_table": fields.values,
+        "value_table": values.values,
+    }
+
+
+# Stored deltas decode on access; snapshots recorded after loading are kept
+# in memory after them.
+class MappedDeltas(Sequence):
+    stored: int
+    tail: List[Delta]
+
+    def __init__(self, f: MappedFile, section: Section):
+        self.offsets = f.typed(section["offsets"])
+        self.kinds = f.typed(section["kinds"])
+        self.first = f.typed(section["first"])
+        self.second = f.typed(section["second"])
+        self.fields = f.typed(section["fields"])
+        self.values = f.typed(section["values"])
+        self.key_table = section["key_table"]
+        self.field_table = section["field_table"]
+        self.value_table = section["value_table"]
+        self.stored = len(self.offsets) - 1
+        self.tail = []
+
+    def delta(self, i: int) -> Delta:
+        keys = self.key_table
+        delta: Delta = {}
+        for e in range(self.offsets[i], self.offsets[i + 1]):
+            u = keys[self.first[e]]
+            kind = KINDS[self.kinds[e]]
+            key = u if kind == "node" else (u, keys[self.second[e]])
+            field = self.field_table[self.fields[e]]
+            delta.setdefault((kind, key), {})[field] = self.value_table[self.values[e]]
+        return delta
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if 0 <= i < self.stored:
+            return self.delta(i)
+        return self.tail[i - self.stored]
+
+    def __len__(self) -> int:
+        return self.stored + len(self.tail)
+
+    def append(self, delta: Delta):
+        self.tail.append(delta)
+
+
+# Stored checkpoints are reopened from the file; new snapshots are recorded
+# the usual way. The graph may have changed since its last stored snapshot, so
+# the first new one is always a checkpoint.
+class MappedJournal(SnapshotJournal):
+    file: MappedFile
+    sections: Dict[int, Section]
+
+    def __init__(self, graph: Graph, f: MappedFile, section: Section):
+        super().__init__(graph, section["interval"])
+        self.file = f
+        self.sections = section["checkpoints"]
+        self.checkpoint_ids = sorted(self.sections)
+        self.deltas = MappedDeltas(f, section)  # type: ignore[assignment]
+        self.restructured = True
+
+    def restore(self, c: int):
+        if c not in self.sections:
+            return super().restore(c)
+        graph = read_state(type(self.graph), self.file, self.sections[c])
+        if self.graph.storage == Storage.DICT:
+            graph.thaw()
+        return graph
+
+
+# Writes the graph, its snapshot checkpoints and deltas in one pass. The file
+# is written beside the target and renamed over it, so a graph mapped from the
+# old file stays readable.
+def write_graph(G: Graph, path: str):
+    cls = type(G)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        w = Writer(f)
+        directory = {
+            "class": f"{cls.__module__}:{cls.__qualname__}",
+            "graph": write_state(w, G),
+            "journal": write_journal(w, G.snapshots),
+        }
+        w.finish(directory)
+    os.replace(tmp, path)
+
+
+# Maps a graph file back. The graph class recorded in the file is used unless
+# one is given; a recorded class has to be one of `graph_classes`. The result
+# is CSR-backed over the mapped arrays; DICT storage thaws it, which builds
+# every vertex and edge.
+def read_graph(
+    path: str, cls: Optional[Type[Graph]] = None, storage: Storage = Storage.CSR
+) -> Graph:
+    f = MappedFile(path)
+    if cls is None:
+        name = f.directory["class"]
+        cls = graph_classes().get(name)
+        if cls is None:
+            raise ValueError(f"{path}: unknown graph class {name!r}; pass cls")
+
+    G = read_state(cls, f, f.directory["graph"])
+    if f.directory["journal"] is not None:
+        G.snapshots = MappedJournal(G, f, f.directory["journal"])
+    if storage == Storage.DICT:
+        G.thaw()
+    return G
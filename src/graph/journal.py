@@ -0,0 +1,144 @@
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+ObjectKey = Tuple[str, Any]
+Delta = Dict[ObjectKey, Dict[str, Any]]
+
+
+# Fewest snapshots between two checkpoints; see `SnapshotJournal`
+MIN_INTERVAL = 32
+
+
+# A vertex-valued attribute as stored on disk; replay resolves it by key
+class VertexRef(NamedTuple):
+    key: Any
+
+
+# Snapshot `i` is the nearest checkpoint at or before `i` with the deltas after
+# it replayed on top. Vertices and edges report attribute writes through
+# `touch`, so recording a snapshot only diffs the objects that changed since
+# the previous one instead of cloning the whole graph.
+#
+# A checkpoint copies all V + E objects, so a fixed interval makes long traces
+# of big graphs (a DFS records O(V) snapshots) cost O(steps * V) in
+# checkpoints. Unless an interval is given, it is chosen when the journal
+# attaches as max(MIN_INTERVAL, V + E): checkpoints then cost amortised O(1)
+# per snapshot, and a seek replays at most that many deltas. Graphs with fewer
+# than MIN_INTERVAL objects checkpoint every MIN_INTERVAL snapshots.
+#
+# Structural changes (vertices or edges added or removed) can't be replayed as
+# attribute deltas, so they force a checkpoint at the next record.
+class SnapshotJournal(Sequence):
+    graph: Any
+    interval: Optional[int]
+    checkpoints: Dict[int, Any]
+    checkpoint_ids: List[int]
+    restructured: bool
+    deltas: List[Delta]
+    recorded: Dict[int, Dict[str, Any]]
+    dirty: Dict[int, Any]
+    attached: bool
+
+    def __init__(self, graph: Any, interval: Optional[int] = None):
+        assert interval is None or interval > 0
+        self.graph = graph
+        self.interval = interval
+        self.checkpoints = {}
+        self.checkpoint_ids = []
+        self.restructured = False
+        self.deltas = []
+        self.recorded = {}
+        self.dirty = {}
+        self.attached = False
+
+    def attach(self):
+        objects = [*self.graph.vertices, *self.graph.edges]
+        for obj in objects:
+            obj.track(self)
+            self.recorded[id(obj)] = obj.values
+        if self.interval is None:
+            self.interval = max(MIN_INTERVAL, len(objects))
+        self.attached = True
+
+    def touch(self, obj: Any):
+        self.dirty[id(obj)] = obj
+
+    def add(self, obj: Any):
+        if self.attached:
+            obj.track(self)
+            self.recorded[id(obj)] = obj.values
+            self.restructured = True
+
+    def remove(self, obj: Any):
+        if self.attached:
+            obj.untrack()
+            self.recorded.pop(id(obj), None)
+            self.dirty.pop(id(obj), None)
+            self.restructured = True
+
+    @staticmethod
+    def key_of(obj: Any) -> ObjectKey:
+        if hasattr(obj, "u"):
+            return ("edge", (obj.u.key, obj.v.key))
+        return ("node", obj.key)
+
+    def record(self) -> int:
+        if not self.attached:
+            self.attach()
+
+        delta: Delta = {}
+        for key, obj in self.dirty.items():
+            values = obj.values
+            last = self.recorded.get(key, {})
+            changed = {
+                k: v for k, v in values.items() if k not in last or last[k] != v
+            }
+            if changed:
+                delta[self.key_of(obj)] = changed
+            self.recorded[key] = values
+        self.dirty.clear()
+
+        i = len(self.deltas)
+        self.deltas.append(delta)
+        assert self.interval is not None
+        if i % self.interval == 0 or self.restructured:
+            self.checkpoints[i] = self.graph.to_template()
+            self.checkpoint_ids.append(i)
+            self.restructured = False
+        return i
+
+    def restore(self, c: int):
+        return self.graph.from_template(self.checkpoints[c], self.graph.storage)
+
+    def seek(self, i: int):
+        c = self.checkpoint_ids[bisect_right(self.checkpoint_ids, i) - 1]
+        graph = self.restore(c)
+
+        for delta in self.deltas[c + 1 : i + 1]:
+            for (kind, key), values in delta.items():
+                if kind == "node":
+                    obj = graph.node_by_key(key)
+                else:
+                    u, v = key
+                    obj = graph.edges_by_node_coords(
+                        graph.node_by_key(u), graph.node_by_key(v)
+                    )
+                for k, value in values.items():
+                    if isinstance(value, VertexRef):
+                        value = graph.node_by_key(value.key)
+                    setattr(obj, k, value)
+
+        return graph
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.seek(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.seek(i)
+
+    def __len__(self) -> int:
+        return len(self.deltas)
@@ -0,0 +1,273 @@
+import csv
+import os
+from array import array
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+import numpy as np
+
+from src.graph.csr import CSR
+from src.graph.graph import Graph, NodePlaceholder, Storage
+
+# Called after every chunk with the edges read so far and the total, if known
+Progress = Callable[[int, Optional[int]], None]
+ParsedEdge = Tuple[NodePlaceholder, NodePlaceholder, Optional[float]]
+
+# Binary edge files are flat little-endian (u, v, weight) records
+EDGE_RECORD = np.dtype([("u", "<i8"), ("v", "<i8"), ("weight", "<f8")])
+
+
+def print_progress(every: int = 1_000_000) -> Progress:
+    last = [0]
+
+    def report(done: int, total: Optional[int]):
+        if done - last[0] >= every or done == total:
+            last[0] = done
+            print(f"{done:,} edges" + (f" / {total:,}" if total else ""))
+
+    return report
+
+
+# Every data row needs two endpoints, and either all rows carry a weight or
+# none do; `line` numbers the first row for error messages.
+def parse_rows(
+    rows: Iterable[List[str]],
+    key: Callable[[str], NodePlaceholder],
+    weight: Callable[[str], float],
+    line: int = 1,
+) -> Iterator[ParsedEdge]:
+    weighted: Optional[bool] = None
+    for n, row in enumerate(rows, line):
+        if not row or row[0].startswith("#"):
+            continue
+        if len(row) < 2:
+            raise ValueError(f"line {n}: expected 'u, v[, weight]', got {row!r}")
+        if weighted is None:
+            weighted = len(row) > 2
+        elif weighted != (len(row) > 2):
+            expected = "a weight" if weighted else "no weight"
+            raise ValueError(f"line {n}: earlier rows have {expected}, got {row!r}")
+        try:
+            u, v = key(row[0].strip()), key(row[1].strip())
+            yield u, v, weight(row[2].strip()) if weighted else None
+        except ValueError as e:
+            raise ValueError(f"line {n}: {e}") from e
+
+
+def chunked(edges: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    while chunk := list(islice(edges, size)):
+        yield chunk
+
+
+# Either every edge carries a weight (given or defaulted) or none does
+def checked_weight(
+    w: Optional[float], default: Optional[float], weighted: Optional[bool], n: int
+) -> Optional[float]:
+    w = default if w is None else w
+    if weighted is not None and weighted != (w is not None):
+        expected = "a weight" if weighted else "no weight"
+        raise ValueError(f"edge {n}: earlier edges have {expected}, got {w!r}")
+    return w
+
+
+# Streams parsed edges into a graph one chunk at a time, without building a
+# template. Dict storage adds them through `add_node`/`add_edge`. CSR storage
+# only grows three typed arrays and a key index, and sorts them into rows
+# once at the end. Undirected input adds both directions, sharing one edge
+# object like `from_template` does. Repeated edges are dropped on both paths;
+# the first occurrence keeps its weight.
+def load_edges(
+    cls: Type[Graph],
+    chunks: Iterable[List[ParsedEdge]],
+    storage: Storage = Storage.CSR,
+    directed: bool = False,
+    default_weight: Optional[float] = None,
+    progress: Optional[Progress] = None,
+    total: Optional[int] = None,
+):
+    if storage == Storage.CSR:
+        return load_csr(cls, chunks, directed, default_weight, progress, total)
+
+    G = cls(None)
+    vertices: Dict[NodePlaceholder, Any] = {}
+    by_nodes = G.edges_by_nodes
+
+    def vertex(k: NodePlaceholder):
+        v = vertices.get(k)
+        if v is None:
+            v = vertices[k] = G.add_node(k)
+        return v
+
+    weighted: Optional[bool] = None
+    done = 0
+    for chunk in chunks:
+        for n, (a, b, w) in enumerate(chunk, done + 1):
+            w = checked_weight(w, default_weight, weighted, n)
+            weighted = w is not None
+            u, v = vertex(a), vertex(b)
+            if v in by_nodes.get(u, ()):
+                continue
+            args = {} if w is None else {"weight": w}
+            G.add_edge(u, v, undirected=not directed, **args)
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+
+    return G
+
+
+# Keeps the first of each repeated (source, target) pair, in input order
+def first_occurrences(sources: np.ndarray, targets: np.ndarray, n: int) -> np.ndarray:
+    _, first = np.unique(sources * n + targets, return_index=True)
+    first.sort()
+    return first
+
+
+def load_csr(
+    cls: Type[Graph],
+    chunks: Iterable[List[ParsedEdge]],
+    directed: bool,
+    default_weight: Optional[float],
+    progress: Optional[Progress],
+    total: Optional[int],
+):
+    index: Dict[NodePlaceholder, int] = {}
+    sources, targets = array("q"), array("q")
+    weights: Optional[array] = None
+    weighted: Optional[bool] = None
+    done = 0
+    for chunk in chunks:
+        for n, (u, v, w) in enumerate(chunk, done + 1):
+            w = checked_weight(w, default_weight, weighted, n)
+            weighted = w is not None
+            i = index.setdefault(u, len(index))
+            j = index.setdefault(v, len(index))
+            if w is not None:
+                if weights is None:
+                    weights = array("q" if isinstance(w, int) else "d")
+                elif weights.typecode == "q" and not isinstance(w, int):
+                    weights = array("d", weights)
+                weights.append(w)
+            sources.append(i)
+            targets.append(j)
+            if not directed and i != j:
+                sources.append(j)
+                targets.append(i)
+                if weights is not None:
+                    weights.append(w)
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+
+    vertices = [cls.vertex_cls(key=k) for k in index]
+    s = np.frombuffer(sources, dtype=np.int64)
+    t = np.frombuffer(targets, dtype=np.int64)
+    w = None if weights is None else np.frombuffer(weights, dtype=weights.typecode)
+    keep = first_occurrences(s, t, len(index))
+    if len(keep) < len(s):
+        s, t, w = s[keep], t[keep], None if w is None else w[keep]
+    return cls.from_csr(None, CSR.from_arrays(vertices, s, t, w))
+
+
+def read_edge_list(
+    cls: Type[Graph],
+    path: str,
+    delimiter: Optional[str] = None,
+    header: bool = False,
+    key: Callable[[str], NodePlaceholder] = int,
+    weight: Callable[[str], float] = float,
+    chunk_size: int = 1 << 16,
+    **kwargs,
+):
+    if delimiter is None:
+        delimiter = "\t" if path.endswith((".tsv", ".tab")) else ","
+    with open(path, newline="") as f:
+        rows = csv.reader(f, delimiter=delimiter)
+        if header:
+            next(rows, None)
+        edges = parse_rows(rows, key, weight, line=2 if header else 1)
+        return load_edges(cls, chunked(edges, chunk_size), **kwargs)
+
+
+# The record file is memory-mapped and read in chunks. With CSR storage the
+# whole load stays in NumPy: one pass collects the distinct keys (vertices are
+# ordered by key), a second maps endpoints to indexes into preallocated
+# arrays. Weights that are all whole numbers load as ints. Repeated edges are
+# dropped as in `load_edges`.
+def read_edge_binary(
+    cls: Type[Graph],
+    path: str,
+    storage: Storage = Storage.CSR,
+    directed: bool = False,
+    chunk_size: int = 1 << 20,
+    progress: Optional[Progress] = None,
+):
+    if os.path.getsize(path) == 0:
+        # An empty graph is written as an empty file, which can't be mapped
+        return load_edges(cls, [], storage, directed)
+
+    records = np.memmap(path, dtype=EDGE_RECORD, mode="r")
+    m = len(records)
+    spans = [(s, min(s + chunk_size, m)) for s in range(0, m, chunk_size)]
+
+    if storage != Storage.CSR:
+
+        def chunks() -> Iterator[List[ParsedEdge]]:
+            for s, e in spans:
+                part = records[s:e]
+                w = part["weight"]
+                if np.all(np.mod(w, 1) == 0):
+                    w = w.astype(np.int64)
+                yield list(zip(part["u"].tolist(), part["v"].tolist(), w.tolist()))
+
+        return load_edges(cls, chunks(), storage, directed, None, progress, m)
+
+    parts = []
+    integral = True
+    for s, e in spans:
+        part = records[s:e]
+        parts.append(np.unique(np.concatenate([part["u"], part["v"]])))
+        integral = integral and bool(np.all(np.mod(part["weight"], 1) == 0))
+    keys = np.unique(np.concatenate(parts))
+
+    size = m if directed else 2 * m
+    sources = np.empty(size, dtype=np.int64)
+    targets = np.empty(size, dtype=np.int64)
+    weights = np.empty(size, dtype=np.int64 if integral else np.float64)
+    n = 0
+    for s, e in spans:
+        part = records[s:e]
+        u = np.searchsorted(keys, part["u"])
+        v = np.searchsorted(keys, part["v"])
+        w = part["weight"]
+        k = e - s
+        sources[n : n + k], targets[n : n + k], weights[n : n + k] = u, v, w
+        n += k
+        if not directed:
+            # Self-loops are stored once, as with the other loaders
+            back = u != v
+            k = int(back.sum())
+            sources[n : n + k], targets[n : n + k] = v[back], u[back]
+            weights[n : n + k] = w[back]
+            n += k
+        if progress:
+            progress(e, m)
+
+    sources, targets, weights = sources[:n], targets[:n], weights[:n]
+    keep = first_occurrences(sources, targets, len(keys))
+    if len(keep) < n:
+        sources, targets, weights = sources[keep], targets[keep], weights[keep]
+    vertices = [cls.vertex_cls(key=k) for k in keys.tolist()]
+    csr = CSR.from_arrays(vertices, sources, targets, weights)
+    return cls.from_csr(None, csr)
+
+
+def write_edge_binary(G: Graph, path: str, directed: bool = False):
+    rows = []
+    for (u, v), edge in G._edge_from_node_coords.items():
+        if not directed and (v, u) in G._edge_from_node_coords and v.key < u.key:
+            continue
+        rows.append((u.key, v.key, getattr(edge, "weight", 0)))
+    tmp = f"{path}.tmp"
+    np.array(rows, dtype=EDGE_RECORD).tofile(tmp)
+    os.replace(tmp, path)
@@ -1,22 +1,24 @@
-from typing import Any, Optional
+import heapq
+from typing import Any, Iterator, List, Optional
 
 from src.graph.color import EdgeColor, NodeColor
 from src.graph.dfs import (
     DFSVertexBase,
 )
+from src.graph.disjoint_set import DisjointSet
 from src.graph.mst.prim import (
     EdgeBase,
     MSTGraphBase,
 )
-from src.graph.step import GraphStepTree
-from src.tree.step import Stepper, ctx
+from src.graph.step import GraphStepTree, Trace, run_traced
+from src.tree.step import ctx
 
 
 class Vertex(DFSVertexBase):
-    _blacklist = ["component", "next"]
+    __slots__ = ("component",)
+    _blacklist = ["component"]
     key: Any
     component: Optional["Vertex"]
-    next: Optional["Vertex"]
     distance: float
     color: str
 
@@ -31,7 +33,6 @@ class Vertex(DFSVertexBase):
         super().__init__(key, *args, **kwargs)
         self.key = key
         self.component = None
-        self.next = None
         self.distance = distance
         self.color = color
 
@@ -40,6 +41,9 @@ class Vertex(DFSVertexBase):
 
 
 class Edge(EdgeBase[Vertex]):
+    __slots__ = ("weight",)
+    weight: int
+
     def __init__(
         self,
         u: Vertex,
@@ -47,10 +51,7 @@ class Edge(EdgeBase[Vertex]):
         weight: int,
         color: str = EdgeColor.LINE_DEFAULT.value,
     ):
-        self.u = u
-        self.v = v
-        self.weight = weight
-        self.color = color
+        super().__init__(u, v, weight=weight, color=color)
 
 
 class KruskalsGraph(MSTGraphBase[Vertex, Edge]):
@@ -58,43 +59,66 @@ class KruskalsGraph(MSTGraphBase[Vertex, Edge]):
     edge_cls = Edge
 
 
-def _minimum_spanning_tree(Adj: KruskalsGraph):
-    def merge(u: Vertex, v: Vertex):
-        w = u.component
+def by_weight(edges: List[Edge], lazy: bool = False) -> Iterator[Edge]:
+    if not lazy:
+        yield from sorted(edges, key=lambda e: e.weight)
+        return
 
-        assert w is not None
-        while w.next:
-            w = w.next
+    # Heapify is O(E); only the edges actually considered pay O(log E) to pop
+    h = [(edge.weight, idx, edge) for idx, edge in enumerate(edges)]
+    heapq.heapify(h)
+    while h:
+        yield heapq.heappop(h)[2]
 
-        w.next = v.component
 
-        s = v.component
-        while s:
-            s.component = u.component
-            s = s.next
+def _minimum_spanning_tree(
+    Adj: KruskalsGraph, lazy: bool = False, trace: Trace = Trace.SNAPSHOTS
+) -> List[Edge]:
+    V = Adj.vertices
+    index = {v: idx for idx, v in enumerate(V)}
+    components = DisjointSet(len(V))
 
-    for v in Adj.vertices:
-        v.component = v
+    stepper = ctx.get() if trace else None
+    parent_id = None
+    remaining = len(V) - 1
+    tree: List[Edge] = []
 
-    edges = sorted(Adj.edges, key=lambda e: e.weight)
+    for edge in by_weight(Adj.edges, lazy):
+        if remaining == 0:
+            break
 
-    parent_id = edges[0].u.component.id
-
-    for edge in edges:
         u, v = edge.u, edge.v
-        if u.component != v.component:
-            v_id = v.component.id
-            merge(u, v)
-            ctx.get().called_with(v_id, parent_id, merge, [u.key, v.key])
-            edge.color = EdgeColor.LINE_VISITED.value
-            parent_id = v_id
-            Adj.take_snapshot()
-
-
-def minimum_spanning_tree(Adj: KruskalsGraph):
-    _, token = Stepper.run(_minimum_spanning_tree, Adj)
-    tree = GraphStepTree.build(
-        ctx.get().called_with_subcalls, include_output=False, include_fn=False
-    )
-    ctx.reset(token)
+        u_root, v_root = components.find(index[u]), components.find(index[v])
+        if u_root != v_root:
+            components.union(u_root, v_root)
+            tree.append(edge)
+            remaining -= 1
+            if stepper:
+                if parent_id is None:
+                    parent_id = u.id
+                v_id = V[v_root].id
+                stepper.called_with(v_id, parent_id, components.union, [u.key, v.key])
+                edge.color = EdgeColor.LINE_VISITED.value
+                parent_id = v_id
+            if trace >= Trace.SNAPSHOTS:
+                Adj.take_snapshot()
+
+    for idx, v in enumerate(V):
+        v.component = V[components.find(idx)]
+
     return tree
+
+
+# Like the other traced searches this returns only the call tree, or None when
+# untraced; minimum_spanning_edges returns the forest's edges instead.
+def minimum_spanning_tree(
+    Adj: KruskalsGraph, lazy: bool = False, trace: Optional[Trace] = None
+) -> Optional[GraphStepTree]:
+    tree = run_traced(_minimum_spanning_tree, trace, Adj, lazy)
+    return tree if isinstance(tree, GraphStepTree) else None
+
+
+# Untraced run returning the spanning forest's edges in the order they were
+# taken
+def minimum_spanning_edges(Adj: KruskalsGraph, lazy: bool = False) -> List[Edge]:
+    return _minimum_spanning_tree(Adj, lazy, trace=Trace.OFF)
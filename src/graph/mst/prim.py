@@ -1,6 +1,7 @@
 import heapq
 from collections import defaultdict
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import count
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from src.graph.color import EdgeColor, NodeColor
 from src.graph.dfs import DFS_KC, DFSGraphBase, DFSRenderer, DFSVertexBase
@@ -11,12 +12,14 @@ from src.graph.graph import (
     EdgeBase,
     NodeArguments,
     NodePlaceholder,
+    Storage,
 )
-from src.graph.step import GraphStepTree
-from src.tree.step import Stepper, ctx
+from src.graph.step import GraphStepTree, Trace, run_traced
+from src.tree.step import ctx
 
 
 class Vertex(DFSVertexBase):
+    __slots__ = ()
     key: Any
     parent: Optional["Vertex"]
     visited: bool
@@ -53,6 +56,9 @@ class Vertex(DFSVertexBase):
 
 
 class Edge(EdgeBase[Vertex]):
+    __slots__ = ("weight",)
+    weight: int
+
     def __init__(
         self,
         u: Vertex,
@@ -60,10 +66,7 @@ class Edge(EdgeBase[Vertex]):
         weight: int,
         color: str = EdgeColor.LINE_DEFAULT.value,
     ):
-        self.u = u
-        self.v = v
-        self.weight = weight
-        self.color = color
+        super().__init__(u, v, weight=weight, color=color)
 
 
 EdgeWeight = int
@@ -73,7 +76,9 @@ MSTTemplate = Dict[NodePlaceholder, List[MSTNodeTemplate]]
 
 class MSTGraphBase(DFSGraphBase[DFS_KC, ED]):
     @classmethod
-    def from_template(cls, template: MSTTemplate | BaseTemplate):
+    def from_template(
+        cls, template: MSTTemplate | BaseTemplate, storage: Storage = Storage.DICT
+    ):
         t: BaseTemplate = defaultdict(list)
 
         for node, edge_templates in template.items():
@@ -88,7 +93,7 @@ class MSTGraphBase(DFSGraphBase[DFS_KC, ED]):
                     neighbor, edge_args, node_args = edge_template
                 t[node].append((neighbor, edge_args, node_args))
 
-        return super().from_template(t)
+        return super().from_template(t, storage)
 
     @property
     def render(self):
@@ -109,44 +114,76 @@ class MSTRenderer(DFSRenderer):
         )
 
 
-class MinHeapObj(Vertex):
-    def __init__(self, val: Vertex):
-        self.val = val
-
-    def __lt__(self, other):
-        return self.val < other.val
-
-    def __eq__(self, other):
-        return self.val == other.val
-
-    def __str__(self):
-        return str(self.val.key)
-
-
-class MaxHeapObj(MinHeapObj):
-    def __lt__(self, other):
-        return self.val.__gt__(other.val)
-
-
+# Binary heap with a position map from vertex to slot, so membership is O(1)
+# and a key change only sifts the affected vertex instead of re-heapifying.
 class MinHeap(List[Vertex]):
+    h: List[Vertex]
+    position: Dict[Vertex, int]
+
     def __init__(self, h: List[Vertex] = []):
-        self.h = [MinHeapObj(n) for n in h]
-        heapq.heapify(self.h)
+        self.h = list(h)
+        self.position = {v: i for i, v in enumerate(self.h)}
+        for i in reversed(range(len(self.h) // 2)):
+            self._sift_down(i)
+
+    def before(self, a: Vertex, b: Vertex) -> bool:
+        return a < b
+
+    def _swap(self, i: int, j: int):
+        h = self.h
+        h[i], h[j] = h[j], h[i]
+        self.position[h[i]] = i
+        self.position[h[j]] = j
+
+    def _sift_up(self, i: int):
+        h = self.h
+        while i > 0:
+            parent = (i - 1) // 2
+            if not self.before(h[i], h[parent]):
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i: int):
+        h = self.h
+        n = len(h)
+        while True:
+            first = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and self.before(h[child], h[first]):
+                    first = child
+            if first == i:
+                break
+            self._swap(i, first)
+            i = first
 
     def heappush(self, x: Vertex):
-        heapq.heappush(self.h, MinHeapObj(x))
+        self.h.append(x)
+        self.position[x] = len(self.h) - 1
+        self._sift_up(len(self.h) - 1)
 
     def heappop(self) -> Vertex:
-        return heapq.heappop(self.h).val
+        h = self.h
+        last = h.pop()
+        if not h:
+            del self.position[last]
+            return last
+
+        top = h[0]
+        h[0] = last
+        self.position[last] = 0
+        del self.position[top]
+        self._sift_down(0)
+        return top
 
     def decrease_key(self, v: Vertex):
-        heapq.heapify(self.h)
+        self._sift_up(self.position[v])
+
+    def increase_key(self, v: Vertex):
+        self._sift_down(self.position[v])
 
     def __contains__(self, __key: Vertex) -> bool:
-        for v in self.h:
-            if v.val == __key:
-                return True
-        return False
+        return __key in self.position
 
     def __getitem__(self, i):
         return self.h[i]
@@ -156,47 +193,80 @@ class MinHeap(List[Vertex]):
 
 
 class MaxHeap(MinHeap):
+    def before(self, a: Vertex, b: Vertex) -> bool:
+        return a > b
+
+    def decrease_key(self, v: Vertex):
+        self._sift_down(self.position[v])
+
+    def increase_key(self, v: Vertex):
+        self._sift_up(self.position[v])
+
+
+# Lazy-deletion heap: a key decrease pushes a fresh entry and the outdated one
+# is dropped when it surfaces. Only vertices that were pushed are ever queued.
+class LazyMinHeap:
+    h: List[Tuple[float, int, Vertex]]
+    live: Set[Vertex]
+    counter: Iterator[int]
+
     def __init__(self, h: List[Vertex] = []):
-        self.h = [MaxHeapObj(x) for x in h]
+        self.counter = count()
+        self.h = [(v.distance, next(self.counter), v) for v in h]
+        self.live = set(h)
         heapq.heapify(self.h)
 
     def heappush(self, x: Vertex):
-        heapq.heappush(self.h, MaxHeapObj(x))
+        heapq.heappush(self.h, (x.distance, next(self.counter), x))
+        self.live.add(x)
 
     def heappop(self) -> Vertex:
-        return heapq.heappop(self.h).val
+        while True:
+            distance, _, v = heapq.heappop(self.h)
+            if v in self.live and distance == v.distance:
+                self.live.remove(v)
+                return v
 
-    def increase_key(self, v: Vertex):
-        heapq.heapify(self.h)
+    def decrease_key(self, v: Vertex):
+        self.heappush(v)
+
+    def __contains__(self, __key: Vertex) -> bool:
+        return __key in self.live
+
+    def __len__(self):
+        return len(self.live)
 
 
-def _minimum_spanning_tree(start: Vertex, G: MSTGraph):
+def _minimum_spanning_tree(
+    start: Vertex, G: MSTGraph, trace: Trace = Trace.SNAPSHOTS
+):
     start.distance = 0
 
     Q = MinHeap(G.vertices)
     e = G.edges_by_nodes
 
-    ctx.get().called_with(start.id, None, _minimum_spanning_tree, [start.key])
+    stepper = ctx.get() if trace else None
+    if stepper:
+        stepper.called_with(start.id, None, _minimum_spanning_tree, [start.key])
 
     while Q:
         u = Q.heappop()  # Extracts the vertex with min key value
-        for v in G.neighbors_of(u):
-            edge = e[u][v]
+        for v, edge in G.neighbor_edges_of(u):
             if v in Q and v.distance > edge.weight:
                 v.distance = edge.weight
-                if v.parent:
-                    e[v.parent][v].color = EdgeColor.LINE_DEFAULT.value
+                if stepper:
+                    if v.parent:
+                        e[v.parent][v].color = EdgeColor.LINE_DEFAULT.value
+                    edge.color = EdgeColor.LINE_VISITED.value
                 v.parent = u
-                e[v.parent][v].color = EdgeColor.LINE_VISITED.value
-                ctx.get().called_with(v.id, u.id, _minimum_spanning_tree, [v.key])
                 Q.decrease_key(v)
-                G.take_snapshot()
+                if stepper:
+                    stepper.called_with(v.id, u.id, _minimum_spanning_tree, [v.key])
+                if trace >= Trace.SNAPSHOTS:
+                    G.take_snapshot()
 
 
-def minimum_spanning_tree(start: Vertex, G: MSTGraph):
-    _, token = Stepper.run(_minimum_spanning_tree, start, G)
-    tree = GraphStepTree.build(
-        ctx.get().called_with_subcalls, include_output=False, include_fn=False
-    )
-    ctx.reset(token)
-    return tree
+def minimum_spanning_tree(
+    start: Vertex, G: MSTGraph, trace: Optional[Trace] = None
+) -> Optional[GraphStepTree]:
+    return run_traced(_minimum_spanning_tree, trace, start, G)
@@ -0,0 +1,113 @@
+from array import array
+from typing import Any, List, Optional, Sequence
+
+from src.graph.color import Color
+
+
+# Strongly connected components as a component id per vertex index, with ids
+# numbered in topological order of the condensation DAG.
+class Condensation:
+    vertices: List[Any]
+    component: array
+    count: int
+    successors: List[List[int]]
+
+    def __init__(
+        self,
+        vertices: List[Any],
+        component: array,
+        count: int,
+        successors: List[List[int]],
+    ):
+        self.vertices = vertices
+        self.component = component
+        self.count = count
+        self.successors = successors
+
+    def members(self) -> List[List[Any]]:
+        groups: List[List[Any]] = [[] for _ in range(self.count)]
+        for i, c in enumerate(self.component):
+            groups[c].append(self.vertices[i])
+        return groups
+
+    def colorize(self, palette: Optional[List[str]] = None):
+        palette = palette or [c.value for c in reversed(Color)]
+        for i, c in enumerate(self.component):
+            self.vertices[i].color = palette[c % len(palette)]
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def tarjan(successors: List[Sequence[int]]):
+    n = len(successors)
+    index = array("q", [-1]) * n
+    low = array("q", [0]) * n
+    component = array("q", [-1]) * n
+    on_stack = bytearray(n)
+    stack: List[int] = []
+    counter = count = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, 0)]
+
+        while work:
+            v, position = work[-1]
+            row = successors[v]
+            if position < len(row):
+                work[-1] = (v, position + 1)
+                w = row[position]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work.append((w, 0))
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+
+            work.pop()
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component[w] = count
+                    if w == v:
+                        break
+                count += 1
+
+    # Tarjan completes sink components first; flip ids into topological order
+    for i in range(n):
+        component[i] = count - 1 - component[i]
+
+    return component, count
+
+
+def condense(Adj) -> Condensation:
+    successors = Adj.successor_ids()
+    component, count = tarjan(successors)
+
+    dag: List[List[int]] = [[] for _ in range(count)]
+    seen = set()
+    for v, row in enumerate(successors):
+        cv = component[v]
+        for w in row:
+            cw = component[w]
+            if cv != cw and (cv, cw) not in seen:
+                seen.add((cv, cw))
+                dag[cv].append(cw)
+
+    return Condensation(Adj.vertices, component, count, dag)
@@ -0,0 +1,251 @@
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from heapq import heappop, heappush
+from math import inf
+from multiprocessing.shared_memory import SharedMemory
+from tempfile import mkstemp
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.graph.mst.prim import MSTGraph, Vertex
+
+WeightedCSR = Tuple[np.ndarray, np.ndarray, np.ndarray]
+# Shared block name, dtype and length of each CSR array
+SharedSpec = Dict[str, Tuple[str, str, int]]
+
+
+def weighted_csr(G: MSTGraph) -> WeightedCSR:
+    csr = G.csr
+    if csr is not None and csr.weights is not None:
+        offsets = np.frombuffer(csr.offsets, dtype=np.int64)
+        targets = np.frombuffer(csr.targets, dtype=np.int64)
+        weights = np.asarray(csr.weights, dtype=np.float64)
+        return offsets, targets, weights
+
+    vertices = G.vertices
+    successors = G.successor_ids()
+    lengths = np.fromiter(map(len, successors), dtype=np.int64, count=len(vertices))
+    offsets = np.zeros(len(vertices) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    targets = np.fromiter(
+        (j for row in successors for j in row), dtype=np.int64, count=offsets[-1]
+    )
+    weights = np.fromiter(
+        (
+            G.edges_by_node_coords(u, vertices[j]).weight
+            for u, row in zip(vertices, successors)
+            for j in row
+        ),
+        dtype=np.float64,
+        count=offsets[-1],
+    )
+    return offsets, targets, weights
+
+
+# Read-only CSR arrays copied once into named shared-memory blocks, so worker
+# processes map them instead of unpickling a graph per task. The owner unlinks
+# the blocks on exit, or as soon as creating one of them fails.
+class SharedCSR:
+    blocks: List[SharedMemory]
+    spec: SharedSpec
+
+    def __init__(self, arrays: WeightedCSR):
+        self.blocks = []
+        self.spec = {}
+        try:
+            for name, a in zip(("offsets", "targets", "weights"), arrays):
+                block = SharedMemory(create=True, size=max(a.nbytes, 1))
+                self.blocks.append(block)
+                np.ndarray(a.shape, dtype=a.dtype, buffer=block.buf)[:] = a
+                self.spec[name] = (block.name, a.dtype.str, len(a))
+        except BaseException:
+            self.release()
+            raise
+
+    def release(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self) -> SharedSpec:
+        return self.spec
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def attach(spec: SharedSpec) -> Tuple[List[SharedMemory], WeightedCSR]:
+    blocks, arrays = [], []
+    for name in ("offsets", "targets", "weights"):
+        block_name, dtype, length = spec[name]
+        block = SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays.append(np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf))
+    return blocks, (arrays[0], arrays[1], arrays[2])
+
+
+def dijkstra_row(
+    source: int,
+    offsets: Sequence[int],
+    targets: Sequence[int],
+    weights: Sequence[float],
+    row: np.ndarray,
+):
+    dist = [inf] * len(row)
+    dist[source] = 0.0
+    settled = bytearray(len(row))
+    Q = [(0.0, source)]
+    while Q:
+        d, u = heappop(Q)
+        if settled[u]:
+            continue
+        settled[u] = 1
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            alt = d + weights[e]
+            if alt < dist[v]:
+                dist[v] = alt
+                heappush(Q, (alt, v))
+    row[:] = dist
+
+
+def _dijkstra_rows(spec: SharedSpec, path: str, n: int, sources: range) -> int:
+    blocks, csr = attach(spec)
+    # Plain Python lists index faster than NumPy scalars in the inner loop
+    offsets, targets, weights = (a.tolist() for a in csr)
+    D = np.memmap(path, dtype=np.float64, mode="r+", shape=(n, n))
+    try:
+        for s in sources:
+            dijkstra_row(s, offsets, targets, weights, D[s])
+        D.flush()
+    finally:
+        del D
+        for block in blocks:
+            block.close()
+    return len(sources)
+
+
+# All-pairs distances where row `i` and column `j` follow `vertices`. The
+# matrix is a memory-mapped float64 file, so graphs whose n^2 distances don't
+# fit in memory still work. A matrix written to a given path can be reopened
+# later; without one it lives in a temporary file removed with the result.
+class DistanceMatrix:
+    vertices: List[Vertex]
+    index: Dict[Vertex, int]
+    distances: np.memmap
+    path: str
+
+    def __init__(self, vertices: List[Vertex], distances: np.memmap, path: str):
+        self.vertices = vertices
+        self.index = {v: i for i, v in enumerate(vertices)}
+        self.distances = distances
+        self.path = path
+
+    def distance(self, u: Vertex, v: Vertex) -> float:
+        return float(self.distances[self.index[u], self.index[v]])
+
+    def row(self, u: Vertex) -> np.ndarray:
+        return self.distances[self.index[u]]
+
+    def __len__(self) -> int:
+        return len(self.vertices)
+
+
+def remove_file(path: str):
+    with suppress(FileNotFoundError):
+        os.remove(path)
+
+
+# Maps a fresh matrix of infinities and lets `fill` write the distances. A
+# temporary file is removed when the returned matrix is garbage collected, or
+# at once if `fill` fails.
+def distance_matrix(
+    vertices: List[Vertex],
+    path: Optional[str],
+    fill: Callable[[np.memmap, str], None],
+) -> DistanceMatrix:
+    n = len(vertices)
+    temporary = path is None
+    if path is None:
+        fd, path = mkstemp(prefix="apsp-", suffix=".f64")
+        os.close(fd)
+    try:
+        D = np.memmap(path, dtype=np.float64, mode="w+", shape=(n, n))
+        D[:] = np.inf
+        fill(D, path)
+        D.flush()
+    except BaseException:
+        if temporary:
+            remove_file(path)
+        raise
+
+    matrix = DistanceMatrix(vertices, D, path)
+    if temporary:
+        weakref.finalize(matrix, remove_file, path)
+    return matrix
+
+
+# One Dijkstra per source over a shared CSR copy. Sources are split into a few
+# chunks per worker; each worker writes its rows straight into the mapped file.
+# Weights must be non-negative.
+def all_pairs_shortest_paths(
+    G: MSTGraph,
+    workers: Optional[int] = None,
+    path: Optional[str] = None,
+    chunks_per_worker: int = 4,
+) -> DistanceMatrix:
+    vertices = G.vertices
+    n = len(vertices)
+    csr = weighted_csr(G)
+    assert len(csr[2]) == 0 or csr[2].min() >= 0, "weights must be non-negative"
+
+    workers = workers or os.cpu_count() or 1
+
+    def fill(D: np.memmap, path: str):
+        if workers == 1 or n < 2:
+            offsets, targets, weights = (a.tolist() for a in csr)
+            for s in range(n):
+                dijkstra_row(s, offsets, targets, weights, D[s])
+            return
+
+        D.flush()
+        step = max(1, -(-n // (workers * chunks_per_worker)))
+        with SharedCSR(csr) as spec, ProcessPoolExecutor(workers) as pool:
+            futures = [
+                pool.submit(
+                    _dijkstra_rows, spec, path, n, range(i, min(i + step, n))
+                )
+                for i in range(0, n, step)
+            ]
+            for future in futures:
+                future.result()
+
+    return distance_matrix(vertices, path, fill)
+
+
+# Floyd-Warshall with each relaxation round as one broadcast over the matrix:
+# D = min(D, D[:, k] + D[k, :]). Handles negative weights; a negative diagonal
+# entry afterwards means that vertex lies on a negative cycle.
+def floyd_warshall(G: MSTGraph, path: Optional[str] = None) -> DistanceMatrix:
+    vertices = G.vertices
+    n = len(vertices)
+    offsets, targets, weights = weighted_csr(G)
+
+    def fill(D: np.memmap, path: str):
+        sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+        np.minimum.at(D, (sources, targets), weights)
+        D[np.arange(n), np.arange(n)] = np.minimum(np.diagonal(D), 0.0)
+        for k in range(n):
+            np.minimum(D, D[:, k, None] + D[None, k, :], out=D)
+
+    return distance_matrix(vertices, path, fill)
+
+
+def open_distances(vertices: List[Vertex], path: str) -> DistanceMatrix:
+    n = len(vertices)
+    D: Any = np.memmap(path, dtype=np.float64, mode="r", shape=(n, n))
+    return DistanceMatrix(vertices, D, path)
@@ -1,34 +1,284 @@
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
 from src.graph.mst.prim import EdgeColor, MSTGraph, Vertex
-from src.graph.step import GraphStepTree
-from src.tree.step import Stepper, ctx
+from src.graph.sssp.apsp import weighted_csr
+from src.graph.step import GraphStepTree, Trace, run_traced
+from src.tree.step import ctx
+
+
+# Following parent links n times from a vertex relaxed after convergence should
+# have landed on a negative cycle; returns it in edge order, or None when the
+# walk reaches a root first.
+def parent_cycle(v: Any, parent_of: Callable[[Any], Any], n: int) -> Optional[List]:
+    for _ in range(n):
+        v = parent_of(v)
+        if v is None:
+            return None
+
+    cycle = [v]
+    u = parent_of(v)
+    while u is not None and u != v and len(cycle) <= n:
+        cycle.append(u)
+        u = parent_of(u)
+    if u != v:
+        return None
+    cycle.reverse()
+    return cycle
+
+
+# Raised when a negative cycle is reachable from the source, so shortest
+# distances are undefined. `cycle` is in edge order; traced runs attach the
+# call tree recorded up to the point the cycle was found.
+class NegativeCycle(Exception):
+    cycle: List[Vertex]
+    tree: Optional[GraphStepTree]
+
+    def __init__(self, cycle: List[Vertex], tree: Optional[GraphStepTree] = None):
+        super().__init__(f"negative cycle through {[v.key for v in cycle]}")
+        self.cycle = cycle
+        self.tree = tree
+
+
+# Runs either search at the requested tracing level. The searches return the
+# cycle they found, which a traced run would otherwise drop in favour of the
+# call tree, so it is raised the same way at every level.
+def run_checked(
+    fn: Callable, trace: Optional[Trace], start: Vertex, Adj: MSTGraph
+) -> Optional[GraphStepTree]:
+    found: List[Optional[List[Vertex]]] = []
+
+    def search(*args, **kwargs):
+        found.append(fn(*args, **kwargs))
+
+    tree = run_traced(search, trace, start, Adj)
+    if found[0] is not None:
+        raise NegativeCycle(found[0], tree)
+    return tree
 
 
-def _single_source_shortest_path(start: Vertex, Adj: MSTGraph):
+def _single_source_shortest_path(
+    start: Vertex, Adj: MSTGraph, trace: Trace = Trace.SNAPSHOTS
+) -> Optional[List[Vertex]]:
     start.distance = 0
 
     V = Adj.vertices
     E = Adj._edge_from_node_coords
     e = Adj.edges_by_nodes
 
-    ctx.get().called_with(start.id, None, _single_source_shortest_path, [start.key])
+    stepper = ctx.get() if trace else None
+    if stepper:
+        stepper.called_with(start.id, None, _single_source_shortest_path, [start.key])
 
+    # A pass that relaxes nothing means every distance is final
     for _ in range(len(V) - 1):
+        relaxed = False
         for coords, edge in E.items():
             u, v = coords
             if v.distance > u.distance + edge.weight:
                 v.distance = u.distance + edge.weight
-                if v.parent:
-                    e[v.parent][v].color = EdgeColor.LINE_DEFAULT.value
+                if stepper:
+                    if v.parent:
+                        e[v.parent][v].color = EdgeColor.LINE_DEFAULT.value
+                    e[u][v].color = EdgeColor.LINE_VISITED.value
                 v.parent = u
-                e[v.parent][v].color = EdgeColor.LINE_VISITED.value
-                ctx.get().called_with(v.id, u.id, _single_source_shortest_path, [v.key])
-                Adj.take_snapshot()
+                relaxed = True
+                if stepper:
+                    stepper.called_with(
+                        v.id, u.id, _single_source_shortest_path, [v.key]
+                    )
+                if trace >= Trace.SNAPSHOTS:
+                    Adj.take_snapshot()
+        if not relaxed:
+            return None
 
+    for (u, v), edge in E.items():
+        if v.distance > u.distance + edge.weight:
+            v.parent = u
+            return parent_cycle(v, lambda x: x.parent, len(V))
+    return None
 
-def single_source_shortest_path(start: Vertex, Adj: MSTGraph):
-    _, token = Stepper.run(_single_source_shortest_path, start, Adj)
-    tree = GraphStepTree.build(
-        ctx.get().called_with_subcalls, include_output=False, include_fn=False
-    )
-    ctx.reset(token)
-    return tree
+
+def single_source_shortest_path(
+    start: Vertex, Adj: MSTGraph, trace: Optional[Trace] = None
+) -> Optional[GraphStepTree]:
+    return run_checked(_single_source_shortest_path, trace, start, Adj)
+
+
+# SPFA: only vertices whose distance just dropped are queued to relax their
+# out-edges again. A vertex dequeued n times sits behind a negative cycle.
+def _shortest_path_faster(
+    start: Vertex, Adj: MSTGraph, trace: Trace = Trace.SNAPSHOTS
+) -> Optional[List[Vertex]]:
+    start.distance = 0
+
+    n = len(Adj.vertices)
+    e = Adj.edges_by_nodes
+    Q: Deque[Vertex] = deque([start])
+    queued = {start}
+    rounds = {start: 0}
+
+    stepper = ctx.get() if trace else None
+    if stepper:
+        stepper.called_with(start.id, None, _shortest_path_faster, [start.key])
+
+    while Q:
+        u = Q.popleft()
+        queued.discard(u)
+        rounds[u] = rounds.get(u, 0) + 1
+        if rounds[u] >= n:
+            cycle = parent_cycle(u, lambda x: x.parent, n)
+            if cycle is not None:
+                return cycle
+
+        for v, edge in Adj.neighbor_edges_of(u):
+            if v.distance > u.distance + edge.weight:
+                v.distance = u.distance + edge.weight
+                if stepper:
+                    if v.parent:
+                        e[v.parent][v].color = EdgeColor.LINE_DEFAULT.value
+                    edge.color = EdgeColor.LINE_VISITED.value
+                v.parent = u
+                if stepper:
+                    stepper.called_with(v.id, u.id, _shortest_path_faster, [v.key])
+                if trace >= Trace.SNAPSHOTS:
+                    Adj.take_snapshot()
+                if v not in queued:
+                    queued.add(v)
+                    Q.append(v)
+    return None
+
+
+def shortest_path_faster(
+    start: Vertex, Adj: MSTGraph, trace: Optional[Trace] = None
+) -> Optional[GraphStepTree]:
+    return run_checked(_shortest_path_faster, trace, start, Adj)
+
+
+# Untraced Bellman-Ford over vertex indexes. `distance[i]` and `parent[i]`
+# refer to `vertices[i]`; unreached vertices keep inf and -1. `cycle` holds a
+# negative cycle reachable from the source, if there is one.
+class ShortestPaths:
+    vertices: List[Vertex]
+    distance: np.ndarray
+    parent: np.ndarray
+    cycle: Optional[List[Vertex]]
+
+    def __init__(
+        self,
+        vertices: List[Vertex],
+        distance: np.ndarray,
+        parent: np.ndarray,
+        cycle: Optional[List[Vertex]] = None,
+        index: Optional[Dict[Vertex, int]] = None,
+    ):
+        self.vertices = vertices
+        self.distance = distance
+        self.parent = parent
+        self.cycle = cycle
+        if index is None:
+            index = {v: i for i, v in enumerate(vertices)}
+        self.index = index
+
+    def distance_of(self, v: Vertex) -> float:
+        return float(self.distance[self.index[v]])
+
+    def path_to(self, v: Vertex) -> List[Vertex]:
+        assert self.cycle is None, "distances are undefined with a negative cycle"
+        i = self.index[v]
+        if np.isinf(self.distance[i]):
+            return []
+        path = [i]
+        while self.parent[path[-1]] >= 0:
+            path.append(int(self.parent[path[-1]]))
+        return [self.vertices[j] for j in reversed(path)]
+
+
+# Sequential Bellman-Ford over the index arrays. Unlike the simultaneous
+# passes below, a vertex relaxed in pass n is guaranteed to sit behind a
+# parent cycle, so this finds the cycle they can miss. Pure Python, O(V E).
+def sequential_cycle(
+    start: int, offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray
+) -> Optional[List[int]]:
+    n = len(offsets) - 1
+    offsets, targets, weights = offsets.tolist(), targets.tolist(), weights.tolist()
+    distance = [float("inf")] * n
+    parent = [-1] * n
+    distance[start] = 0.0
+
+    last = -1
+    for _ in range(n):
+        last = -1
+        for u in range(n):
+            du = distance[u]
+            if du == float("inf"):
+                continue
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if du + weights[e] < distance[v]:
+                    distance[v] = du + weights[e]
+                    parent[v] = u
+                    last = v
+        if last < 0:
+            return None
+
+    return parent_cycle(last, lambda i: None if parent[i] < 0 else parent[i], n)
+
+
+# Every pass relaxes all edges at once: candidates dist[u] + w are reduced per
+# target with np.minimum.at, and a vertex whose distance dropped takes the
+# parent of one edge achieving the new minimum. Passes stop when nothing
+# drops. Still dropping after n - 1 passes means a negative cycle, extracted
+# once the parent pointers close one up; if they have not after 2n passes, a
+# sequential pass finds it.
+def vectorized_shortest_paths(start: Vertex, Adj: MSTGraph) -> ShortestPaths:
+    vertices = Adj.vertices
+    n = len(vertices)
+    offsets, targets, weights = weighted_csr(Adj)
+    sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+
+    index: Optional[Dict[Vertex, int]] = None
+    if Adj.csr is not None:
+        s = Adj.csr.index[start.key]
+    else:
+        index = {v: i for i, v in enumerate(vertices)}
+        s = index[start]
+
+    distance = np.full(n, np.inf)
+    parent = np.full(n, -1, dtype=np.int64)
+    distance[s] = 0
+
+    for rounds in range(1, 2 * n + 1):
+        candidate = distance[sources] + weights
+        best = distance.copy()
+        np.minimum.at(best, targets, candidate)
+        dropped = best < distance
+        if not dropped.any():
+            return ShortestPaths(vertices, distance, parent, index=index)
+
+        # Among edges reaching the new minimum, the last write wins
+        winner = dropped[targets] & (candidate == best[targets])
+        parent[targets[winner]] = sources[winner]
+        distance = best
+
+        if rounds >= n:
+
+            def parent_of(i: int) -> Optional[int]:
+                return None if parent[i] < 0 else int(parent[i])
+
+            for i in np.flatnonzero(dropped):
+                cycle = parent_cycle(int(i), parent_of, n)
+                if cycle is not None:
+                    cycle_vertices = [vertices[j] for j in cycle]
+                    return ShortestPaths(
+                        vertices, distance, parent, cycle_vertices, index
+                    )
+
+    # Distances were still dropping, so there is a cycle even though the
+    # simultaneous parent pointers never closed it up
+    cycle = sequential_cycle(s, offsets, targets, weights)
+    assert cycle is not None, "distances dropping without a negative cycle"
+    cycle_vertices = [vertices[j] for j in cycle]
+    return ShortestPaths(vertices, distance, parent, cycle_vertices, index)
@@ -1,34 +1,80 @@
-from src.graph.mst.prim import EdgeColor, MinHeap, MSTGraph, Vertex
-from src.graph.step import GraphStepTree
-from src.tree.step import Stepper, ctx
+from math import inf
+from typing import Iterable, Optional, Set
 
+from src.graph.mst.prim import EdgeColor, LazyMinHeap, MinHeap, MSTGraph, Vertex
+from src.graph.sssp.point_to_point import astar
+from src.graph.step import GraphStepTree, Trace, run_traced
+from src.tree.step import ctx
 
-def _single_source_shortest_path(start: Vertex, G: MSTGraph):
+
+def _single_source_shortest_path(
+    start: Vertex,
+    G: MSTGraph,
+    targets: Optional[Iterable[Vertex]] = None,
+    lazy: bool = False,
+    trace: Trace = Trace.SNAPSHOTS,
+):
+    # Results are reported on every vertex, and an early exit leaves the rest
+    # of the graph mid-search, so every run resets all of them. Point-to-point
+    # queries that shouldn't pay O(V) go through `shortest_path` instead.
+    for v in G.vertices:
+        v.distance = inf
+        v.parent = None
     start.distance = 0
 
-    Q = MinHeap(G.vertices)
+    # A query for given targets usually settles a small part of the graph, so
+    # it only queues what it reaches
+    if lazy or targets is not None:
+        Q = LazyMinHeap([start])
+    else:
+        Q = MinHeap(G.vertices)
     e = G.edges_by_nodes
+    settled: Set[Vertex] = set()
+    remaining = set(targets) if targets is not None else None
 
-    ctx.get().called_with(start.id, None, _single_source_shortest_path, [start.key])
+    stepper = ctx.get() if trace else None
+    if stepper:
+        stepper.called_with(start.id, None, _single_source_shortest_path, [start.key])
 
     while Q:
         u = Q.heappop()  # Extracts the vertex with min key value
-        for v in G.neighbors_of(u):
-            edge = e[u][v]
+        settled.add(u)
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                break
+
+        for v, edge in G.neighbor_edges_of(u):
+            if v in settled:
+                continue
             if v.distance > u.distance + edge.weight:
                 v.distance = u.distance + edge.weight
-                if v.parent:
-                    e[v.parent][v].color = EdgeColor.LINE_DEFAULT.value
+                if stepper:
+                    if v.parent:
+                        e[v.parent][v].color = EdgeColor.LINE_DEFAULT.value
+                    edge.color = EdgeColor.LINE_VISITED.value
                 v.parent = u
-                e[v.parent][v].color = EdgeColor.LINE_VISITED.value
-                ctx.get().called_with(v.id, u.id, _single_source_shortest_path, [v.key])
-                G.take_snapshot()
-
-
-def single_source_shortest_path(start: Vertex, G: MSTGraph):
-    _, token = Stepper.run(_single_source_shortest_path, start, G)
-    tree = GraphStepTree.build(
-        ctx.get().called_with_subcalls, include_output=False, include_fn=False
-    )
-    ctx.reset(token)
-    return tree
+                Q.decrease_key(v)
+                if stepper:
+                    stepper.called_with(
+                        v.id, u.id, _single_source_shortest_path, [v.key]
+                    )
+                if trace >= Trace.SNAPSHOTS:
+                    G.take_snapshot()
+
+
+def single_source_shortest_path(
+    start: Vertex,
+    G: MSTGraph,
+    targets: Optional[Iterable[Vertex]] = None,
+    lazy: bool = False,
+    trace: Optional[Trace] = None,
+) -> Optional[GraphStepTree]:
+    return run_traced(_single_source_shortest_path, trace, start, G, targets, lazy)
+
+
+# One start-target query with the search state kept in local maps (A* without
+# a heuristic), so it costs only what it explores and leaves vertex attributes
+# alone. Returns [] when target is unreachable.
+def shortest_path(start: Vertex, target: Vertex, G: MSTGraph):
+    return astar(start, target, G).path
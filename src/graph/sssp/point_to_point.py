@@ -0,0 +1,151 @@
+from heapq import heappop, heappush
+from itertools import count
+from math import hypot, inf
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from src.graph.mst.prim import MSTGraph, Vertex
+
+# Lower bound on the distance from a vertex to the target
+Heuristic = Callable[[Vertex, Vertex], float]
+
+
+# Straight-line distance between coordinates stored as vertex attributes.
+# Admissible as long as no edge weighs less than `scale` times its length.
+def euclidean(x: str = "x", y: str = "y", scale: float = 1.0) -> Heuristic:
+    def h(v: Vertex, target: Vertex) -> float:
+        dx = getattr(v, x) - getattr(target, x)
+        dy = getattr(v, y) - getattr(target, y)
+        return scale * hypot(dx, dy)
+
+    return h
+
+
+# A point-to-point result. `settled` counts the vertices taken off the queue,
+# the usual measure of search effort; the path is empty if target is
+# unreachable.
+class SearchResult:
+    path: List[Vertex]
+    distance: float
+    settled: int
+
+    def __init__(self, path: List[Vertex], distance: float, settled: int):
+        self.path = path
+        self.distance = distance
+        self.settled = settled
+
+    def __repr__(self) -> str:
+        keys = [v.key for v in self.path]
+        return (
+            f"SearchResult({keys}, distance={self.distance}, "
+            f"settled={self.settled})"
+        )
+
+
+def out_arcs(G: MSTGraph, u: Vertex) -> Iterator[Tuple[Vertex, float]]:
+    for v, edge in G.neighbor_edges_of(u):
+        yield v, edge.weight
+
+
+def in_arcs(G: MSTGraph, v: Vertex) -> Iterator[Tuple[Vertex, float]]:
+    e = G.edges_by_nodes
+    for u in G.in_neighbors_of(v):
+        yield u, e[u][v].weight
+
+
+def walk(
+    parent: Dict[Vertex, Optional[Vertex]], v: Optional[Vertex]
+) -> List[Vertex]:
+    path = []
+    while v is not None:
+        path.append(v)
+        v = parent[v]
+    return path
+
+
+# A* with the heuristic as a lower bound on the remaining distance; without
+# one it is Dijkstra that stops at the target. Search state lives in local
+# maps, so vertex attributes are untouched. A vertex reached again by a
+# shorter path is reopened, which keeps the result optimal for heuristics
+# that are admissible but not consistent. Weights must be non-negative.
+def astar(
+    start: Vertex,
+    target: Vertex,
+    G: MSTGraph,
+    heuristic: Optional[Heuristic] = None,
+) -> SearchResult:
+    h = heuristic or (lambda v, t: 0.0)
+    tie = count()
+    dist: Dict[Vertex, float] = {start: 0}
+    parent: Dict[Vertex, Optional[Vertex]] = {start: None}
+    Q = [(h(start, target), next(tie), 0, start)]
+    settled = 0
+
+    while Q:
+        _, __, d, u = heappop(Q)
+        if d > dist[u]:
+            continue
+        settled += 1
+        if u is target:
+            path = walk(parent, target)
+            path.reverse()
+            return SearchResult(path, d, settled)
+
+        for v, w in out_arcs(G, u):
+            alt = d + w
+            if alt < dist.get(v, inf):
+                dist[v] = alt
+                parent[v] = u
+                heappush(Q, (alt + h(v, target), next(tie), alt, v))
+
+    return SearchResult([], inf, settled)
+
+
+# Dijkstra from both ends at once: forward along out-edges from the start,
+# backward along in-edges from the target, always advancing the side with
+# the smaller queue head. `best` is the shortest start-target path seen
+# through any vertex labelled by both sides; the search stops once the two
+# queue heads together can't beat it. Weights must be non-negative.
+def bidirectional_dijkstra(
+    start: Vertex, target: Vertex, G: MSTGraph
+) -> SearchResult:
+    if start is target:
+        return SearchResult([start], 0, 1)
+
+    arcs = (out_arcs, in_arcs)
+    tie = count()
+    dist: Tuple[Dict[Vertex, float], ...] = ({start: 0}, {target: 0})
+    parent: Tuple[Dict[Vertex, Optional[Vertex]], ...] = (
+        {start: None},
+        {target: None},
+    )
+    done: Tuple[Set[Vertex], ...] = (set(), set())
+    Q: Tuple[List, ...] = ([(0, next(tie), start)], [(0, next(tie), target)])
+    best, meet = inf, None
+    settled = 0
+
+    while Q[0] and Q[1]:
+        if Q[0][0][0] + Q[1][0][0] >= best:
+            break
+        side = 0 if Q[0][0][0] <= Q[1][0][0] else 1
+        d, _, u = heappop(Q[side])
+        if u in done[side]:
+            continue
+        done[side].add(u)
+        settled += 1
+
+        mine, other = dist[side], dist[1 - side]
+        for v, w in arcs[side](G, u):
+            alt = d + w
+            if alt < mine.get(v, inf):
+                mine[v] = alt
+                parent[side][v] = u
+                heappush(Q[side], (alt, next(tie), v))
+            if v in other and mine[v] + other[v] < best:
+                best, meet = mine[v] + other[v], v
+
+    if meet is None:
+        return SearchResult([], inf, settled)
+    path = walk(parent[0], meet)
+    path.reverse()
+    path.extend(walk(parent[1], parent[1][meet]))
+    return SearchResult(path, best, settled)
@@ -1,6 +1,17 @@
-from typing import Optional
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Callable, Optional
 
-from src.tree.step import Node, Tree
+from src.tree.step import Node, Stepper, Tree, ctx
+
+
+class Trace(IntEnum):
+    OFF = 0
+    STEPS = 1
+    SNAPSHOTS = 2
+
+
+trace_ctx: ContextVar[Trace] = ContextVar("trace", default=Trace.SNAPSHOTS)
 
 
 class GraphStepTree(Tree):
@@ -13,3 +24,25 @@ class GraphStepTree(Tree):
         # .value)}"
         classDefs: str = "classDef subcall fill:#87ceeb"
         return super().render(node, formatter=formatter, classDefs=classDefs, **kwargs)
+
+
+def set_trace(trace: Trace):
+    return trace_ctx.set(trace)
+
+
+# Runs `fn` at the requested tracing level (the context default when None).
+# Traced runs go through a fresh Stepper and return the call tree; untraced
+# runs skip the Stepper entirely and pass through whatever `fn` returns.
+def run_traced(
+    fn: Callable, trace: Optional[Trace], *args, **kwargs
+) -> Any:
+    level = trace_ctx.get() if trace is None else trace
+    if level == Trace.OFF:
+        return fn(*args, trace=level, **kwargs)
+
+    _, token = Stepper.run(fn, *args, trace=level, **kwargs)
+    tree = GraphStepTree.build(
+        ctx.get().called_with_subcalls, include_output=False, include_fn=False
+    )
+    ctx.reset(token)
+    return tree
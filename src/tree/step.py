@@ -1,13 +1,17 @@
-import random
+import pickle
+from array import array
 from collections import namedtuple
 from contextvars import ContextVar
 from enum import Enum
-from typing import Any, Callable, List, Optional
+from io import SEEK_END
+from itertools import count
+from tempfile import TemporaryFile
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
 
 from src.mermaid import Mermaid
 from src.tree.base import BaseNode, BaseTree
 
-Hash = str
+Hash = int
 Case = Enum("Case", "CALLED RETURN CACHED SUBCALL")
 Step = namedtuple(
     "Step", "index case id parent_id return_value fn args output output_case"
@@ -16,13 +20,141 @@ Step = namedtuple(
 ctx: ContextVar["Stepper"] = ContextVar("stepper")
 
 
+# Steps stored column-wise: case, id, parent id and function name live in typed
+# arrays (strings interned to ints), while return values, args and outputs are
+# kept as Python objects. With a window set, at most twice that many payloads
+# stay in memory; older ones are pickled in chunks to an append-only spill file
+# and read back by offset when needed.
+class StepLog:
+    cases: array
+    ids: array
+    parents: array
+    fns: array
+    strings: List[Any]
+    codes: Dict[Any, int]
+    payloads: Dict[int, Tuple[Any, Any, Any]]
+    spilled: array
+    by_case: Dict[int, array]
+    by_id: Dict[int, Dict[int, int]]
+    window: Optional[int]
+    spill: Optional[BinaryIO]
+
+    def __init__(self, window: Optional[int] = None, spill: Optional[BinaryIO] = None):
+        assert window is None or window > 0
+        self.cases = array("B")
+        self.ids = array("q")
+        self.parents = array("q")
+        self.fns = array("q")
+        self.strings = []
+        self.codes = {}
+        self.payloads = {}
+        self.spilled = array("q")
+        self.by_case = {case.value: array("q") for case in Case}
+        self.by_id = {case.value: {} for case in Case}
+        self.window = window
+        self.spill = spill
+
+    def intern(self, value: Any) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def string(self, code: int) -> Any:
+        return None if code < 0 else self.strings[code]
+
+    def append(
+        self,
+        case: Case,
+        id: Hash,
+        parent_id: Optional[Hash],
+        return_value: Any,
+        fn: Optional[str],
+        args: Optional[List[Any]],
+        output: Optional[Any],
+    ) -> int:
+        index = len(self.cases)
+        code = self.intern(id)
+        value = case.value
+        self.cases.append(value)
+        self.ids.append(code)
+        self.parents.append(self.intern(parent_id))
+        self.fns.append(self.intern(fn))
+        self.payloads[index] = (return_value, args, output)
+        self.by_case[value].append(index)
+        self.by_id[value][code] = index
+
+        if self.window is not None and len(self.payloads) >= 2 * self.window:
+            self.spill_oldest(self.window)
+        return index
+
+    def spill_oldest(self, count: int):
+        # Payloads leave memory in index order, so `spilled[i]` is step i's offset
+        if self.spill is None:
+            self.spill = TemporaryFile()
+        end = self.spill.seek(0, SEEK_END)
+        chunk = bytearray()
+        for index in range(len(self.spilled), len(self.spilled) + count):
+            self.spilled.append(end + len(chunk))
+            chunk += pickle.dumps(self.payloads.pop(index))
+        self.spill.write(chunk)
+
+    def payload(self, index: int) -> Tuple[Any, Any, Any]:
+        if index in self.payloads:
+            return self.payloads[index]
+        assert self.spill is not None
+        self.spill.seek(self.spilled[index])
+        return pickle.load(self.spill)
+
+    def __getitem__(self, index: int) -> Step:
+        return_value, args, output = self.payload(index)
+        return Step(
+            index,
+            Case(self.cases[index]),
+            self.strings[self.ids[index]],
+            self.string(self.parents[index]),
+            return_value,
+            self.string(self.fns[index]),
+            args,
+            output,
+            None,
+        )
+
+    def find(self, id: Hash, case: Case = Case.CALLED) -> Optional[Step]:
+        index = self.by_id[case.value].get(self.codes.get(id, -1))
+        return None if index is None else self[index]
+
+    def of_case(self, case: Case) -> List[Step]:
+        return [self[index] for index in self.by_case[case.value]]
+
+    def __iter__(self) -> Iterator[Step]:
+        return (self[index] for index in range(len(self)))
+
+    def __len__(self) -> int:
+        return len(self.cases)
+
+
+# Step ids handed out by `hash` are small ints counted per trace, so they never
+# collide within one trace and intern cheaply.
 class Stepper:
-    steps: List[Step] = []
-    index: int = 0
+    log: StepLog
+    ids: Iterator[int]
+    window: Optional[int] = None
 
-    def __init__(self):
-        self.steps = []
-        self.index = 0
+    def __init__(self, window: Optional[int] = None):
+        self.log = StepLog(window if window is not None else self.window)
+        self.ids = count()
+
+    @property
+    def steps(self) -> List[Step]:
+        return list(self.log)
+
+    @property
+    def index(self) -> int:
+        return len(self.log)
 
     def step(
         self,
@@ -34,10 +166,7 @@ class Stepper:
         args: Optional[List[Any]] = None,
         output: Optional[Any] = None,
     ):
-        self.steps.append(
-            Step(self.index, case, id, parent_id, return_value, fn, args, output, None)
-        )
-        self.index += 1
+        self.log.append(case, id, parent_id, return_value, fn, args, output)
 
     def called_with(
         self, id: Hash, parent_id: Optional[Hash], fn: Callable, args: List[Any]
@@ -56,59 +185,64 @@ class Stepper:
         self._return(Case.CACHED, *args)
 
     def hash(self) -> Hash:
-        return hex(random.getrandbits(24))[2:]
+        return next(self.ids)
 
     @property
     def called_steps(self):
-        return [s for s in self.steps if s.case == Case.CALLED]
+        return self.log.of_case(Case.CALLED)
 
     @property
     def return_steps(self):
-        return [s for s in self.steps if s.case == Case.RETURN]
+        return self.log.of_case(Case.RETURN)
 
     @property
     def cached_steps(self):
-        return [s for s in self.steps if s.case == Case.CACHED]
+        return self.log.of_case(Case.CACHED)
 
     @property
     def called_with_output_values(self):
-        called = {s.id: s for s in self.called_steps}
-        returned = {s.id: s for s in self.return_steps}
-        cached = {s.id: s for s in self.cached_steps}
-
-        result = {}
-        for id, step in called.items():
-            if id in cached:
-                result[id] = step._replace(
-                    output=cached[id].return_value, output_case=Case.CACHED
+        log = self.log
+        returned = log.by_id[Case.RETURN.value]
+        cached = log.by_id[Case.CACHED.value]
+
+        result = []
+        for code, index in log.by_id[Case.CALLED.value].items():
+            if code in cached:
+                result.append(
+                    log[index]._replace(
+                        output=log.payload(cached[code])[0], output_case=Case.CACHED
+                    )
                 )
-            elif id in returned:
-                result[id] = step._replace(
-                    output=returned[id].return_value, output_case=Case.RETURN
+            elif code in returned:
+                result.append(
+                    log[index]._replace(
+                        output=log.payload(returned[code])[0], output_case=Case.RETURN
+                    )
                 )
 
-        return list(result.values())
+        return result
 
     @property
     def called_with_subcalls(self):
-        called = {s.id: s for s in self.called_steps}
-
-        result = {}
-        for id, step in called.items():
+        result = []
+        for index in self.log.by_id[Case.CALLED.value].values():
+            step = self.log[index]
             if step.output is None:
-                result[id] = step._replace(output_case=Case.SUBCALL)
+                result.append(step._replace(output_case=Case.SUBCALL))
 
-        return list(result.values())
+        return result
 
+    # `window` goes to the fresh Stepper (the class default when None); all
+    # other arguments are passed on to `fn`.
     @staticmethod
-    def run(fn: Callable, *args, **kwargs):
-        token = ctx.set(Stepper())
+    def run(fn: Callable, *args, window: Optional[int] = None, **kwargs):
+        token = ctx.set(Stepper(window))
         result = fn(*args, **kwargs)
         return result, token
 
     @staticmethod
-    def run_gen(fn: Callable, *args):
-        token = ctx.set(Stepper())
+    def run_gen(fn: Callable, *args, window: Optional[int] = None):
+        token = ctx.set(Stepper(window))
         result = yield from fn(*args)
         return result, token
 
@@ -0,0 +1,19 @@
+from src.graph.graph import VertexBase
+
+
+# Vertex and edge attributes by key, with vertex-valued attributes as keys, so
+# graphs built separately (or from different storages) compare equal
+def state(G):
+    def plain(x):
+        return ("vertex", x.key) if isinstance(x, VertexBase) else x
+
+    def values(obj):
+        return {f: plain(x) for f, x in obj.values.items()}
+
+    vertices = {v.key: values(v) for v in G.vertices}
+    edges = {
+        (u.key, v.key): values(G.edges_by_node_coords(u, v))
+        for u in G.vertices
+        for v in G.neighbors_of(u)
+    }
+    return vertices, edges
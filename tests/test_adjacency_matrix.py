@@ -0,0 +1,43 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.graph.graph import GraphBase, Storage
+
+
+def random_graph(seed, n=15, m=40):
+    rng = random.Random(seed)
+    D = nx.DiGraph()
+    D.add_nodes_from(range(n))
+    for _ in range(m):
+        D.add_edge(rng.randrange(n), rng.randrange(n))
+    G = GraphBase.from_template({u: list(D.successors(u)) for u in D})
+    return D, G
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_networkx(seed, storage):
+    D, G = random_graph(seed)
+    if storage == Storage.CSR:
+        G = GraphBase.from_template(G.template, storage)
+    M = G.to_matrix
+    expected = nx.to_numpy_array(D, nodelist=M.rows, dtype=np.int64)
+
+    assert M.rows == sorted(D)
+    assert (M.to_numpy() == expected).all()
+    assert (M.to_sparse().toarray() == expected).all()
+    assert M.matrix == {k: expected[i].tolist() for i, k in enumerate(M.rows)}
+    assert M.out_degrees().tolist() == [D.out_degree(k) for k in M.rows]
+    assert M.in_degrees().tolist() == [D.in_degree(k) for k in M.rows]
+
+    for k in range(5):
+        walks = np.linalg.matrix_power(expected, k)
+        assert (M.walk_counts(k) == walks).all()
+        assert (M.walk_counts(k, sparse=True).toarray() == walks).all()
+
+    closure = nx.transitive_closure(D, reflexive=False)
+    reach = nx.to_numpy_array(closure, nodelist=M.rows) > 0
+    assert (M.transitive_closure() == reach).all()
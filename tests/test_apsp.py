@@ -0,0 +1,58 @@
+import gc
+import os
+from tempfile import gettempdir
+
+import pytest
+
+from src.graph.mst.prim import MSTGraph
+from src.graph.sssp import apsp
+
+template = {
+    "a": [("b", {"weight": 2}, {}), ("c", {"weight": 5}, {})],
+    "b": [("c", {"weight": 1}, {})],
+    "c": [],
+}
+
+
+@pytest.mark.parametrize(
+    "run",
+    [
+        lambda G: apsp.all_pairs_shortest_paths(G, workers=1),
+        lambda G: apsp.all_pairs_shortest_paths(G, workers=2),
+        apsp.floyd_warshall,
+    ],
+)
+def test_temporary_file_is_removed_with_the_result(run):
+    G = MSTGraph.from_template(template)
+    D = run(G)
+    k = G.node_by_key
+    assert D.distance(k("a"), k("c")) == 3
+    path = D.path
+    assert os.path.exists(path)
+    del D
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_given_path_is_kept(tmp_path):
+    G = MSTGraph.from_template(template)
+    path = str(tmp_path / "d.f64")
+    apsp.floyd_warshall(G, path)
+    gc.collect()
+    D = apsp.open_distances(G.vertices, path)
+    assert D.distance(G.node_by_key("a"), G.node_by_key("c")) == 3
+
+
+def temporary_files():
+    return {p for p in os.listdir(gettempdir()) if p.startswith("apsp-")}
+
+
+def test_temporary_file_is_removed_on_failure(monkeypatch):
+    def fail(*args):
+        raise RuntimeError("stop")
+
+    before = temporary_files()
+    monkeypatch.setattr(apsp, "dijkstra_row", fail)
+    with pytest.raises(RuntimeError):
+        apsp.all_pairs_shortest_paths(MSTGraph.from_template(template), workers=1)
+    assert temporary_files() == before
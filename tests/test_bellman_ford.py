@@ -0,0 +1,105 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.graph.graph import Storage
+from src.graph.mst.prim import MSTGraph
+from src.graph.sssp import bellman_ford
+from src.graph.sssp.apsp import weighted_csr
+from src.graph.sssp.bellman_ford import NegativeCycle
+from src.graph.step import GraphStepTree, Trace
+
+searches = [
+    bellman_ford.single_source_shortest_path,
+    bellman_ford.shortest_path_faster,
+]
+
+negative = {
+    "s": [("a", 4)],
+    "a": [("b", 1)],
+    "b": [("c", -3)],
+    "c": [("a", 1), ("d", 2)],
+    "d": [],
+}
+
+
+def cycle_weight(G, cycle):
+    e = G.edges_by_nodes
+    return sum(e[u][v].weight for u, v in zip(cycle, cycle[1:] + cycle[:1]))
+
+
+@pytest.mark.parametrize("search", searches)
+@pytest.mark.parametrize("trace", list(Trace))
+def test_negative_cycle_raised_at_every_level(search, trace):
+    G = MSTGraph.from_template(negative)
+    with pytest.raises(NegativeCycle) as info:
+        search(G.node_by_key("s"), G, trace=trace)
+    cycle = info.value.cycle
+    assert sorted(v.key for v in cycle) == ["a", "b", "c"]
+    assert cycle_weight(G, cycle) < 0
+    if trace == Trace.OFF:
+        assert info.value.tree is None
+    else:
+        assert isinstance(info.value.tree, GraphStepTree)
+
+
+@pytest.mark.parametrize("search", searches)
+def test_no_cycle(search):
+    template = {**negative, "c": [("a", 3), ("d", 2)]}
+    G = MSTGraph.from_template(template)
+    assert isinstance(search(G.node_by_key("s"), G), GraphStepTree)
+    assert search(G.node_by_key("s"), G, trace=Trace.OFF) is None
+    assert G.node_by_key("d").distance == 4
+
+
+def test_vectorized_reports_the_same_cycle():
+    G = MSTGraph.from_template(negative)
+    result = bellman_ford.vectorized_shortest_paths(G.node_by_key("s"), G)
+    assert result.cycle is not None
+    assert cycle_weight(G, result.cycle) < 0
+
+
+def random_weighted(seed, n=12, m=30):
+    rng = random.Random(seed)
+    template = {i: [] for i in range(n)}
+    for _ in range(m):
+        u, v = rng.sample(range(n), 2)
+        template[u].append((v, rng.randint(-3, 10)))
+    return template
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+@pytest.mark.parametrize("seed", range(40))
+def test_vectorized_matches_networkx(storage, seed):
+    G = MSTGraph.from_template(random_weighted(seed), storage)
+    start = G.vertices[0]
+    N = nx.DiGraph()
+    N.add_nodes_from(v.key for v in G.vertices)
+    for v in G.vertices:
+        for w, edge in G.neighbor_edges_of(v):
+            N.add_edge(v.key, w.key, weight=edge.weight)
+
+    result = bellman_ford.vectorized_shortest_paths(start, G)
+    try:
+        expected = nx.single_source_bellman_ford_path_length(N, start.key)
+    except nx.NetworkXUnbounded:
+        assert result.cycle is not None
+        assert cycle_weight(G, result.cycle) < 0
+        return
+    assert result.cycle is None
+    for v in G.vertices:
+        assert result.distance_of(v) == expected.get(v.key, float("inf"))
+
+
+def test_sequential_cycle():
+    G = MSTGraph.from_template(negative)
+    offsets, targets, weights = weighted_csr(G)
+    s = G.vertices.index(G.node_by_key("s"))
+    cycle = bellman_ford.sequential_cycle(s, offsets, targets, weights)
+    assert sorted(G.vertices[i].key for i in cycle) == ["a", "b", "c"]
+    assert cycle_weight(G, [G.vertices[i] for i in cycle]) < 0
+
+    G = MSTGraph.from_template({**negative, "c": [("a", 3), ("d", 2)]})
+    offsets, targets, weights = weighted_csr(G)
+    assert bellman_ford.sequential_cycle(s, offsets, targets, weights) is None
@@ -0,0 +1,9 @@
+from src.graph.benchmark import random_template
+
+
+def test_random_template_has_no_duplicate_edges():
+    t = random_template(300, 6)
+    weights = {(u, v): w for u, edges in t.items() for v, w in edges}
+    assert len(weights) == sum(map(len, t.values()))
+    assert all(u != v for u, v in weights)
+    assert all(weights[v, u] == w for (u, v), w in weights.items())
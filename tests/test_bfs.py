@@ -0,0 +1,71 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.graph import bfs
+from src.graph.bfs import BFSGraph, fast_breadth_first_search
+from src.graph.graph import Storage, predecessor_ids
+
+modes = {
+    "top-down": dict(direction_optimizing=False),
+    "default": dict(),
+    "bottom-up": dict(alpha=10**9, beta=10**9),
+}
+
+
+def random_digraph(seed, n=60, m=150):
+    rng = random.Random(seed)
+    D = nx.DiGraph()
+    D.add_nodes_from(range(n))
+    for _ in range(m):
+        D.add_edge(rng.randrange(n), rng.randrange(n))
+    return D
+
+
+def check(result, G, D, sources):
+    expected = nx.multi_source_dijkstra_path_length(D, sources, weight=lambda *_: 1)
+    for v in G.vertices:
+        assert result.distance_of(v) == expected.get(v.key)
+        path = result.path_to(v)
+        assert len(path) == (0 if v.key not in expected else expected[v.key] + 1)
+        for u, w in zip(path, path[1:]):
+            assert D.has_edge(u.key, w.key)
+        if path:
+            assert path[0].key in sources and path[-1] is v
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+@pytest.mark.parametrize("mode", modes)
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_networkx(seed, mode, storage, monkeypatch):
+    calls = []
+
+    def spy(successors):
+        calls.append(1)
+        return predecessor_ids(successors)
+
+    monkeypatch.setattr(bfs, "predecessor_ids", spy)
+    D = random_digraph(seed)
+    G = BFSGraph.from_template({u: list(D.successors(u)) for u in D}, storage)
+    sources = [0, 1, 2]
+    result = fast_breadth_first_search(
+        [G.node_by_key(k) for k in sources], G, **modes[mode]
+    )
+    check(result, G, D, sources)
+    if mode == "bottom-up":
+        assert calls
+    if mode == "top-down":
+        assert not calls
+
+
+@pytest.mark.parametrize("mode", modes)
+@pytest.mark.parametrize("seed", range(10))
+def test_undirected_reuses_successors(seed, mode, monkeypatch):
+    monkeypatch.setattr(bfs, "predecessor_ids", None)
+    U = random_digraph(seed).to_undirected()
+    G = BFSGraph.from_template({u: list(U.neighbors(u)) for u in U})
+    result = fast_breadth_first_search(
+        [G.node_by_key(0)], G, undirected=True, **modes[mode]
+    )
+    check(result, G, U.to_directed(), [0])
@@ -0,0 +1,117 @@
+import math
+import random
+
+import networkx as nx
+import pytest
+
+from src.graph import dfs
+from src.graph.dfs import DFSGraph
+from src.graph.graph import Storage
+
+template = {"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": []}
+
+
+def keys(vertices):
+    return [v.key for v in vertices]
+
+
+def assert_valid(order, G):
+    position = {v: i for i, v in enumerate(order.order)}
+    assert set(position) == set(G.vertices)
+    for u in G.vertices:
+        for v in G.neighbors_of(u):
+            assert position[u] < position[v]
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_insertions_keep_a_valid_order(storage):
+    G = DFSGraph.from_template(template, storage)
+    order = G.topological_order()
+    k = G.node_by_key
+    e = order.add_node("e")
+    assert order.add_edge(e, k("a")) is None
+    assert order.add_edge(k("b"), k("c")) is None
+    cycle = order.add_edge(k("d"), e)
+    assert keys(cycle) == ["d", "e", "a", "b", "c"] or keys(cycle) == [
+        "d",
+        "e",
+        "a",
+        "c",
+    ]
+    assert e not in G.neighbors_of(k("d"))
+    assert_valid(order, G)
+
+
+def test_rejected_edge_returns_the_cycle():
+    G = DFSGraph.from_template(template)
+    order = G.topological_order()
+    k = G.node_by_key
+    cycle = order.add_edge(k("d"), k("a"))
+    assert cycle is not None
+    assert keys(cycle)[:2] == ["d", "a"] and keys(cycle)[-1] in ("b", "c")
+    assert k("a") not in G.neighbors_of(k("d"))
+    assert_valid(order, G)
+
+
+def test_removals():
+    G = DFSGraph.from_template(template)
+    order = G.topological_order()
+    k = G.node_by_key
+    b, c, d = k("b"), k("c"), k("d")
+
+    order.remove_edge(b, d)
+    assert order.add_edge(d, b) is None
+    assert_valid(order, G)
+
+    order.remove_node(c)
+    assert c not in order.order and len(order) == 3
+    assert_valid(order, G)
+
+    # Enough removals to compact the slots
+    order.remove_node(k("a"))
+    assert len(order.slots) == len(order) == 2
+    assert keys(order.order) == ["d", "b"]
+    assert_valid(order, G)
+
+
+def random_dag(seed, n):
+    rng = random.Random(seed)
+    D = nx.DiGraph()
+    D.add_nodes_from(range(n))
+    for u in range(n):
+        D.add_edges_from((u, v) for v in range(u + 1, n) if rng.random() < 0.3)
+    return D
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+@pytest.mark.parametrize("seed", range(20))
+def test_sortings_match_networkx(storage, seed):
+    D = random_dag(seed, 7)
+    if seed % 2:
+        D.add_edge(6, 0)
+    G = DFSGraph.from_template({u: list(D.successors(u)) for u in D}, storage)
+    expected = []
+    if nx.is_directed_acyclic_graph(D):
+        expected = sorted(map(list, nx.all_topological_sorts(D)))
+    assert sorted(G.topological_sortings) == expected
+    assert G.count_topological_sortings == len(expected)
+
+
+def test_counting_large_graphs():
+    chain = DFSGraph.from_template({i: [i + 1] for i in range(2000)})
+    assert chain.count_topological_sortings == 1
+    assert list(chain.topological_sortings) == [list(range(2001))]
+    wide = DFSGraph.from_template({i: [] for i in range(12)})
+    assert wide.count_topological_sortings == math.factorial(12)
+    empty = DFSGraph.from_template({})
+    assert empty.count_topological_sortings == 1
+    assert list(empty.topological_sortings) == [[]]
+
+
+def test_counting_refuses_too_many_states(monkeypatch):
+    monkeypatch.setattr(dfs, "MAX_COUNT_STATES", 100)
+    wide = DFSGraph.from_template({i: [] for i in range(12)})
+    with pytest.raises(ValueError, match="placed-sets"):
+        wide.count_topological_sortings
+    narrow = DFSGraph.from_template({i: [] for i in range(8)})
+    assert narrow.count_topological_sortings == math.factorial(8)
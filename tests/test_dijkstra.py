@@ -0,0 +1,72 @@
+from math import inf
+
+from src.graph.benchmark import random_template
+from src.graph.graph import Storage
+from src.graph.mst.prim import MSTGraph
+from src.graph.sssp.dijkstra import shortest_path, single_source_shortest_path
+from src.graph.step import Trace
+
+template = {
+    "a": [("b", 1), ("c", 5)],
+    "b": [("c", 1), ("d", 10)],
+    "c": [("d", 1)],
+    "d": [],
+}
+
+
+def keys(path):
+    return [v.key for v in path]
+
+
+def test_repeated_queries_on_one_graph():
+    for storage in Storage:
+        G = MSTGraph.from_template(template, storage)
+        k = G.node_by_key
+        assert keys(shortest_path(k("a"), k("d"), G)) == ["a", "b", "c", "d"]
+        assert keys(shortest_path(k("b"), k("d"), G)) == ["b", "c", "d"]
+        assert keys(shortest_path(k("c"), k("a"), G)) == []
+        assert keys(shortest_path(k("a"), k("c"), G)) == ["a", "b", "c"]
+
+
+def test_full_search_after_early_exit():
+    G = MSTGraph.from_template(template)
+    k = G.node_by_key
+    shortest_path(k("a"), k("b"), G)
+    single_source_shortest_path(k("c"), G, trace=Trace.OFF)
+    assert {v.key: v.distance for v in G.vertices} == {
+        "a": inf,
+        "b": inf,
+        "c": 0,
+        "d": 1,
+    }
+    assert k("b").parent is None
+
+
+def test_shortest_path_leaves_vertices_alone():
+    G = MSTGraph.from_template(template)
+    k = G.node_by_key
+    assert keys(shortest_path(k("a"), k("d"), G)) == ["a", "b", "c", "d"]
+    assert all(v.distance == inf and v.parent is None for v in G.vertices)
+
+
+def test_shortest_path_matches_full_search():
+    t = random_template(200, 3, seed=7)
+    for storage in Storage:
+        G = MSTGraph.from_template(t, storage)
+        single_source_shortest_path(G.node_by_key(0), G, trace=Trace.OFF)
+        expected = {v.key: v.distance for v in G.vertices}
+        start = G.node_by_key(0)
+        for v in G.vertices[::7]:
+            path = shortest_path(start, v, G)
+            assert path[0] is start and path[-1] is v
+            length = sum(
+                G.edges_by_node_coords(a, b).weight for a, b in zip(path, path[1:])
+            )
+            assert length == expected[v.key]
+
+
+def test_targets_stop_early_with_correct_distances():
+    G = MSTGraph.from_template(template)
+    k = G.node_by_key
+    single_source_shortest_path(k("a"), G, [k("c")], trace=Trace.OFF)
+    assert k("c").distance == 2 and k("c").parent is k("b")
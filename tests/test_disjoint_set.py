@@ -0,0 +1,31 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.graph.disjoint_set import DisjointSet
+
+
+def test_union_and_find():
+    ds = DisjointSet(6)
+    assert len(ds) == 6 and ds.count == 6
+    assert ds.union(0, 1) and ds.union(2, 3) and ds.union(1, 3)
+    assert not ds.union(0, 2)
+    assert ds.count == 3
+    assert ds.connected(0, 3) and not ds.connected(0, 4)
+    assert ds.find(0) == ds.find(1) == ds.find(2) == ds.find(3)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_networkx_components(seed):
+    rng = random.Random(seed)
+    n = 40
+    ds = DisjointSet(n)
+    G = nx.empty_graph(n)
+    for _ in range(30):
+        i, j = rng.randrange(n), rng.randrange(n)
+        assert ds.union(i, j) == (not nx.has_path(G, i, j))
+        G.add_edge(i, j)
+    assert ds.count == nx.number_connected_components(G)
+    for component in nx.connected_components(G):
+        assert len({ds.find(i) for i in component}) == 1
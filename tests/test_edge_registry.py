@@ -0,0 +1,61 @@
+import pytest
+
+from src.graph.graph import EdgeBase, EdgeRegistry, GraphBase, Storage, VertexBase
+
+
+def edges(n):
+    V = [VertexBase(key=i) for i in range(n + 1)]
+    return [EdgeBase(V[i], V[i + 1]) for i in range(n)]
+
+
+def assert_consistent(R):
+    assert [e.id for e in R] == list(range(len(R)))
+    assert all(e in R for e in R)
+
+
+def test_add_dedupes_and_remove_swaps_last():
+    a, b, c, d = edges(4)
+    R = EdgeRegistry([a, b, a, c])
+    assert list(R) == [a, b, c] and len(R) == 3
+    assert R.add(b) == 1 and R.add(d) == 3
+
+    R.remove(a)
+    assert list(R) == [d, b, c]
+    assert a not in R and a.id is None
+    assert_consistent(R)
+
+    R.remove(c)
+    assert list(R) == [d, b]
+    assert_consistent(R)
+    with pytest.raises(AssertionError, match="not registered"):
+        R.remove(a)
+
+
+def test_membership_is_per_registry():
+    a, b = edges(2)
+    R, S = EdgeRegistry([a]), EdgeRegistry([b])
+    assert a in R and a not in S and b not in R
+
+
+def test_hash_is_cached_and_undirected():
+    (a,) = edges(1)
+    assert hash(a) == hash(frozenset((0, 1))) == hash(EdgeBase(a.v, a.u))
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_graph_keeps_one_entry_per_edge(storage):
+    G = GraphBase.from_template({"a": ["b"], "b": ["a", "c"], "c": []}, storage)
+    k = G.node_by_key
+    assert len(G.edges) == 2
+    assert_consistent(G.edge_registry)
+
+    shared = G.add_edge(k("c"), k("a"), undirected=True)
+    assert G.edges.count(shared) == 1 and len(G.edges) == 3
+    assert_consistent(G.edge_registry)
+
+    G.remove_edge(k("c"), k("a"))
+    assert shared in G.edge_registry
+    G.remove_edge(k("a"), k("c"))
+    assert shared not in G.edge_registry
+    G.remove_node(k("b"))
+    assert G.edges == []
@@ -0,0 +1,23 @@
+from src.graph.dfs import DFSGraph, depth_first_search
+from src.graph.step import Trace
+
+template = {"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": []}
+
+
+def test_export_round_trip():
+    G = DFSGraph.from_template(template)
+    depth_first_search(G.node_by_key("a"), G, trace=Trace.OFF)
+    X = G.export_vertices()
+    assert len(X) == 4 and "start_time" in X and "parent" in X
+    assert X.kinds["start_time"] == "int" and X.kinds["parent"] == "vertex"
+
+    frame = X.to_frame()
+    for v in G.vertices:
+        assert frame.loc[v.key, "start_time"] == v.start_time
+    assert frame.loc["a", "parent"] == -1
+
+    expected = [(v.start_time, v.parent, v.color) for v in G.vertices]
+    for v in G.vertices:
+        v.start_time, v.parent, v.color = 0, None, "x"
+    X.scatter()
+    assert [(v.start_time, v.parent, v.color) for v in G.vertices] == expected
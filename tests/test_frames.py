@@ -0,0 +1,22 @@
+import os
+
+import matplotlib
+
+from src.graph.dfs import DFSGraph, depth_first_search
+from src.graph.step import Trace
+
+matplotlib.use("Agg")
+
+
+# Not one of the classes a graph file may name on its own
+class LabelledGraph(DFSGraph):
+    pass
+
+
+def test_parallel_export_of_a_subclass(tmp_path):
+    G = LabelledGraph.from_template({"a": ["b", "c"], "b": ["c"], "c": []})
+    depth_first_search(G.node_by_key("a"), G, trace=Trace.SNAPSHOTS)
+    directory = str(tmp_path)
+    paths = G.render_snapshots_to_files(directory, kind="digraph", workers=2)
+    assert len(paths) == len(G.snapshots) > 1
+    assert sorted(os.listdir(directory)) == sorted(map(os.path.basename, paths))
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from src.graph.dfs import DFSGraph, depth_first_search
+from src.graph.graph import GraphBase, Storage
+from src.graph.graphfile import HEADER, MAGIC, read_graph
+from src.graph.step import Trace
+from tests.graphs import state
+
+template = {"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": ["a"]}
+
+
+@pytest.mark.parametrize("saved", list(Storage))
+@pytest.mark.parametrize("loaded", list(Storage))
+def test_round_trip_with_snapshots(tmp_path, saved, loaded):
+    G = DFSGraph.from_template(template, saved)
+    depth_first_search(G.node_by_key("a"), G, trace=Trace.SNAPSHOTS)
+    path = str(tmp_path / "g.gm")
+    G.save(path)
+
+    H = read_graph(path, storage=loaded)
+    assert type(H) is DFSGraph and H.storage == loaded
+    assert state(H) == state(G)
+    assert len(H.snapshots) == len(G.snapshots) > 0
+    for i in range(len(G.snapshots)):
+        assert state(H.snapshots[i]) == state(G.snapshots[i])
+
+
+def test_values_keep_their_types(tmp_path):
+    G = GraphBase.from_template({"a": ["b"], "b": ["a"]})
+    G.node_by_key("a").extra = {"$tuple": (1, 2.5), 3: [None, float("inf")]}
+    G.node_by_key("b").extra = G.node_by_key("a")
+    path = str(tmp_path / "g.gm")
+    G.save(path)
+    H = read_graph(path)
+    assert H.node_by_key("a").extra == G.node_by_key("a").extra
+    assert H.node_by_key("b").extra is H.node_by_key("a")
+
+
+def test_unknown_graph_class_is_refused(tmp_path):
+    path = str(tmp_path / "g.gm")
+    GraphBase.from_template(template).save(path)
+    with open(path, "r+b") as f:
+        _, offset, length = HEADER.unpack(f.read(HEADER.size))
+        f.seek(offset)
+        directory = json.loads(f.read(length))
+        directory["class"] = "os:system"
+        blob = json.dumps(directory).encode()
+        f.seek(offset)
+        f.write(blob)
+        f.truncate()
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, offset, len(blob)))
+
+    with pytest.raises(ValueError, match="unknown graph class"):
+        read_graph(path)
+    assert type(read_graph(path, GraphBase)) is GraphBase
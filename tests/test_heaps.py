@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from src.graph.mst.prim import LazyMinHeap, MaxHeap, MinHeap, Vertex
+
+
+def vertices(distances):
+    return [Vertex(i, distance=d) for i, d in enumerate(distances)]
+
+
+def drain(Q):
+    out = []
+    while Q:
+        out.append(Q.heappop().distance)
+    return out
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("heap", [MinHeap, MaxHeap, LazyMinHeap])
+def test_pop_order(heap, seed):
+    rng = random.Random(seed)
+    V = vertices(rng.randint(0, 50) for _ in range(30))
+    Q = heap(V[:10])
+    for v in V[10:]:
+        Q.heappush(v)
+    assert len(Q) == 30 and all(v in Q for v in V)
+    assert drain(Q) == sorted((v.distance for v in V), reverse=heap is MaxHeap)
+    assert not any(v in Q for v in V)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("heap", [MinHeap, LazyMinHeap])
+def test_decrease_key(heap, seed):
+    rng = random.Random(seed)
+    V = vertices(rng.randint(0, 100) for _ in range(30))
+    Q = heap(V)
+    popped = [Q.heappop() for _ in range(5)]
+    for v in rng.sample([v for v in V if v not in popped], 10):
+        v.distance -= rng.randint(0, 100)
+        Q.decrease_key(v)
+    rest = [v for v in V if v not in popped]
+    assert drain(Q) == sorted(v.distance for v in rest)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_min_heap_increase_key(seed):
+    rng = random.Random(seed)
+    V = vertices(rng.randint(0, 100) for _ in range(30))
+    Q = MinHeap(V)
+    for v in rng.sample(V, 10):
+        v.distance += rng.randint(0, 100)
+        Q.increase_key(v)
+    assert drain(Q) == sorted(v.distance for v in V)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_max_heap_key_changes(seed):
+    rng = random.Random(seed)
+    V = vertices(rng.randint(0, 100) for _ in range(30))
+    Q = MaxHeap(V)
+    for v in rng.sample(V, 10):
+        if rng.random() < 0.5:
+            v.distance += rng.randint(0, 100)
+            Q.increase_key(v)
+        else:
+            v.distance -= rng.randint(0, 100)
+            Q.decrease_key(v)
+    assert drain(Q) == sorted((v.distance for v in V), reverse=True)
+
+
+def test_lazy_heap_skips_stale_entries():
+    V = vertices([5, 3, 8])
+    Q = LazyMinHeap(V)
+    V[2].distance = 1
+    Q.decrease_key(V[2])
+    V[2].distance = 0
+    Q.decrease_key(V[2])
+    assert len(Q) == 3
+    assert [Q.heappop() for _ in range(3)] == [V[2], V[1], V[0]]
+    assert len(Q) == 0
@@ -0,0 +1,42 @@
+import pytest
+
+from src.graph.graph import GraphBase, IdAllocator, Storage, VertexBase, vertex_ids
+from src.tree.step import Stepper
+
+template = {"a": ["b", "c"], "b": ["c"], "c": []}
+
+
+def test_allocator_hands_out_disjoint_blocks():
+    ids = IdAllocator()
+    assert ids.reserve(3) == 0
+    assert ids.reserve() == 3
+    assert ids.reserve(0) == 4
+    assert ids.reserve(2) == 4
+    assert ids.next == 6
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_graph_ids_are_a_dense_block(storage):
+    G = GraphBase.from_template(template, storage)
+    H = GraphBase.from_template(template, storage)
+    assert [v.id - G.id_base for v in G.vertices] == [0, 1, 2]
+    assert [v.id - H.id_base for v in H.vertices] == [0, 1, 2]
+    assert H.id_base >= G.id_base + 3
+
+    v = G.add_node("d")
+    assert v.id >= H.id_base + 3
+    assert len({u.id for u in G.vertices + H.vertices}) == 7
+
+
+def test_standalone_vertex_reserves_on_first_use():
+    v = VertexBase(key="x")
+    before = vertex_ids.next
+    first = v.id
+    assert first == before and v.id == first
+    assert VertexBase(key="y").id == first + 1
+
+
+def test_step_ids_count_per_trace():
+    first, second = Stepper(), Stepper()
+    assert [first.hash() for _ in range(3)] == [0, 1, 2]
+    assert second.hash() == 0
@@ -0,0 +1,31 @@
+import pytest
+
+from src.graph.graph import GraphBase
+from src.graph.journal import MIN_INTERVAL, SnapshotJournal
+
+
+def path(n):
+    return {i: [i + 1] if i + 1 < n else [] for i in range(n)}
+
+
+def record(G, steps):
+    for i in range(steps):
+        G.vertices[i % len(G.vertices)].color = f"c{i}"
+        G.take_snapshot()
+
+
+@pytest.mark.parametrize("n, interval", [(5, MIN_INTERVAL), (100, 199)])
+def test_interval_follows_graph_size(n, interval):
+    G = GraphBase.from_template(path(n))
+    record(G, 2 * interval + 1)
+    assert G.snapshots.interval == interval
+    assert G.snapshots.checkpoint_ids == [0, interval, 2 * interval]
+
+
+def test_given_interval_is_kept():
+    G = GraphBase.from_template(path(100))
+    G.snapshots = SnapshotJournal(G, 4)
+    record(G, 10)
+    assert G.snapshots.checkpoint_ids == [0, 4, 8]
+    colors = [v.color for v in G.snapshots[6].vertices[:7]]
+    assert colors == [f"c{i}" for i in range(7)]
@@ -0,0 +1,61 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.graph.mst import kruskals
+from src.graph.step import GraphStepTree, Trace
+
+weighted = {
+    0: [(1, 4), (2, 1)],
+    1: [(2, 2), (3, 5)],
+    2: [(3, 8)],
+    3: [],
+}
+
+
+@pytest.mark.parametrize("trace", list(Trace))
+def test_tree_return_matches_trace(trace):
+    G = kruskals.KruskalsGraph.from_template(weighted)
+    tree = kruskals.minimum_spanning_tree(G, trace=trace)
+    if trace == Trace.OFF:
+        assert tree is None
+    else:
+        assert isinstance(tree, GraphStepTree)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_spanning_edges(lazy):
+    G = kruskals.KruskalsGraph.from_template(weighted)
+    edges = kruskals.minimum_spanning_edges(G, lazy)
+    assert [e.weight for e in edges] == [1, 2, 5]
+
+
+def random_weighted(seed, n=25):
+    rng = random.Random(seed)
+    N = nx.gnm_random_graph(n, rng.randint(n - 1, 3 * n), seed=seed)
+    template = {i: [] for i in range(n)}
+    for u, v in N.edges:
+        w = rng.randint(1, 30)
+        N[u][v]["weight"] = w
+        template[u].append((v, w))
+        template[v].append((u, w))
+    N.remove_nodes_from([i for i in range(n) if not template[i]])
+    return {k: x for k, x in template.items() if x}, N
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_networkx(seed, lazy):
+    template, N = random_weighted(seed)
+    G = kruskals.KruskalsGraph.from_template(template)
+    edges = kruskals.minimum_spanning_edges(G, lazy)
+    expected = sorted(d["weight"] for *_, d in nx.minimum_spanning_edges(N))
+    assert sorted(e.weight for e in edges) == expected
+    assert [e.weight for e in edges] == sorted(e.weight for e in edges)
+
+    components = nx.number_connected_components(N)
+    assert len(edges) == len(N) - components
+    assert len({v.component for v in G.vertices}) == components
+    for c in nx.connected_components(N):
+        assert len({G.node_by_key(k).component for k in c}) == 1
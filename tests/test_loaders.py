@@ -0,0 +1,81 @@
+import pytest
+
+from src.graph.benchmark import random_template
+from src.graph.graph import Storage
+from src.graph.loaders import load_edges, write_edge_binary
+from src.graph.mst.prim import MSTGraph
+
+
+def weighted_edges(G):
+    return {
+        (u.key, v.key): G.edges_by_node_coords(u, v).weight
+        for u in G.vertices
+        for v in G.neighbors_of(u)
+    }
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_csv_and_tsv(tmp_path, storage):
+    csv = write(tmp_path, "g.csv", "u,v,w\n# comment\n1,2,0.5\n2,3,4\n\n1,2,9\n")
+    G = MSTGraph.from_edge_list(csv, header=True, storage=storage)
+    # Undirected by default; the repeated 1,2 row is dropped
+    assert weighted_edges(G) == {(1, 2): 0.5, (2, 1): 0.5, (2, 3): 4, (3, 2): 4}
+
+    tsv = write(tmp_path, "g.tsv", "a\tb\t1\nb\tc\t2\n")
+    G = MSTGraph.from_edge_list(tsv, key=str, storage=storage, directed=True)
+    assert weighted_edges(G) == {("a", "b"): 1, ("b", "c"): 2}
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("1,2,1\n3\n", "line 3: expected 'u, v\\[, weight\\]'"),
+        ("1,2,1\n2,3\n", "line 3: earlier rows have a weight"),
+        ("1,2\n2,3,1\n", "line 3: earlier rows have no weight"),
+        ("1,2,1\nx,3,1\n", "line 3: invalid literal"),
+        ("1,2,1\n2,3,heavy\n", "line 3: could not convert"),
+    ],
+)
+def test_parse_errors_name_the_line(tmp_path, text, message):
+    path = write(tmp_path, "g.csv", "u,v,w\n" + text)
+    for storage in Storage:
+        with pytest.raises(ValueError, match=message):
+            MSTGraph.from_edge_list(path, header=True, storage=storage)
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_weighted_and_unweighted_edges_dont_mix(storage):
+    chunks = [[(1, 2, 1.0)], [(2, 3, None)]]
+    with pytest.raises(ValueError, match="edge 2: earlier edges have a weight"):
+        load_edges(MSTGraph, chunks, storage)
+    G = load_edges(MSTGraph, chunks, storage, default_weight=7)
+    assert weighted_edges(G)[2, 3] == 7
+
+
+@pytest.mark.parametrize("saved", list(Storage))
+@pytest.mark.parametrize("loaded", list(Storage))
+def test_binary_round_trip(tmp_path, saved, loaded):
+    G = MSTGraph.from_template(random_template(50, 3), saved)
+    path = str(tmp_path / "g.bin")
+    write_edge_binary(G, path)
+    H = MSTGraph.from_edge_binary(path, storage=loaded)
+    assert H.storage == loaded
+    assert weighted_edges(H) == weighted_edges(G)
+
+    write_edge_binary(G, path, directed=True)
+    H = MSTGraph.from_edge_binary(path, storage=loaded, directed=True)
+    assert weighted_edges(H) == weighted_edges(G)
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_empty_binary_file(tmp_path, storage):
+    path = str(tmp_path / "g.bin")
+    write_edge_binary(MSTGraph.from_template({}), path)
+    G = MSTGraph.from_edge_binary(path, storage=storage)
+    assert G.storage == storage and len(G.vertices) == 0 and len(G.edges) == 0
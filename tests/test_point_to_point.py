@@ -0,0 +1,93 @@
+import random
+from math import inf
+
+import networkx as nx
+import pytest
+
+from src.graph.graph import Storage
+from src.graph.mst.prim import MSTGraph
+from src.graph.sssp.point_to_point import astar, bidirectional_dijkstra, euclidean
+
+searches = [astar, bidirectional_dijkstra]
+
+
+def reference(G):
+    N = nx.DiGraph()
+    N.add_nodes_from(v.key for v in G.vertices)
+    for v in G.vertices:
+        for w, edge in G.neighbor_edges_of(v):
+            N.add_edge(v.key, w.key, weight=edge.weight)
+    return N
+
+
+def path_weight(G, path):
+    e = G.edges_by_nodes
+    return sum(e[u][v].weight for u, v in zip(path, path[1:]))
+
+
+def check(result, start, target, G, N):
+    try:
+        expected = nx.dijkstra_path_length(N, start.key, target.key)
+    except nx.NetworkXNoPath:
+        assert result.distance == inf and result.path == []
+        return
+    assert result.distance == expected
+    assert result.path[0] is start and result.path[-1] is target
+    assert path_weight(G, result.path) == expected
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+@pytest.mark.parametrize("search", searches)
+@pytest.mark.parametrize("seed", range(15))
+def test_matches_networkx(seed, search, storage):
+    rng = random.Random(seed)
+    n = 20
+    template = {i: [] for i in range(n)}
+    for _ in range(50):
+        u, v = rng.sample(range(n), 2)
+        template[u].append((v, rng.randint(0, 20)))
+    G = MSTGraph.from_template(template, storage)
+    N = reference(G)
+    start = G.vertices[0]
+    for target in G.vertices:
+        check(search(start, target, G), start, target, G, N)
+
+
+# Keys are "i,j" strings: tuple keys would read as (key, arguments)
+def grid(width):
+    rng = random.Random(width)
+    template = {}
+    for i in range(width):
+        for j in range(width):
+            template[f"{i},{j}"] = [
+                (f"{a},{b}", rng.randint(10, 14))
+                for a, b in ((i + 1, j), (i, j + 1), (i - 1, j), (i, j - 1))
+                if 0 <= a < width and 0 <= b < width
+            ]
+    return template
+
+
+def test_euclidean_heuristic_settles_fewer_vertices():
+    width = 20
+    G = MSTGraph.from_template(grid(width))
+    for v in G.vertices:
+        v.x, v.y = map(int, v.key.split(","))
+    N = reference(G)
+    start = G.node_by_key("0,0")
+    target = G.node_by_key(f"{width - 1},{width - 1}")
+
+    plain = astar(start, target, G)
+    guided = astar(start, target, G, euclidean(scale=10))
+    both = bidirectional_dijkstra(start, target, G)
+    for result in (plain, guided, both):
+        check(result, start, target, G, N)
+    assert guided.settled < plain.settled
+    assert both.settled < plain.settled
+
+
+@pytest.mark.parametrize("search", searches)
+def test_start_is_target(search):
+    G = MSTGraph.from_template({"a": [("b", 1)], "b": []})
+    a = G.node_by_key("a")
+    result = search(a, a, G)
+    assert result.path == [a] and result.distance == 0
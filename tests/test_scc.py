@@ -0,0 +1,61 @@
+from collections import defaultdict
+
+import pytest
+
+from src.graph.dfs import DFSGraph
+from src.graph.graph import Graph, Storage
+
+template = {
+    "a": ["b"],
+    "b": ["c", "e", "f"],
+    "c": ["d", "g"],
+    "d": ["c", "h"],
+    "e": ["a", "f"],
+    "f": ["g"],
+    "g": ["f", "h"],
+    "h": ["h"],
+}
+components = {frozenset("abe"), frozenset("cd"), frozenset("fg"), frozenset("h")}
+
+
+def by_color(G):
+    groups = defaultdict(set)
+    for v in G.vertices:
+        groups[v.color].add(v.key)
+    return {frozenset(g) for g in groups.values()}
+
+
+def test_traced_components():
+    source = DFSGraph.from_template(template)
+    G, H, trees = source.strongly_connected_components()
+    assert by_color(G) == components
+    assert len(trees) == len(components)
+
+    # The first pass's DFS forest is left intact on G
+    for v in G.vertices:
+        assert v.start_time < v.end_time
+        if v.parent is not None:
+            assert v.parent.start_time < v.start_time < v.end_time < v.parent.end_time
+
+    # H is a separate graph with every edge reversed
+    assert isinstance(H, Graph)
+    assert {v for v in H.vertices}.isdisjoint(G.vertices)
+    for u in source.vertices:
+        for v in source.neighbors_of(u):
+            h = H.node_by_key(v.key)
+            assert u.key in [w.key for w in H.neighbors_of(h)]
+
+    # The source graph is untouched
+    assert all(v.start_time is None and not v.visited for v in source.vertices)
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_condensation(storage):
+    G = DFSGraph.from_template(template, storage)
+    condensation = G.condensation()
+    groups = {frozenset(v.key for v in group) for group in condensation.members()}
+    assert groups == components
+
+    # Components are numbered in topological order of the condensation DAG
+    for c, row in enumerate(condensation.successors):
+        assert all(c < d for d in row)
@@ -0,0 +1,69 @@
+import pytest
+
+from src.graph.benchmark import random_template
+from src.graph.dfs import DFSGraph, depth_first_search
+from src.graph.graph import Storage
+from src.graph.mst import kruskals, prim
+from src.graph.mst.prim import MSTGraph
+from src.graph.sssp import bellman_ford, dijkstra
+from src.graph.step import Trace
+from tests.graphs import state
+
+weighted = random_template(30, 3)
+plain = {u: [v for v, _ in edges] for u, edges in weighted.items()}
+
+algorithms = {
+    "dfs": (
+        lambda storage: DFSGraph.from_template(plain, storage),
+        lambda G: depth_first_search(G.node_by_key(0), G, trace=Trace.SNAPSHOTS),
+    ),
+    "prim": (
+        lambda storage: MSTGraph.from_template(weighted, storage),
+        lambda G: prim.minimum_spanning_tree(G.node_by_key(0), G, Trace.SNAPSHOTS),
+    ),
+    "kruskal": (
+        lambda storage: kruskals.KruskalsGraph.from_template(weighted, storage),
+        lambda G: kruskals.minimum_spanning_tree(G, trace=Trace.SNAPSHOTS),
+    ),
+    "dijkstra": (
+        lambda storage: MSTGraph.from_template(weighted, storage),
+        lambda G: dijkstra.single_source_shortest_path(
+            G.node_by_key(0), G, trace=Trace.SNAPSHOTS
+        ),
+    ),
+    "bellman_ford": (
+        lambda storage: MSTGraph.from_template(weighted, storage),
+        lambda G: bellman_ford.single_source_shortest_path(
+            G.node_by_key(0), G, Trace.SNAPSHOTS
+        ),
+    ),
+    "spfa": (
+        lambda storage: MSTGraph.from_template(weighted, storage),
+        lambda G: bellman_ford.shortest_path_faster(
+            G.node_by_key(0), G, trace=Trace.SNAPSHOTS
+        ),
+    ),
+}
+
+
+# Each snapshot used to be a full clone of the graph taken at that point; the
+# journal has to rebuild exactly that state
+@pytest.mark.parametrize("storage", list(Storage))
+@pytest.mark.parametrize("name", list(algorithms))
+def test_journal_matches_full_clones(name, storage):
+    build, run = algorithms[name]
+    G = build(storage)
+    clones = []
+    take_snapshot = G.take_snapshot
+
+    def clone_and_take():
+        clones.append(state(G.clone()))
+        return take_snapshot()
+
+    G.take_snapshot = clone_and_take
+    run(G)
+
+    assert len(clones) == len(G.snapshots) > 1
+    for i in reversed(range(len(clones))):
+        assert state(G.snapshots[i]) == clones[i]
+    assert [state(H) for H in G.snapshots[1:3]] == clones[1:3]
@@ -0,0 +1,41 @@
+from src.tree.step import Case, Stepper, ctx
+
+
+def record(n):
+    stepper = ctx.get()
+    for i in range(n):
+        stepper.step(Case.RETURN, stepper.hash(), None, i)
+    return n
+
+
+def record_gen(n):
+    yield n
+    return record(n)
+
+
+def test_run_takes_a_window():
+    result, token = Stepper.run(record, 10, window=2)
+    log = ctx.get().log
+    ctx.reset(token)
+    assert result == 10
+    assert log.window == 2 and len(log.payloads) < 4 and len(log.spilled) > 0
+    assert [step.return_value for step in log] == list(range(10))
+
+
+def test_run_without_a_window_keeps_every_payload():
+    _, token = Stepper.run(record, 10)
+    log = ctx.get().log
+    ctx.reset(token)
+    assert log.window is None and len(log.payloads) == 10
+
+
+def test_run_gen_takes_a_window():
+    gen = Stepper.run_gen(record_gen, 10, window=3)
+    assert next(gen) == 10
+    try:
+        next(gen)
+    except StopIteration as stop:
+        result, token = stop.value
+    log = ctx.get().log
+    ctx.reset(token)
+    assert result == 10 and log.window == 3 and len(log.spilled) > 0
@@ -0,0 +1,147 @@
+from random import Random
+
+import pytest
+
+from src.graph.benchmark import random_template
+from src.graph.dfs import DFSGraph
+from src.graph.graph import Storage
+from src.graph.mst.prim import MSTGraph
+from src.graph.sssp import bellman_ford, dijkstra
+from src.graph.step import Trace
+from tests.graphs import state
+
+directed = {
+    "a": [("b", {"color": "blue"}, {}), "c"],
+    "b": ["c", "d"],
+    "c": ["a"],
+    "d": [],
+}
+weighted = random_template(40, 3)
+
+
+def build(storage):
+    return [
+        DFSGraph.from_template(directed, storage),
+        MSTGraph.from_template(weighted, storage),
+    ]
+
+
+# Directed rows with repeated targets and antiparallel pairs of different weights
+def messy_template(seed):
+    rng = Random(seed)
+    n = rng.randint(2, 12)
+    t = {i: [] for i in range(n)}
+    for _ in range(rng.randint(1, 40)):
+        u, v = rng.randrange(n), rng.randrange(n)
+        t[u].append((v, rng.randint(1, 9)))
+        if rng.random() < 0.3:
+            t[v].append((u, rng.randint(1, 9)))
+    return t
+
+
+# Endpoints (in the shared object's direction) and weight of each edge by key
+def edge_ends(G):
+    return {
+        (u.key, v.key): (e.u.key, e.v.key, e.weight)
+        for u in G.vertices
+        for v, e in G.neighbor_edges_of(u)
+    }
+
+
+def distances(G):
+    return {v.key: v.distance for v in G.vertices}
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_storages_agree_on_messy_templates(seed):
+    t = messy_template(seed)
+    D, C = (MSTGraph.from_template(t, s) for s in Storage)
+    assert state(C) == state(D)
+    assert len(C.edges) == len(D.edges) == len(set(C.edges))
+    assert edge_ends(C) == edge_ends(D)
+
+    # Vertices without edges aren't in an MST template
+    start = min(v.key for v in D.vertices)
+    for search in (
+        dijkstra.single_source_shortest_path,
+        bellman_ford.single_source_shortest_path,
+    ):
+        D, C = (MSTGraph.from_template(t, s) for s in Storage)
+        for G in (D, C):
+            search(G.node_by_key(start), G, trace=Trace.OFF)
+        assert distances(C) == distances(D)
+
+    D, C = (MSTGraph.from_template(t, s) for s in Storage)
+    vectorized = [
+        bellman_ford.vectorized_shortest_paths(G.node_by_key(start), G)
+        for G in (D, C)
+    ]
+    assert [vectorized[0].distance_of(v) for v in D.vertices] == [
+        vectorized[1].distance_of(C.node_by_key(v.key)) for v in D.vertices
+    ]
+
+
+def test_storages_agree():
+    for D, C in zip(build(Storage.DICT), build(Storage.CSR)):
+        assert D.storage == Storage.DICT and C.storage == Storage.CSR
+        assert state(C) == state(D)
+    _, edges = state(DFSGraph.from_template(directed, Storage.CSR))
+    assert edges["a", "b"]["color"] == "blue"
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_clone_round_trip(storage):
+    for G in build(storage):
+        H = G.clone()
+        assert H.storage == storage
+        assert state(H) == state(G)
+        assert state(type(G).from_template(G.to_template(), storage)) == state(G)
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_neighbor_edges_match_lookups(storage):
+    for G in build(storage):
+        for u in G.vertices:
+            pairs = list(G.neighbor_edges_of(u))
+            assert [v for v, _ in pairs] == list(G.neighbors_of(u))
+            for v, edge in pairs:
+                assert edge is G.edges_by_node_coords(u, v)
+                assert edge is G.edges_by_nodes[u][v]
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_undirected_edges_are_shared(storage):
+    G = MSTGraph.from_template(weighted, storage)
+    for u, v in zip(G.vertices, G.vertices[1:]):
+        if v in G.neighbors_of(u):
+            assert G.edges_by_node_coords(u, v) is G.edges_by_node_coords(v, u)
+
+
+def test_thaw_keeps_state_and_objects():
+    for G in build(Storage.CSR):
+        before = state(G)
+        vertices = G.vertices
+        edges = {
+            (u, v): G.edges_by_node_coords(u, v)
+            for u in vertices
+            for v in G.neighbors_of(u)
+        }
+        G.thaw()
+        assert G.storage == Storage.DICT
+        assert state(G) == before
+        assert G.vertices == vertices
+        assert all(G.edges_by_node_coords(u, v) is e for (u, v), e in edges.items())
+
+
+def test_mutations_agree_across_storages():
+    graphs = [DFSGraph.from_template(directed, s) for s in Storage]
+    for G in graphs:
+        k = G.node_by_key
+        e = G.add_node("e")
+        G.add_edge(k("d"), e, color="green")
+        G.remove_edge(k("b"), k("c"))
+        G.remove_node(k("a"))
+        assert G.storage == Storage.DICT
+    assert state(graphs[0]) == state(graphs[1])
+    assert "a" not in state(graphs[0])[0]
+    assert state(graphs[0])[1][("d", "e")]["color"] == "green"
@@ -0,0 +1,62 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.graph.graph import GraphBase, Storage
+
+
+def random_graph(seed, storage, n=20, m=50):
+    rng = random.Random(seed)
+    D = nx.DiGraph()
+    D.add_nodes_from(range(n))
+    for _ in range(m):
+        u, v = rng.sample(range(n), 2)
+        D.add_edge(u, v)
+    return D, GraphBase.from_template({u: list(D.successors(u)) for u in D}, storage)
+
+
+def assert_reverses(T, D):
+    R = D.reverse()
+    V = T.vertices
+    for v in V:
+        out, into = T.neighbors_of(v), T.in_neighbors_of(v)
+        assert sorted(w.key for w in out) == sorted(R.successors(v.key))
+        assert sorted(w.key for w in into) == sorted(D.successors(v.key))
+        for w, edge in T.neighbor_edges_of(v):
+            assert edge is T.edges_by_node_coords(v, w)
+            assert edge is T.graph.edges_by_node_coords(w, v)
+    for i, row in enumerate(T.successor_ids()):
+        assert sorted(V[j].key for j in row) == sorted(R.successors(V[i].key))
+    for i, row in enumerate(T.predecessor_ids()):
+        assert sorted(V[j].key for j in row) == sorted(R.predecessors(V[i].key))
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+@pytest.mark.parametrize("seed", range(5))
+def test_view_is_the_reverse(seed, storage):
+    D, G = random_graph(seed, storage)
+    T = G.transposed_view()
+    assert T.vertices == G.vertices and T.edges == G.edges
+    assert T.transposed_view() is G
+    assert_reverses(T, D)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_view_follows_mutations(seed):
+    D, G = random_graph(seed, Storage.CSR)
+    T = G.transposed_view()
+    assert_reverses(T, D)
+    rng = random.Random(seed)
+    k = G.node_by_key
+    for u, v in rng.sample(sorted(D.edges), 10):
+        G.remove_edge(k(u), k(v))
+        D.remove_edge(u, v)
+    G.add_node(99)
+    D.add_node(99)
+    for u in range(5):
+        G.add_edge(k(u), k(99))
+        D.add_edge(u, 99)
+    G.remove_node(k(0))
+    D.remove_node(0)
+    assert_reverses(T, D)